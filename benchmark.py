@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Klopas Benchmark - merenje performansi parsera nad zlatnim korpusom
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from src.benchmark import BenchmarkRunner, GoldenCorpus, StartupBenchmark
+
+# Moduli iz src podešavaju INFO logovanje pri importu - benchmark ispisuje samo upozorenja
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def print_results(results):
+    """Ispiši merenja po fazama"""
+    print(f"\n{'Faza':<42} {'mean ms':>10} {'min ms':>10} {'peak KB':>10}")
+    print("-" * 76)
+    for name, stage in results['stages'].items():
+        print(f"{name:<42} {stage['mean_ms']:>10.2f} {stage['min_ms']:>10.2f} {stage['peak_kb']:>10.1f}")
+
+    for item in results['drift']:
+        print(f"\n⚠️  {item['stage']}: izlaz se razlikuje od zlatnog korpusa za {len(item['dates'])} dana")
+        print(f"   {', '.join(item['dates'][:10])}")
+
+
+def print_startup(results):
+    """Ispiši merenje pokretanja bota"""
+    print(f"\nImport src.telegram_bot: {results['import_ms']['mean']:.0f} ms (min {results['import_ms']['min']:.0f} ms)")
+    print(f"KlopasBot():             {results['init_ms']['mean']:.0f} ms (min {results['init_ms']['min']:.0f} ms)")
+    print(f"RSS posle importa:       {results['rss_import_kb']['mean'] / 1024:.1f} MB")
+    print(f"RSS bota u mirovanju:    {results['rss_idle_kb']['mean'] / 1024:.1f} MB")
+    if results['heavy_loaded']:
+        print(f"⚠️  Učitane biblioteke preuzimanja: {', '.join(results['heavy_loaded'])}")
+
+    print(f"\n{'Najsporiji importi':<42} {'ms':>10}")
+    print("-" * 53)
+    for name, ms in results['top_imports']:
+        print(f"{name:<42} {ms:>10.1f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Klopas - benchmark parsera")
+    arg_parser.add_argument('--corpus', type=Path, default=Path("data/golden"),
+                            help="direktorijum zlatnog korpusa (PDF + očekivani JSON)")
+    arg_parser.add_argument('--repeat', type=int, default=5,
+                            help="broj ponavljanja po fazi")
+    arg_parser.add_argument('--record', action='store_true',
+                            help="snimi trenutni izlaz parsera kao očekivani izlaz korpusa")
+    arg_parser.add_argument('--save', type=Path,
+                            help="sačuvaj merenja u JSON fajl")
+    arg_parser.add_argument('--compare', type=Path,
+                            help="uporedi sa ranije sačuvanim merenjima")
+    arg_parser.add_argument('--threshold', type=float, default=0.10,
+                            help="dozvoljeno usporenje pri poređenju (0.10 = 10%%)")
+    arg_parser.add_argument('--startup', action='store_true',
+                            help="izmeri pokretanje bota (-X importtime, RSS) umesto parsera")
+    args = arg_parser.parse_args()
+
+    if args.startup:
+        results = StartupBenchmark(Path(__file__).parent, repeat=args.repeat).run()
+        print_startup(results)
+        if args.save:
+            with open(args.save, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            print(f"\n📁 Merenja sačuvana: {args.save}")
+        return 1 if results['heavy_loaded'] else 0
+
+    corpus = GoldenCorpus(args.corpus)
+
+    if args.record:
+        for path in corpus.record():
+            print(f"✅ Snimljen očekivani izlaz: {path}")
+        return 0
+
+    results = BenchmarkRunner(corpus, repeat=args.repeat).run()
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n📁 Merenja sačuvana: {args.save}")
+
+    failed = bool(results['drift'])
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = BenchmarkRunner.compare(results, baseline, args.threshold)
+
+        for item in comparison['slowdowns']:
+            print(f"🐢 {item['stage']}: {item['baseline_ms']:.2f} ms → {item['current_ms']:.2f} ms (x{item['ratio']})")
+        for name in comparison['output_changes']:
+            print(f"⚠️  {name}: izlaz se promenio u odnosu na {args.compare}")
+        if not comparison['slowdowns'] and not comparison['output_changes']:
+            print(f"\n✅ Bez usporenja i promena izlaza u odnosu na {args.compare}")
+
+        failed = failed or bool(comparison['slowdowns'] or comparison['output_changes'])
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
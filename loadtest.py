@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Klopas Load Test - sintetički update-i kroz handlere bota, bez mreže i bez pravih korisnika
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.data_organizer import DataOrganizer
+from src.fake_telegram import FakeBotAPI, FakeBotAPIServer, FakeTelegramRequest
+from src.loadtest import LoadTestRunner, seed_current_menus
+
+# Moduli iz src podešavaju INFO logovanje pri importu - load test ispisuje samo greške
+logging.getLogger().setLevel(logging.ERROR)
+
+REPO_DIR = Path(__file__).resolve().parent
+
+
+def print_results(results):
+    """Ispiši izveštaj po scenariju"""
+    print(f"\n{'Scenario':<12} {'update-a':>9} {'upd/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'greške':>7} {'API':>7} {'429':>6}")
+    print("-" * 86)
+    for name, report in results.items():
+        if name == 'broadcast':
+            continue
+        print(f"{name:<12} {report['updates']:>9} {report['throughput_per_s']:>9.1f} {report['p50_ms']:>9.2f} "
+              f"{report['p95_ms']:>9.2f} {report['p99_ms']:>9.2f} {report['errors']:>7} "
+              f"{report['api_calls']:>7} {report['api_rate_limited']:>6}")
+        if report['error_types']:
+            print(f"   greške: {', '.join(report['error_types'])}")
+
+    broadcast = results.get('broadcast')
+    if broadcast:
+        print(f"\n📣 Broadcast: {broadcast['recipients']} primalaca za {broadcast['duration_s']:.2f}s "
+              f"({broadcast['messages_per_second']:.1f} poruka/s) - poslato {broadcast['sent']}, "
+              f"neuspešno {broadcast['failed']}, 429 odgovora {broadcast['api_rate_limited']} "
+              f"(ponovljeno {broadcast['retried']}), blokiranih {broadcast['api_blocked']}")
+
+
+def serve(api: FakeBotAPI, port: int):
+    """Samo lažni Bot API server - za bot pokrenut u drugom procesu"""
+    server = FakeBotAPIServer(api, port)
+    server.start()
+    print(f"🧪 Lažni Bot API: TELEGRAM_API_BASE_URL={server.base_url} (Ctrl+C za kraj)")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"   poziva: {api.count()}, sendMessage: {api.count('sendMessage')}, "
+                  f"429: {api.count(status=429)}, 403: {api.count(status=403)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Klopas - test opterećenja bota (offline)")
+    arg_parser.add_argument('--scenario', action='append', choices=['mixed', 'morning'],
+                            help="scenario: mixed (mešavina update-a) ili morning (svaki korisnik tapne Danas); "
+                                 "može više puta, podrazumevano mixed")
+    arg_parser.add_argument('--updates', type=int, default=500,
+                            help="broj update-a u mixed scenariju")
+    arg_parser.add_argument('--users', type=int, default=200,
+                            help="broj različitih korisnika")
+    arg_parser.add_argument('--concurrency', type=int, default=1,
+                            help="istovremeno obrađenih update-a (1 = kao produkcija, bez concurrent_updates)")
+    arg_parser.add_argument('--latency-ms', type=float, nargs=2, default=[20, 80], metavar=('MIN', 'MAX'),
+                            help="simulirano kašnjenje Bot API-ja u milisekundama")
+    arg_parser.add_argument('--flood-rate', type=float, default=0.0,
+                            help="verovatnoća 429 (retry_after) odgovora na slanje poruke")
+    arg_parser.add_argument('--retry-after', type=int, default=1,
+                            help="retry_after u 429 odgovorima (sekunde)")
+    arg_parser.add_argument('--blocked-rate', type=float, default=0.0,
+                            help="udeo korisnika koji su blokirali bota (403 na slanje)")
+    arg_parser.add_argument('--http', action='store_true',
+                            help="Bot API preko lokalnog HTTP servera (ceo HTTPX sloj) umesto u procesu")
+    arg_parser.add_argument('--serve', type=int, metavar='PORT',
+                            help="samo pokreni lažni Bot API server na portu (bez load testa)")
+    arg_parser.add_argument('--broadcast', type=int, default=0,
+                            help="dodatno izmeri broadcast ka ovoliko primalaca")
+    arg_parser.add_argument('--seed', type=int, default=42,
+                            help="seed za ponovljive update-e i simulaciju")
+    arg_parser.add_argument('--save', type=Path,
+                            help="sačuvaj izveštaj u JSON fajl")
+    arg_parser.add_argument('--verbose', action='store_true',
+                            help="prikaži logove bota")
+    args = arg_parser.parse_args()
+
+    api = FakeBotAPI(latency_ms=tuple(args.latency_ms), flood_rate=args.flood_rate,
+                     retry_after=args.retry_after, blocked_rate=args.blocked_rate, seed=args.seed)
+    if args.serve is not None:
+        return serve(api, args.serve)
+
+    save_path = args.save.resolve() if args.save else None
+    source = DataOrganizer(REPO_DIR / "data" / "daily")
+
+    # Bot radi u privremenom direktorijumu - bot.log, user_stats.json i jelovnici ne diraju pravi data/
+    workdir = Path(tempfile.mkdtemp(prefix="klopas-loadtest-"))
+    os.chdir(workdir)
+    os.environ.setdefault('TELEGRAM_BOT_TOKEN', '123456:LOADTEST')
+    os.environ.pop('TELEGRAM_ADMIN_ID', None)
+    server = None
+
+    try:
+        seeded = seed_current_menus(source, DataOrganizer())
+        print(f"📅 Pripremljeno {seeded} dana jelovnika u {workdir}")
+
+        # Import posle chdir - modul bota pri importu otvara bot.log u tekućem direktorijumu
+        from src.telegram_bot import KlopasBot
+        logging.getLogger().setLevel(logging.INFO if args.verbose else logging.ERROR)
+
+        if args.http:
+            server = FakeBotAPIServer(api)
+            server.start()
+            os.environ['TELEGRAM_API_BASE_URL'] = server.base_url
+            bot = KlopasBot()
+        else:
+            bot = KlopasBot(request=FakeTelegramRequest(api))
+        bot.setup_handlers()
+
+        runner = LoadTestRunner(bot, api)
+        results = asyncio.run(runner.run(
+            args.scenario or ['mixed'], args.updates, args.users, args.concurrency,
+            broadcast=args.broadcast, seed=args.seed
+        ))
+    finally:
+        if server:
+            server.stop()
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results)
+
+    if save_path:
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n📁 Izveštaj sačuvan: {save_path}")
+
+    return 1 if any(report['errors'] for report in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
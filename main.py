@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
+import argparse
 import logging
 from pathlib import Path
 from datetime import datetime
 import sys
 
-from src.scraper import MenuScraper
 from src.pdf_parser import MenuParser
 from src.data_organizer import DataOrganizer
+from src.backfill import MenuBackfill
+from src.ingest import IngestPipeline, BatchIngest
+from src.profiling import ProfilingHooks
+
+Path("logs").mkdir(exist_ok=True)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,7 +25,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def process_current_month_menu():
+def process_current_month_menu(parse_workers=1, export_daily=False, profile=False, resume=True):
     """Glavni proces - preuzmi PDF, parsiraj ga i kreiraj markdown fajlove"""
     
     try:
@@ -40,50 +45,73 @@ def process_current_month_menu():
         print(f"Tekući mesec: {month_names[current_date.month].capitalize()} {current_date.year}")
         print("-" * 60)
         
-        print("\n📥 KORAK 1: Preuzimanje PDF-a sa sajta...")
-        scraper = MenuScraper()
-        pdf_path = scraper.get_current_month_menu()
+        organizer = DataOrganizer(export_daily=export_daily)
+        pipeline = IngestPipeline(
+            parser=MenuParser(workers=parse_workers, layout_cache_file=organizer.layout_cache_file),
+            organizer=organizer,
+            profiling=ProfilingHooks(ingest_profiling=profile),
+        )
+        
+        stage_titles = {
+            'scrape': "📥 KORAK 1: Preuzimanje PDF-a sa sajta...",
+            'parse': "📄 KORAK 2: Parsiranje PDF fajla...",
+            'organize': "📝 KORAK 3: Upis podataka...",
+        }
+        
+        def progress(stage, days, last_date):
+            if days == 0:
+                print(f"\n{stage_titles[stage]}")
         
-        if not pdf_path:
+        result = pipeline.run(resume=resume, progress=progress)
+        
+        if result['resumed_from']:
+            print(f"\n↪️  Nastavljeno od faze '{result['resumed_from']}' (checkpoint prethodnog pokretanja)")
+        for stage, duration in result['stages'].items():
+            print(f"   ⏱️  {stage}: {duration:.2f}s")
+        
+        if result['status'] == 'not_found':
             logger.error("❌ PDF nije pronađen ili preuzet!")
             print("\n⚠️  PDF za tekući mesec nije dostupan na sajtu.")
             print("Proverite da li je jelovnik objavljen na:")
             print("https://www.nasaradost.edu.rs/jelovnik/")
             return False
         
-        print(f"✅ PDF uspešno preuzet: {pdf_path}")
-        
-        print("\n📄 KORAK 2: Parsiranje PDF fajla...")
-        parser = MenuParser()
-        menu_data = parser.parse_pdf(pdf_path)
-        
-        if not menu_data:
+        if result['status'] == 'empty':
             logger.error("❌ Neuspešno parsiranje PDF-a!")
             print("\n⚠️  PDF ne sadrži prepoznatljive podatke o jelovniku.")
             return False
-            
-        print(f"✅ Pronađeno {len(menu_data)} radnih dana u jelovniku")
         
-        print("\n📝 KORAK 3: Kreiranje markdown fajlova...")
-        organizer = DataOrganizer()
+        if result['status'] == 'unchanged':
+            print(f"\n✅ Jelovnik je već ažuran - PDF {result['pdf_path']} nije menjan.")
+            return True
         
-        created_files = organizer.create_daily_markdown_files(menu_data)
-        print(f"✅ Kreirano {created_files} dnevnih markdown fajlova")
+        if result['status'] == 'failed':
+            print(f"\n❌ Greška u fazi '{result['failed_stage']}': {result['error']}")
+            if result['failed_stage'] != 'scrape':
+                print("   Urađene faze su sačuvane - sledeće pokretanje nastavlja od ove faze.")
+            return False
         
-        monthly_file = organizer.create_monthly_summary(
-            menu_data, 
-            current_date.month, 
-            current_date.year
-        )
-        print(f"✅ Kreiran mesečni sumarni fajl: {monthly_file}")
+        menu_data = result['menu_data']
+        pdf_path = result['pdf_path']
+        monthly_files = result['summaries']
+        changes_summary = result['menu_diff'].format_summary()
+        
+        print(f"\n✅ Upisano {len(menu_data)} dana u {organizer.packed_dir}/ "
+              f"(izmenjeno fajlova: {result['changed_files']}, način parsiranja: {result['parse_mode']})")
+        if changes_summary:
+            print(f"   {changes_summary}")
+        for monthly_file in monthly_files:
+            print(f"✅ Kreiran mesečni sumarni fajl: {monthly_file}")
         
         print("\n" + "="*60)
         print("✨ USPEŠNO ZAVRŠENO!")
         print("="*60)
         
         print(f"\n📁 Fajlovi su sačuvani u:")
-        print(f"   - Dnevni fajlovi: data/daily/")
-        print(f"   - Mesečni sumar: {monthly_file}")
+        print(f"   - Pakovani mesec: {organizer.packed_dir}/")
+        if export_daily:
+            print(f"   - Dnevni fajlovi: {organizer.output_dir}/")
+        print(f"   - Mesečni sumar: {', '.join(str(monthly_file) for monthly_file in monthly_files)}")
         print(f"   - PDF original: {pdf_path}\n")
         
         print("📋 Primer strukture jednog dana:")
@@ -105,6 +133,96 @@ def process_current_month_menu():
         return False
 
 
+def backfill_archive(base_url=None, workers=4, force=False, export_daily=False):
+    """Preuzmi i parsiraj sve jelovnike iz arhive sajta"""
+
+    print("\n" + "="*60)
+    print("KLOPAS - Preuzimanje arhive jelovnika")
+    print("="*60 + "\n")
+
+    try:
+        backfill = MenuBackfill(base_url=base_url, organizer=DataOrganizer(export_daily=export_daily),
+                                download_workers=workers)
+        result = backfill.run(skip_existing=not force)
+    except Exception as e:
+        logger.error(f"❌ Kritična greška: {e}")
+        print(f"\n❌ Greška u preuzimanju arhive: {e}")
+        return False
+
+    print(f"✅ Pronađeno {result['found']} jelovnika")
+    print(f"✅ Preuzeto {result['downloaded']} PDF fajlova")
+    print(f"✅ Parsirano {result['parsed']} meseci ({result['days']} radnih dana)")
+
+    return result['parsed'] > 0
+
+
+def batch_ingest(sources, workers=None, export_daily=False, resume=True):
+    """Parsiraj sačuvane PDF-ove iz direktorijuma ili glob obrazaca (bez preuzimanja sa sajta)"""
+
+    print("\n" + "="*60)
+    print("KLOPAS - Grupno parsiranje PDF jelovnika")
+    print("="*60 + "\n")
+
+    try:
+        batch = BatchIngest(organizer=DataOrganizer(export_daily=export_daily), workers=workers)
+        pdfs = batch.collect(sources)
+        if not pdfs:
+            print(f"⚠️  Nema PDF fajlova u: {', '.join(sources)}")
+            return False
+
+        def progress(done, total, entry):
+            if entry['status'] == 'ok':
+                print(f"[{done}/{total}] ✅ {entry['path']}: {entry['days']} dana, "
+                      f"parsiranje {entry['seconds']:.2f}s, upis {entry['write_seconds']:.2f}s")
+            else:
+                print(f"[{done}/{total}] ❌ {entry['path']}: {entry['error']}")
+
+        print(f"📄 Pronađeno {len(pdfs)} PDF fajlova")
+        result = batch.run(pdfs, resume=resume, progress=progress)
+    except Exception as e:
+        logger.error(f"❌ Kritična greška: {e}")
+        print(f"\n❌ Greška u grupnom parsiranju: {e}")
+        return False
+
+    if result['skipped']:
+        print(f"↪️  Preskočeno {result['skipped']} već obrađenih fajlova (--fresh za ponovnu obradu)")
+    print(f"\n✅ Obrađeno {result['ok']} fajlova ({result['days']} radnih dana) za {result['seconds']:.1f}s")
+    if result['failed']:
+        print(f"❌ Neuspešno: {result['failed']} fajlova")
+    print(f"📁 Izveštaj po fajlu: {batch.report_file}")
+
+    return result['failed'] == 0
+
+
 if __name__ == "__main__":
-    success = process_current_month_menu()
+    arg_parser = argparse.ArgumentParser(description="Klopas - procesiranje jelovnika")
+    arg_parser.add_argument('--backfill', action='store_true',
+                            help="preuzmi i parsiraj sve jelovnike iz arhive")
+    arg_parser.add_argument('--batch', nargs='+', metavar='PUTANJA',
+                            help="parsiraj sačuvane PDF-ove (direktorijum ili glob, npr. 'data/pdfs/2024-*.pdf')")
+    arg_parser.add_argument('--batch-workers', type=int, default=None,
+                            help="broj procesa za --batch (podrazumevano broj jezgara)")
+    arg_parser.add_argument('--url', default=None,
+                            help="listing stranica jelovnika (podrazumevano sajt vrtića)")
+    arg_parser.add_argument('--workers', type=int, default=4,
+                            help="broj paralelnih preuzimanja")
+    arg_parser.add_argument('--force', action='store_true',
+                            help="ponovo preuzmi i PDF-ove koji već postoje")
+    arg_parser.add_argument('--parse-workers', type=int, default=1,
+                            help="broj procesa za paralelno parsiranje stranica PDF-a")
+    arg_parser.add_argument('--export-daily', action='store_true',
+                            help="izvezi i markdown fajl po danu (data/daily/)")
+    arg_parser.add_argument('--profile', action='store_true',
+                            help="profiliši faze preuzimanja (cProfile, data/profiles/)")
+    arg_parser.add_argument('--fresh', action='store_true',
+                            help="ne nastavljaj od checkpoint-a/izveštaja prethodnog pokretanja")
+    args = arg_parser.parse_args()
+
+    if args.batch:
+        success = batch_ingest(args.batch, args.batch_workers, args.export_daily, resume=not args.fresh)
+    elif args.backfill:
+        success = backfill_archive(args.url, args.workers, args.force, args.export_daily)
+    else:
+        success = process_current_month_menu(args.parse_workers, args.export_daily, args.profile,
+                                             resume=not args.fresh)
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Modul za izdvajanje alergena iz jelovnika i invertovani indeks alergen -> datumi/obroci
+"""
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.data_organizer import DataOrganizer, atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+# Stavke obroka su odvojene zarezom iza kojeg ne sledi broj ("KEKS-1, 2, 4" je jedna stavka)
+_ITEM_SPLIT_RE = re.compile(r',\s*(?=[^\d\s])')
+# Oznake alergena na kraju stavke: "MLEKO-1", "KEKS-1,2,4", "KREM1,2"
+_CODES_RE = re.compile(r'^(.*?)[\s\-–]*(\d+(?:\s*,\s*\d+)*)$')
+
+
+def extract_allergens(meal_content: str) -> List[Dict]:
+    """Podeli sadržaj obroka na stavke i izdvoji oznake alergena
+
+    Returns:
+        Lista {'item': naziv, 'codes': ['1', '4']} za svaku stavku
+    """
+    items = []
+
+    for raw_item in _ITEM_SPLIT_RE.split(meal_content):
+        # Stavka na kraju reda u PDF-u zadržava zarez ili crticu ("MASLAC-1,") - oznake su ispred njih
+        raw_item = raw_item.rstrip(' \t\n,-–').strip()
+        if not raw_item:
+            continue
+
+        match = _CODES_RE.match(raw_item)
+        if match and match.group(1):
+            codes = sorted({code.strip() for code in match.group(2).split(',')}, key=int)
+            items.append({'item': match.group(1).strip(), 'codes': codes})
+        else:
+            items.append({'item': raw_item, 'codes': []})
+
+    return items
+
+
+class AllergenIndex:
+    """Invertovani indeks alergena, računa se pri preuzimanju jelovnika
+
+    - by_date: datum -> obrok -> stavke sa oznakama (za podsetnik i prikaz dana)
+    - by_code: oznaka -> lista {'date', 'meal', 'item'} (za upit po alergenu)
+    """
+
+    def __init__(self, index_file: Path = Path("data/allergen_index.json")):
+        self.index_file = index_file
+        self.by_date: Dict[str, Dict[str, List[Dict]]] = {}
+        self.by_code: Dict[str, List[Dict]] = {}
+        self._load()
+
+    def _load(self):
+        self.by_date = {}
+        self.by_code = {}
+        if not self.index_file.exists():
+            return
+
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                self.by_date = json.load(f).get('by_date', {})
+            self._rebuild_codes()
+        except Exception as e:
+            logger.error(f"Greška pri učitavanju indeksa alergena: {e}")
+
+    def save(self, organizer: Optional[DataOrganizer] = None):
+        """Sačuvaj indeks (by_code se računa iz by_date pri učitavanju)
+
+        Sa organizer-om indeks ide kroz njegov upis - unutar batch() bloka se
+        objavljuje zajedno sa jelovnikom, u istoj generaciji.
+        """
+        content = json.dumps({'by_date': self.by_date}, indent=2, ensure_ascii=False)
+        if organizer is not None:
+            organizer._write_file(self.index_file, content)
+            return
+
+        try:
+            atomic_write_text(self.index_file, content)
+        except Exception as e:
+            logger.error(f"Greška pri čuvanju indeksa alergena: {e}")
+
+    def reload(self):
+        """Ponovo učitaj indeks sa diska (odbaci izmene koje nisu objavljene)"""
+        self._load()
+
+    def update(self, menu_data: Dict[str, Dict], removed_dates: Iterable[str] = ()):
+        """Dodaj ili zameni dane u indeksu i ukloni obrisane datume"""
+        for date_str, day_data in menu_data.items():
+            self.by_date[date_str] = {
+                meal: [entry for item in items for entry in extract_allergens(item)]
+                for meal, items in day_data.get('meals', {}).items()
+                if items
+            }
+
+        for date_str in removed_dates:
+            self.by_date.pop(date_str, None)
+
+        self.by_date = dict(sorted(self.by_date.items()))
+        self._rebuild_codes()
+
+    def _rebuild_codes(self):
+        by_code = {}
+        for date_str, meals in self.by_date.items():
+            for meal, entries in meals.items():
+                for entry in entries:
+                    for code in entry['codes']:
+                        by_code.setdefault(code, []).append(
+                            {'date': date_str, 'meal': meal, 'item': entry['item']}
+                        )
+        self.by_code = by_code
+
+    def codes(self) -> List[str]:
+        """Sve poznate oznake alergena"""
+        return sorted(self.by_code, key=int)
+
+    def codes_for_date(self, date_str: str) -> Dict[str, List[str]]:
+        """Oznaka -> stavke koje je sadrže, za jedan dan"""
+        result = {}
+        for entries in self.by_date.get(date_str, {}).values():
+            for entry in entries:
+                for code in entry['codes']:
+                    result.setdefault(code, []).append(entry['item'])
+        return dict(sorted(result.items(), key=lambda item: int(item[0])))
+
+    def dates_for_code(self, code: str, from_date: Optional[str] = None) -> List[Dict]:
+        """Pojave alergena (datum, obrok, stavka), opciono od datuma from_date"""
+        entries = self.by_code.get(code, [])
+        if from_date:
+            entries = [entry for entry in entries if entry['date'] >= from_date]
+        return entries
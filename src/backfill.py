@@ -0,0 +1,146 @@
+"""
+Modul za preuzimanje arhive jelovnika (backfill svih prošlih meseci)
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.scraper import MenuScraper
+from src.pdf_parser import MenuParser
+from src.data_organizer import DataOrganizer
+from src.allergens import AllergenIndex
+from src.metrics import INGEST_STAGE_DURATION
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_pdf_file(pdf_path: Path) -> Dict[str, Dict]:
+    """Parsira jedan PDF u posebnom procesu"""
+    return MenuParser().parse_pdf(pdf_path)
+
+
+class MenuBackfill:
+    """Pronalazi, preuzima i parsira sve jelovnike sa sajta vrtića"""
+
+    def __init__(self, base_url: Optional[str] = None, organizer: Optional[DataOrganizer] = None,
+                 pdf_dir: Path = Path("data/pdfs"), download_workers: int = 4,
+                 parse_workers: Optional[int] = None):
+        """
+        Args:
+            base_url: Listing stranica jelovnika (None za sajt vrtića)
+            organizer: DataOrganizer za upis rezultata
+            pdf_dir: Direktorijum za preuzete PDF fajlove
+            download_workers: Broj paralelnih preuzimanja
+            parse_workers: Broj procesa za parsiranje (None = broj jezgara)
+        """
+        self.base_url = base_url
+        self.organizer = organizer or DataOrganizer()
+        self.pdf_dir = pdf_dir
+        self.download_workers = download_workers
+        self.parse_workers = parse_workers
+        self._local = threading.local()
+
+    def _scraper(self) -> MenuScraper:
+        """Scraper (i HTTP sesija) po niti - requests.Session nije thread-safe"""
+        if not hasattr(self._local, 'scraper'):
+            if self.base_url:
+                self._local.scraper = MenuScraper(self.base_url)
+            else:
+                self._local.scraper = MenuScraper()
+        return self._local.scraper
+
+    def discover(self, max_pages: int = 20) -> List[Tuple[int, int, str]]:
+        """Pronađi sve PDF jelovnike na listing i arhivskim stranicama"""
+        return self._scraper().find_all_menu_pdf_urls(max_pages=max_pages)
+
+    def download_all(self, menus: List[Tuple[int, int, str]],
+                     skip_existing: bool = True) -> Dict[Tuple[int, int], Path]:
+        """Preuzmi PDF-ove paralelno, ograničenim brojem niti
+
+        Returns:
+            Dict (godina, mesec) -> putanja do PDF-a
+        """
+        downloaded = {}
+        pending = []
+
+        for year, month, url in menus:
+            save_path = self.pdf_dir / f"{year:04d}-{month:02d}.pdf"
+            if skip_existing and save_path.exists():
+                logger.info(f"PDF već postoji, preskačem: {save_path}")
+                downloaded[(year, month)] = save_path
+            else:
+                pending.append((year, month, url, save_path))
+
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            futures = {
+                executor.submit(self._download, url, save_path): (year, month)
+                for year, month, url, save_path in pending
+            }
+            for future in as_completed(futures):
+                path = future.result()
+                if path:
+                    downloaded[futures[future]] = path
+
+        logger.info(f"Preuzeto {len(downloaded)}/{len(menus)} PDF jelovnika")
+        return downloaded
+
+    def _download(self, url: str, save_path: Path) -> Optional[Path]:
+        return self._scraper().download_pdf(url, save_path)
+
+    def parse_all(self, pdfs: Dict[Tuple[int, int], Path]) -> Dict[Tuple[int, int], Dict[str, Dict]]:
+        """Parsiraj sve PDF-ove paralelno u pool-u procesa"""
+        parsed = {}
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as executor:
+            futures = {
+                executor.submit(_parse_pdf_file, pdf_path): month_key
+                for month_key, pdf_path in pdfs.items()
+            }
+            for future in as_completed(futures):
+                month_key = futures[future]
+                try:
+                    menu_data = future.result()
+                except Exception as e:
+                    logger.error(f"Greška pri parsiranju {pdfs[month_key]}: {e}")
+                    continue
+
+                if menu_data:
+                    parsed[month_key] = menu_data
+                else:
+                    logger.warning(f"PDF {pdfs[month_key]} ne sadrži podatke o jelovniku")
+
+        return parsed
+
+    def run(self, skip_existing: bool = True, max_pages: int = 20) -> Dict:
+        """Glavna metoda - pronađi, preuzmi, parsiraj i sačuvaj sve mesece
+
+        Returns:
+            Dict sa brojem pronađenih, preuzetih i parsiranih meseci i dana
+        """
+        with INGEST_STAGE_DURATION.time(stage='scrape'):
+            menus = self.discover(max_pages=max_pages)
+            pdfs = self.download_all(menus, skip_existing=skip_existing)
+        with INGEST_STAGE_DURATION.time(stage='parse'):
+            parsed = self.parse_all(pdfs)
+
+        total_days = 0
+        allergen_index = AllergenIndex(self.organizer.output_dir.parent / "allergen_index.json")
+        # Svi meseci se objavljuju kao jedna generacija
+        with INGEST_STAGE_DURATION.time(stage='organize'), self.organizer.batch():
+            for _, menu_data in sorted(parsed.items()):
+                self.organizer.save_structured_data(menu_data)
+                if self.organizer.export_daily:
+                    self.organizer.create_daily_markdown_files(menu_data)
+                total_days += len(menu_data)
+                self.organizer.create_monthly_summaries(menu_data)
+                allergen_index.update(menu_data)
+            allergen_index.save(self.organizer)
+
+        return {
+            'found': len(menus),
+            'downloaded': len(pdfs),
+            'parsed': len(parsed),
+            'days': total_days,
+        }
@@ -0,0 +1,362 @@
+"""
+Modul za merenje performansi parsera i regresiono poređenje sa zlatnim korpusom
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.pdf_parser import MenuParser
+from src.data_organizer import DataOrganizer, SUMMARY_MEAL_KEYS
+from src.menu_pack import MenuPackReader
+from src.menu_format import format_menu_message
+
+logger = logging.getLogger(__name__)
+
+# Biblioteke pipeline-a preuzimanja - bot koji samo odgovara na poruke ne treba da ih učita
+HEAVY_MODULES = ('pdfplumber', 'PyPDF2', 'pdfminer', 'bs4', 'requests')
+
+# Kod koji meri pokretanje bota u posebnom procesu (sa -X importtime)
+_STARTUP_PROBE = """
+import json, sys, time
+sys.path.insert(0, {repo_dir!r})
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+start = time.perf_counter()
+from src.telegram_bot import KlopasBot
+import_s = time.perf_counter() - start
+rss_import = rss_kb()
+
+start = time.perf_counter()
+bot = KlopasBot()
+init_s = time.perf_counter() - start
+
+print(json.dumps({{
+    'import_ms': import_s * 1000,
+    'init_ms': init_s * 1000,
+    'rss_import_kb': rss_import,
+    'rss_idle_kb': rss_kb(),
+    'heavy_loaded': sorted(name for name in {heavy!r} if name in sys.modules),
+}}))
+"""
+
+
+def output_hash(value) -> str:
+    """Stabilan hash izlaza faze (za detekciju promene izlaza između merenja)"""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+class GoldenCorpus:
+    """Zlatni korpus - sačuvani PDF-ovi i njihov očekivani strukturisani izlaz
+
+    Za svaki `<ime>.pdf` u direktorijumu korpusa očekivani izlaz je `<ime>.json`
+    (snimljen sa --record), a ako ne postoji koristi se mesečni sumar `data/<ime>.md`.
+    Mesečni sumari su i korpus za faze koje ne čitaju PDF.
+    """
+
+    def __init__(self, corpus_dir: Path = Path("data/golden"), summaries_dir: Path = Path("data")):
+        self.corpus_dir = corpus_dir
+        self.summaries_dir = summaries_dir
+        self.organizer = DataOrganizer(summaries_dir / "daily")
+        self.parser = MenuParser()
+
+    def pdfs(self) -> List[Path]:
+        if not self.corpus_dir.exists():
+            return []
+        return sorted(self.corpus_dir.glob("*.pdf"))
+
+    def summaries(self) -> List[Path]:
+        return sorted(self.summaries_dir.glob("[0-9][0-9][0-9][0-9]-[0-9][0-9].md"))
+
+    def expected(self, pdf_path: Path) -> Optional[Dict[str, Dict]]:
+        """Očekivani izlaz parsiranja za PDF iz korpusa"""
+        expected_file = pdf_path.with_suffix('.json')
+        if expected_file.exists():
+            with open(expected_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        summary_file = self.summaries_dir / f"{pdf_path.stem}.md"
+        if summary_file.exists():
+            menu_data = self.organizer.load_monthly_summary(summary_file)
+            # Sumar je snimljen pre čišćenja završnih zareza - primeni isto čišćenje kao parser
+            for day_data in menu_data.values():
+                for meal, items in day_data['meals'].items():
+                    day_data['meals'][meal] = [self.parser._clean_meal_content(item) for item in items]
+            return menu_data
+
+        return None
+
+    def record(self) -> List[Path]:
+        """Snimi trenutni izlaz parsera kao očekivani izlaz za sve PDF-ove korpusa"""
+        recorded = []
+        for pdf_path in self.pdfs():
+            menu_data = self.parser.parse_pdf(pdf_path)
+            expected_file = pdf_path.with_suffix('.json')
+            with open(expected_file, 'w', encoding='utf-8') as f:
+                json.dump(menu_data, f, indent=2, ensure_ascii=False, sort_keys=True)
+            recorded.append(expected_file)
+        return recorded
+
+    def summary_days(self) -> Dict[str, Dict]:
+        """Svi dani iz mesečnih sumara"""
+        menu_data = {}
+        for summary_file in self.summaries():
+            menu_data.update(self.organizer.load_monthly_summary(summary_file))
+        return menu_data
+
+    def day_cells(self) -> List[str]:
+        """Tekst leve kolone za svaki dan iz sumara (ulaz za _parse_day_column)"""
+        cells = []
+        headers = {key: header for header, key in SUMMARY_MEAL_KEYS.items()}
+
+        for date_str, day_data in sorted(self.summary_days().items()):
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+            lines = [f"{day_data['day_name'].upper()} {date_obj.strftime('%d.%m.%Y.')}"]
+            for key, items in day_data['meals'].items():
+                if items:
+                    lines.append(f"{headers[key]} – {items[0]}")
+            cells.append('\n'.join(lines))
+
+        return cells
+
+
+class BenchmarkRunner:
+    """Meri vreme i vršnu memoriju po fazama i proverava izlaz prema zlatnom korpusu"""
+
+    def __init__(self, corpus: Optional[GoldenCorpus] = None, repeat: int = 5):
+        self.corpus = corpus or GoldenCorpus()
+        self.repeat = repeat
+
+    def _measure(self, func: Callable):
+        """Vreme (ms) kroz self.repeat ponavljanja i vršna memorija jednog poziva (tracemalloc)"""
+        timings = []
+        result = None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        # Memorija se meri u posebnom pozivu jer tracemalloc usporava izvršavanje
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'mean_ms': round(statistics.mean(timings), 3),
+            'min_ms': round(min(timings), 3),
+            'max_ms': round(max(timings), 3),
+            'peak_kb': round(peak / 1024, 1),
+        }, result
+
+    def run(self) -> Dict:
+        """Pokreni sve faze nad korpusom
+
+        Returns:
+            Dict sa merenjima po fazi ('stages'), hash-evima izlaza ('outputs')
+            i razlikama u odnosu na očekivani izlaz ('drift')
+        """
+        stages = {}
+        outputs = {}
+        drift = []
+
+        parser = MenuParser()
+        for pdf_path in self.corpus.pdfs():
+            name = f"parse_pdf[{pdf_path.stem}]"
+            stages[name], menu_data = self._measure(lambda: parser.parse_pdf(pdf_path))
+            stages[name]['mode'] = parser.last_parse_mode
+            outputs[name] = output_hash(menu_data)
+
+            expected = self.corpus.expected(pdf_path)
+            if expected is not None and expected != menu_data:
+                changed = sorted(
+                    date for date in set(expected) | set(menu_data)
+                    if expected.get(date) != menu_data.get(date)
+                )
+                drift.append({'stage': name, 'dates': changed})
+
+        cells = self.corpus.day_cells()
+        if cells:
+            name = "parse_day_column"
+            stages[name], days = self._measure(lambda: [parser._parse_day_column(cell) for cell in cells])
+            stages[name]['items'] = len(cells)
+            outputs[name] = output_hash(days)
+
+        menu_data = self.corpus.summary_days()
+        if menu_data:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                # Svako ponavljanje piše u prazan direktorijum - upis koji zna za izmene bi od drugog
+                # ponavljanja preskakao iste fajlove i merio samo poređenje
+                organizers = [DataOrganizer(Path(tmp_dir) / f"run-{i}" / "daily") for i in range(self.repeat + 1)]
+                fresh = iter(organizers)
+                organizer = organizers[0]
+                name = "create_daily_markdown_files"
+                stages[name], _ = self._measure(lambda: next(fresh).create_daily_markdown_files(menu_data))
+                stages[name]['items'] = len(menu_data)
+                outputs[name] = output_hash({
+                    path.name: path.read_text(encoding='utf-8')
+                    for path in sorted(organizer.output_dir.glob("*.md"))
+                })
+
+                contents = [
+                    (datetime.strptime(path.stem, '%Y-%m-%d'), path.read_text(encoding='utf-8'))
+                    for path in sorted(organizer.output_dir.glob("*.md"))
+                ]
+
+                # Čitanje dana: dnevni markdown fajl (exists + open) naspram pakovanog meseca (mmap slice)
+                organizer.save_structured_data(menu_data)
+                dates = sorted(menu_data)
+
+                def read_markdown():
+                    result = []
+                    for date_str in dates:
+                        path = organizer.output_dir / f"{date_str}.md"
+                        result.append(path.read_text(encoding='utf-8') if path.exists() else None)
+                    return result
+
+                reader = MenuPackReader(organizer.packed_dir)
+                for name, func in (("read_day[markdown]", read_markdown),
+                                   ("read_day[pack]", lambda: [reader.get(date_str) for date_str in dates])):
+                    stages[name], days = self._measure(func)
+                    stages[name]['items'] = len(dates)
+                    outputs[name] = output_hash(days)
+                reader.reset()
+
+            name = "format_menu_message"
+            stages[name], messages = self._measure(
+                lambda: [format_menu_message(content, date) for date, content in contents]
+            )
+            stages[name]['items'] = len(contents)
+            outputs[name] = output_hash(messages)
+
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'repeat': self.repeat,
+            'stages': stages,
+            'outputs': outputs,
+            'drift': drift,
+        }
+
+    @staticmethod
+    def compare(current: Dict, baseline: Dict, threshold: float = 0.10) -> Dict:
+        """Uporedi dva merenja - usporenja veća od threshold i promene izlaza
+
+        Returns:
+            Dict sa listama 'slowdowns' i 'output_changes'
+        """
+        slowdowns = []
+        output_changes = []
+
+        # Poređenje po najboljem vremenu - manje osetljivo na šum od proseka
+        for name, stage in current['stages'].items():
+            base = baseline['stages'].get(name)
+            if not base or not base['min_ms']:
+                continue
+            ratio = stage['min_ms'] / base['min_ms']
+            if ratio > 1 + threshold:
+                slowdowns.append({
+                    'stage': name,
+                    'baseline_ms': base['min_ms'],
+                    'current_ms': stage['min_ms'],
+                    'ratio': round(ratio, 2),
+                })
+
+        for name, digest in current['outputs'].items():
+            base_digest = baseline['outputs'].get(name)
+            if base_digest and base_digest != digest:
+                output_changes.append(name)
+
+        return {'slowdowns': slowdowns, 'output_changes': output_changes}
+
+
+class StartupBenchmark:
+    """Merenje pokretanja bota - vreme importa i konstrukcije KlopasBot, RSS i najsporiji importi
+
+    Svako merenje je novi proces (hladni importi), u privremenom direktorijumu
+    sa kopijom data/, pa bot.log i statistika ne diraju pravi direktorijum.
+    """
+
+    def __init__(self, repo_dir: Path = Path("."), repeat: int = 5, top_n: int = 10):
+        self.repo_dir = repo_dir.resolve()
+        self.repeat = repeat
+        self.top_n = top_n
+
+    @staticmethod
+    def parse_importtime(stderr: str) -> Dict[str, float]:
+        """Kumulativno vreme (ms) iz -X importtime izlaza za module prva dva nivoa"""
+        modules = {}
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            # Uvlačenje je dubina importa - dublji moduli su već uračunati u modul koji ih uvozi
+            depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+            if depth <= 1:
+                modules[name.strip()] = int(cumulative) / 1000
+        return modules
+
+    def _probe(self, workdir: Path) -> Dict:
+        env = dict(os.environ, TELEGRAM_BOT_TOKEN=os.environ.get('TELEGRAM_BOT_TOKEN') or '123456:STARTUP')
+        code = _STARTUP_PROBE.format(repo_dir=str(self.repo_dir), heavy=HEAVY_MODULES)
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result['imports'] = self.parse_importtime(completed.stderr)
+        return result
+
+    def run(self) -> Dict:
+        """Pokreni self.repeat merenja
+
+        Returns:
+            Dict sa vremenima (mean/min ms), RSS posle importa i posle konstrukcije bota (KB),
+            učitanim teškim modulima i najsporijim importima poslednjeg merenja
+        """
+        probes = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            workdir = Path(tmp_dir)
+            if (self.repo_dir / "data").exists():
+                shutil.copytree(self.repo_dir / "data", workdir / "data",
+                                ignore=shutil.ignore_patterns("pdfs", "profiles", "golden"))
+            for _ in range(self.repeat):
+                probes.append(self._probe(workdir))
+
+        def summary(key: str) -> Dict:
+            values = [probe[key] for probe in probes]
+            return {'mean': round(statistics.mean(values), 1), 'min': round(min(values), 1)}
+
+        imports = probes[-1]['imports']
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'repeat': self.repeat,
+            'import_ms': summary('import_ms'),
+            'init_ms': summary('init_ms'),
+            'rss_import_kb': summary('rss_import_kb'),
+            'rss_idle_kb': summary('rss_idle_kb'),
+            'heavy_loaded': probes[-1]['heavy_loaded'],
+            'top_imports': sorted(imports.items(), key=lambda item: item[1], reverse=True)[:self.top_n],
+        }
@@ -0,0 +1,358 @@
+"""
+Modul za rad više procesa bota - deljeno stanje u SQLite bazi (WAL), zakup vođe i podela broadcast-a
+
+Telegram dozvoljava samo jedan getUpdates po tokenu, pa update-e prima samo
+vođa (proces koji drži zakup 'leader'). Vođa pokreće i zakazane poslove
+(podsetnik u 20:00, short description) i preuzimanje jelovnika. Broadcast se
+deli po chat id-u: proces sa indeksom i šalje korisnicima za koje je
+chat_id % N == i, a deo procesa koji ne radi preuzima bilo koji drugi.
+Ostali procesi su spremni da preuzmu polling čim zakup vođe istekne.
+"""
+import logging
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    acquired_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS broadcasts (
+    key TEXT PRIMARY KEY,
+    message TEXT NOT NULL,
+    allergen_date TEXT,
+    workers INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS broadcast_shards (
+    broadcast_key TEXT NOT NULL REFERENCES broadcasts(key),
+    shard INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    sent INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (broadcast_key, shard)
+);
+"""
+
+
+class SharedStore:
+    """SQLite baza u WAL režimu koju dele svi procesi bota na istom računaru
+
+    WAL dozvoljava čitanje dok jedan proces piše; upisi se serijalizuju kroz
+    BEGIN IMMEDIATE, a busy_timeout čeka da drugi proces završi upis.
+    Svaka transakcija otvara svoju konekciju, pa se baza može koristiti i iz niti.
+    """
+
+    def __init__(self, path: Path = Path("data/klopas.db"), busy_timeout: float = 10.0):
+        self.path = Path(path)
+        self.busy_timeout = busy_timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # WAL režim je trajno svojstvo fajla baze - dovoljno ga je postaviti jednom
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+        self.ensure_schema(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def ensure_schema(self, script: str):
+        """Napravi tabele koje ne postoje (CREATE TABLE IF NOT EXISTS ...)"""
+        conn = self._connect()
+        try:
+            conn.executescript(script)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """Transakcija nad bazom - immediate=True odmah zaključava upis (čitanje pa upis bez trke)"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+
+class Lease:
+    """Zakup sa rokom trajanja - drži ga najviše jedan proces
+
+    Vlasnik produžava zakup pozivom acquire() pre isteka; ako proces stane,
+    zakup ističe posle `ttl` sekundi i preuzima ga sledeći proces koji pozove acquire().
+    Lokalno se zakup smatra važećim do trećine ttl pre isteka, da bi stari
+    vlasnik stao pre nego što ga novi preuzme.
+    """
+
+    def __init__(self, store: SharedStore, name: str, owner: str, ttl: float = 30.0):
+        self.store = store
+        self.name = name
+        self.owner = owner
+        self.ttl = ttl
+        self._valid_until = 0.0
+
+    @property
+    def held(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    def acquire(self) -> bool:
+        """Preuzmi ili produži zakup - True ako ga ovaj proces drži"""
+        started = time.monotonic()
+        now = time.time()
+        was_held = self.held
+
+        with self.store.transaction(immediate=True) as conn:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+            acquired = row is None or row['owner'] == self.owner or row['expires_at'] < now
+            if acquired:
+                conn.execute(
+                    "INSERT INTO leases (name, owner, expires_at, acquired_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at, "
+                    "acquired_at = CASE WHEN leases.owner = excluded.owner THEN leases.acquired_at "
+                    "ELSE excluded.acquired_at END",
+                    (self.name, self.owner, now + self.ttl, now)
+                )
+
+        self._valid_until = started + self.ttl * 2 / 3 if acquired else 0.0
+        if acquired and not was_held:
+            logger.info(f"Zakup '{self.name}' preuzeo {self.owner}")
+        elif was_held and not acquired:
+            logger.warning(f"Zakup '{self.name}' izgubljen - drži ga {row['owner']}")
+        return acquired
+
+    def release(self):
+        """Oslobodi zakup ako ga ovaj proces drži (sledeći proces ga preuzima odmah)"""
+        self._valid_until = 0.0
+        with self.store.transaction(immediate=True) as conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (self.name, self.owner))
+
+    def holder(self) -> Optional[str]:
+        """Trenutni vlasnik zakupa (None ako ga niko ne drži)"""
+        with self.store.transaction() as conn:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+        if row is None or row['expires_at'] < time.time():
+            return None
+        return row['owner']
+
+
+class WorkerCluster:
+    """Jedan proces u grupi od `workers` procesa bota
+
+    Sa workers=1 (podrazumevano) nema deljene baze: proces je uvek vođa,
+    a broadcast ide svim korisnicima kao i do sada.
+    """
+
+    def __init__(self, workers: int = 1, index: int = 0, store: Optional[SharedStore] = None,
+                 lease_ttl: float = 30.0, worker_id: Optional[str] = None,
+                 orphan_after: float = 120.0, stale_after: float = 120.0, heartbeat_interval: float = 30.0,
+                 max_attempts: int = 3):
+        """
+        Args:
+            workers: Broj procesa bota (N)
+            index: Indeks ovog procesa (0..N-1) - određuje njegov deo broadcast-a
+            store: Deljena baza (obavezna za workers > 1)
+            lease_ttl: Trajanje zakupa vođe u sekundama (preuzimanje posle pada vođe)
+            worker_id: Ime procesa u zakupima (podrazumevano host:pid:indeks)
+            orphan_after: Posle ovoliko sekundi deo broadcast-a koji niko nije poslao preuzima bilo koji proces
+            stale_after: Posle ovoliko sekundi bez heartbeat-a deo u slanju (pao proces) ponovo je slobodan
+            heartbeat_interval: Koliko često proces koji šalje deo obnavlja heartbeat (manje od stale_after)
+            max_attempts: Najviše pokušaja slanja jednog dela pre nego što se odustane
+        """
+        if workers < 1 or not 0 <= index < workers:
+            raise ValueError(f"Neispravan indeks procesa {index} za {workers} procesa")
+        if workers > 1 and store is None:
+            raise ValueError("Za više procesa potrebna je deljena baza (store)")
+        if heartbeat_interval >= stale_after:
+            raise ValueError("heartbeat_interval mora biti kraći od stale_after")
+
+        self.workers = workers
+        self.index = index
+        self.store = store
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{index}"
+        self.orphan_after = orphan_after
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval
+        self.max_attempts = max_attempts
+        self.leader = Lease(store, 'leader', self.worker_id, lease_ttl) if store is not None else None
+
+    @classmethod
+    def from_env(cls) -> 'WorkerCluster':
+        """KLOPAS_WORKERS, KLOPAS_WORKER_INDEX, KLOPAS_STATE_DB i KLOPAS_LEASE_TTL iz okruženja"""
+        workers = int(os.getenv('KLOPAS_WORKERS', '1'))
+        index = int(os.getenv('KLOPAS_WORKER_INDEX', '0'))
+        if workers <= 1:
+            return cls()
+
+        store = SharedStore(Path(os.getenv('KLOPAS_STATE_DB', 'data/klopas.db')))
+        return cls(workers, index, store, lease_ttl=float(os.getenv('KLOPAS_LEASE_TTL', '30')))
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    @property
+    def is_leader(self) -> bool:
+        return self.leader is None or self.leader.held
+
+    def renew(self) -> bool:
+        """Preuzmi ili produži zakup vođe - poziva se periodično u svakom procesu"""
+        if self.leader is None:
+            return True
+        try:
+            return self.leader.acquire()
+        except sqlite3.Error as e:
+            logger.error(f"Greška pri obnavljanju zakupa vođe: {e}")
+            return self.leader.held
+
+    def release(self):
+        """Oslobodi zakup vođe pri gašenju"""
+        if self.leader is not None and self.leader.held:
+            try:
+                self.leader.release()
+            except sqlite3.Error as e:
+                logger.error(f"Greška pri oslobađanju zakupa vođe: {e}")
+
+    @contextmanager
+    def exclusive(self, name: str, ttl: float) -> Iterator[bool]:
+        """Zakup za jedan posao (npr. preuzimanje jelovnika) - True ako ga niko drugi ne radi"""
+        if self.store is None:
+            yield True
+            return
+
+        lease = Lease(self.store, name, self.worker_id, ttl)
+        acquired = lease.acquire()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lease.release()
+
+    def shard_of(self, chat_id: int) -> int:
+        """Deo broadcast-a kome pripada chat (chat_id % N; i za negativne id-jeve grupa)"""
+        return int(chat_id) % self.workers
+
+    def publish_broadcast(self, key: str, message: str, allergen_date: Optional[str] = None) -> bool:
+        """Objavi broadcast podeljen na N delova - False ako je broadcast sa tim ključem već objavljen"""
+        now = time.time()
+        with self.store.transaction(immediate=True) as conn:
+            created = conn.execute(
+                "INSERT OR IGNORE INTO broadcasts (key, message, allergen_date, workers, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, message, allergen_date, self.workers, now)
+            ).rowcount == 1
+            if created:
+                conn.executemany(
+                    "INSERT INTO broadcast_shards (broadcast_key, shard, updated_at) VALUES (?, ?, ?)",
+                    [(key, shard, now) for shard in range(self.workers)]
+                )
+
+        if created:
+            logger.info(f"Broadcast '{key}' objavljen u {self.workers} delova")
+        return created
+
+    def claim_broadcasts(self, max_age: float = 86400.0) -> List[Dict]:
+        """Preuzmi delove broadcast-a za slanje: svoj deo, napuštene delove i delove čiji je proces pao
+
+        Deo u slanju je zakup: proces koji šalje obnavlja updated_at kroz
+        heartbeat_broadcast, a drugi proces ga preuzima tek kad heartbeat
+        izostane stale_after sekundi. Deo čiji je proces pao max_attempts puta
+        označava se kao neuspeo umesto da se preuzima zauvek.
+        """
+        now = time.time()
+        with self.store.transaction(immediate=True) as conn:
+            abandoned = conn.execute(
+                "UPDATE broadcast_shards SET status = 'failed', updated_at = ? "
+                "WHERE status = 'sending' AND updated_at < ? AND attempts >= ?",
+                (now, now - self.stale_after, self.max_attempts)
+            ).rowcount
+            if abandoned:
+                logger.warning(f"{abandoned} delova broadcast-a označeno kao neuspelo posle {self.max_attempts} pokušaja")
+
+            rows = conn.execute(
+                "SELECT s.broadcast_key, s.shard, b.message, b.allergen_date, b.workers "
+                "FROM broadcast_shards s JOIN broadcasts b ON b.key = s.broadcast_key "
+                "WHERE b.created_at > ? AND ("
+                "  (s.status = 'pending' AND (s.shard = ? OR s.updated_at < ?))"
+                "  OR (s.status = 'sending' AND s.updated_at < ? AND s.attempts < ?)"
+                ") ORDER BY b.created_at, s.shard",
+                (now - max_age, self.index, now - self.orphan_after, now - self.stale_after, self.max_attempts)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE broadcast_shards SET status = 'sending', owner = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE broadcast_key = ? AND shard = ?",
+                [(self.worker_id, now, row['broadcast_key'], row['shard']) for row in rows]
+            )
+
+        return [
+            {
+                'key': row['broadcast_key'],
+                'shard': row['shard'],
+                'workers': row['workers'],
+                'message': row['message'],
+                'allergen_date': row['allergen_date'],
+            }
+            for row in rows
+        ]
+
+    def heartbeat_broadcast(self, key: str, shard: int) -> bool:
+        """Obnovi zakup dela u slanju - False ako ga je u međuvremenu preuzeo drugi proces"""
+        with self.store.transaction(immediate=True) as conn:
+            return conn.execute(
+                "UPDATE broadcast_shards SET updated_at = ? "
+                "WHERE broadcast_key = ? AND shard = ? AND status = 'sending' AND owner = ?",
+                (time.time(), key, shard, self.worker_id)
+            ).rowcount == 1
+
+    def finish_broadcast(self, key: str, shard: int, sent: int, failed: int, retry: bool = False):
+        """Zabeleži ishod slanja dela - retry=True vraća deo na čekanje dok ima pokušaja
+
+        Ishod se upisuje samo dok je deo i dalje u slanju kod ovog procesa.
+        """
+        with self.store.transaction(immediate=True) as conn:
+            conn.execute(
+                "UPDATE broadcast_shards SET "
+                "status = CASE WHEN NOT ? THEN 'done' WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+                "sent = sent + ?, failed = failed + ?, updated_at = ? "
+                "WHERE broadcast_key = ? AND shard = ? AND status = 'sending' AND owner = ?",
+                (retry, self.max_attempts, sent, failed, time.time(), key, shard, self.worker_id)
+            )
+
+    def broadcast_status(self, key: str) -> List[Dict]:
+        """Stanje svih delova jednog broadcast-a"""
+        with self.store.transaction() as conn:
+            rows = conn.execute(
+                "SELECT shard, status, owner, attempts, sent, failed FROM broadcast_shards "
+                "WHERE broadcast_key = ? ORDER BY shard",
+                (key,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def broadcast_succeeded(self, key: str) -> Optional[bool]:
+        """Ishod broadcast-a: None dok neki deo još čeka ili se šalje, inače da li je bar jedna poruka poslata"""
+        shards = self.broadcast_status(key)
+        if not shards or any(shard['status'] in ('pending', 'sending') for shard in shards):
+            return None
+        return sum(shard['sent'] for shard in shards) > 0
@@ -1,16 +1,155 @@
 from pathlib import Path
+from contextlib import contextmanager
+import hashlib
+import json
 import logging
-from typing import Dict
+import os
+import re
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 from datetime import datetime
 
+from src.menu_pack import build_pack
+from src.feeds import render_ics, render_json_feed
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Zaglavlja u mesečnom sumaru -> ključevi obroka u menu_data
+SUMMARY_MEAL_KEYS = {
+    'DORUČAK': 'doručak',
+    'UŽINA I': 'užina_i',
+    'RUČAK': 'ručak',
+    'UŽINA II': 'užina_ii',
+}
+
+
+def atomic_write_bytes(filepath: Path, content: bytes):
+    """Upiši fajl preko privremenog fajla i rename-a - čitalac vidi ili stari ili novi sadržaj"""
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_text(filepath: Path, content: str):
+    atomic_write_bytes(filepath, content.encode('utf-8'))
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
 
 class DataOrganizer:
-    def __init__(self, output_dir: Path = Path("data/daily")):
+    def __init__(self, output_dir: Path = Path("data/daily"), export_daily: bool = False):
+        """
+        Args:
+            output_dir: Direktorijum za izvoz markdown fajlova po danu
+            export_daily: Da li write_days() upisuje i markdown fajl po danu
+                (bot čita dane iz pakovanih mesečnih fajlova)
+        """
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.export_daily = export_daily
+        # Strukturisani podaci (JSON po mesecu) - izvor za sve ostale izlaze
+        self.structured_dir = self.output_dir.parent / "menus"
+        # Pakovani mesečni fajlovi (YYYY-MM.pack) za čitanje dana preko mmap-a
+        self.packed_dir = self.output_dir.parent / "packed"
+        # Statički feed-ovi (YYYY-MM.ics, YYYY-MM.json) za kalendare i druge alate
+        self.static_dir = self.output_dir.parent / "static"
+        # Brojač generacija - povećava se posle svakog objavljenog upisa sa izmenama
+        self.generation_file = self.output_dir.parent / "generation.json"
+        # Trajni keš leve kolone PDF-a - MenuParser ga koristi samo kada ga pozivalac prosledi
+        self.layout_cache_file = self.output_dir.parent / "layout_cache.json"
+        # Fajlovi pripremljeni u batch() modu: putanja -> sadržaj (None = brisanje)
+        self._pending: Optional[Dict[Path, Union[str, bytes, None]]] = None
+        self.last_batch_changed: List[Path] = []
+
+    @contextmanager
+    def batch(self):
+        """Grupni upis - svi fajlovi se pripreme u memoriji i objave tek na kraju bloka
+
+        Upisuju se samo fajlovi čiji se sadržaj promenio (poređenje hash-a), svaki
+        preko privremenog fajla i rename-a. Na kraju se povećava brojač generacija
+        koji bot prati. Ako blok pukne, ništa se ne upisuje.
+        """
+        if self._pending is not None:
+            # Ugnježdeni batch je deo spoljašnjeg
+            yield self
+            return
+
+        self._pending = {}
+        try:
+            yield self
+            pending = self._pending
+        finally:
+            self._pending = None
+
+        self.last_batch_changed = self._publish(pending)
+
+    def _write_file(self, filepath: Path, content: Union[str, bytes, None]):
+        """Upiši (ili obriši, za None) fajl - odmah, ili na kraju batch() bloka"""
+        if self._pending is not None:
+            self._pending[filepath] = content
+        else:
+            self._publish({filepath: content})
+
+    def _read_file(self, filepath: Path) -> Optional[str]:
+        """Pročitaj fajl uzimajući u obzir još neobjavljene izmene iz batch() bloka"""
+        if self._pending is not None and filepath in self._pending:
+            return self._pending[filepath]
+        if not filepath.exists():
+            return None
+        return filepath.read_text(encoding='utf-8')
+
+    def _publish(self, files: Dict[Path, Union[str, bytes, None]]) -> List[Path]:
+        """Upiši promenjene fajlove atomski i povećaj generaciju ako ima izmena"""
+        changed = []
+
+        for filepath, content in files.items():
+            if content is None:
+                if filepath.exists():
+                    filepath.unlink()
+                    changed.append(filepath)
+                continue
+
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            if filepath.exists():
+                if _content_hash(filepath.read_bytes()) == _content_hash(content):
+                    continue
+
+            atomic_write_bytes(filepath, content)
+            changed.append(filepath)
+
+        if changed:
+            generation = self.current_generation() + 1
+            atomic_write_text(self.generation_file, json.dumps({
+                'generation': generation,
+                'updated': datetime.now().isoformat(timespec='seconds'),
+                'changed_files': len(changed),
+            }, indent=2))
+            logger.info(f"Objavljena generacija {generation}: {len(changed)}/{len(files)} izmenjenih fajlova")
+        elif files:
+            logger.info(f"Nema izmena u {len(files)} fajlova - generacija ostaje ista")
+
+        return changed
+
+    def current_generation(self) -> int:
+        """Trenutna generacija podataka (0 ako ništa još nije objavljeno)"""
+        try:
+            with open(self.generation_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('generation', 0)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.error(f"Greška pri čitanju generacije: {e}")
+            return 0
         
     def create_daily_markdown_files(self, menu_data: Dict[str, Dict]) -> int:
         """Kreira individualne Markdown fajlove za svaki dan"""
@@ -26,6 +165,26 @@ class DataOrganizer:
         logger.info(f"Kreirano {created_files} markdown fajlova")
         return created_files
     
+    def write_days(self, days: Iterable[Dict]) -> Iterator[Dict]:
+        """Upisuje dnevne fajlove kako dani stižu (npr. iz MenuParser.iter_days)
+
+        Generator - svaki uspešno upisan dan se odmah prosleđuje dalje, pa
+        pozivalac može da prati napredak i skuplja dane za mesečni sumar.
+        Bez export_daily dani se samo prosleđuju (upisuju se u save_structured_data).
+        """
+        for day_data in days:
+            if not self.export_daily:
+                yield day_data
+                continue
+
+            try:
+                self._create_single_day_file(day_data['date'], day_data)
+            except Exception as e:
+                logger.error(f"Greška pri kreiranju fajla za {day_data.get('date')}: {e}")
+                continue
+
+            yield day_data
+
     def _create_single_day_file(self, date_str: str, day_data: Dict):
         """Kreira pojedinačni markdown fajl za jedan dan"""
         # Koristi datum u formatu YYYY-MM-DD za ime fajla
@@ -35,6 +194,10 @@ class DataOrganizer:
             filename = f"{date_str}.md"
         filepath = self.output_dir / filename
         
+        self._write_file(filepath, self.render_day_markdown(date_str, day_data))
+        
+    def render_day_markdown(self, date_str: str, day_data: Dict) -> str:
+        """Markdown jednog dana - isti sadržaj ide u dnevni fajl i u pakovani mesečni fajl"""
         try:
             date_obj = datetime.strptime(date_str, '%Y-%m-%d')
             formatted_date = self._format_date_serbian(date_obj)
@@ -75,10 +238,7 @@ class DataOrganizer:
                     content += f"- {item}\n"
             content += "\n"
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-            
-        logger.info(f"Kreiran fajl: {filepath}")
+        return content
         
     def _format_date_serbian(self, date_obj: datetime) -> str:
         """Formatira datum na srpski način"""
@@ -141,8 +301,182 @@ class DataOrganizer:
             except Exception as e:
                 logger.error(f"Greška pri obradi datuma {date_str}: {e}")
                 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self._write_file(filepath, content)
             
         logger.info(f"Kreiran mesečni sumarni fajl: {filepath}")
-        return filepath
\ No newline at end of file
+        return filepath
+
+    def create_monthly_summaries(self, menu_data: Dict[str, Dict],
+                                 removed_dates: Iterable[str] = ()) -> List[Path]:
+        """Kreira ili ažurira mesečni sumar za svaki mesec koji se pojavljuje u podacima
+
+        Dani se grupišu po (godina, mesec) u jednom prolazu, a svaki sumar se
+        pravi od celog sačuvanog meseca dopunjenog novim danima - pa PDF za
+        sledeći mesec ili PDF koji prelazi u naredni mesec ne gubi dane.
+        U istom prolazu se pišu i statički feed-ovi meseca (create_feeds).
+        """
+        months = {}
+        for date_str, day_data in menu_data.items():
+            months.setdefault((int(date_str[:4]), int(date_str[5:7])), {})[date_str] = day_data
+        for date_str in removed_dates:
+            months.setdefault((int(date_str[:4]), int(date_str[5:7])), {})
+
+        removed = set(removed_dates)
+        summaries = []
+        for (year, month), days in sorted(months.items()):
+            month_data = self.load_structured_data(year, month) or {}
+            month_data.update(days)
+            for date_str in removed:
+                month_data.pop(date_str, None)
+            summaries.append(self.create_monthly_summary(month_data, month, year))
+            self.create_feeds(month_data, month, year)
+
+        return summaries
+
+    def create_feeds(self, month_data: Dict[str, Dict], month: int, year: int) -> List[Path]:
+        """Kreira statički iCalendar i JSON feed meseca (data/static/YYYY-MM.ics, .json)"""
+        month_key = f"{year:04d}-{month:02d}"
+        month_data = {date_str: day_data for date_str, day_data in month_data.items()
+                      if date_str.startswith(month_key)}
+
+        ics_path = self.static_dir / f"{month_key}.ics"
+        json_path = self.static_dir / f"{month_key}.json"
+        self._write_file(ics_path, render_ics(month_data, year, month))
+        self._write_file(json_path, render_json_feed(month_data, year, month))
+
+        logger.info(f"Kreirani feed-ovi: {ics_path}, {json_path}")
+        return [ics_path, json_path]
+
+    def save_structured_data(self, menu_data: Dict[str, Dict],
+                             removed_dates: Iterable[str] = ()) -> List[Path]:
+        """Sačuvaj parsirane dane u JSON fajlove po mesecu (data/menus/YYYY-MM.json)
+
+        Postojeći dani istog meseca se zadržavaju, a novi ih prepisuju.
+        Dani iz removed_dates se brišu.
+        """
+        months = {}
+        for date_str, day_data in menu_data.items():
+            months.setdefault(date_str[:7], {})[date_str] = day_data
+        for date_str in removed_dates:
+            months.setdefault(date_str[:7], {})
+
+        saved = []
+
+        for month_key, days in sorted(months.items()):
+            year, month = (int(part) for part in month_key.split('-'))
+            merged = self.load_structured_data(year, month) or {}
+            merged.update(days)
+            for date_str in removed_dates:
+                merged.pop(date_str, None)
+
+            filepath = self.structured_dir / f"{month_key}.json"
+            self._write_file(filepath, json.dumps(dict(sorted(merged.items())), indent=2, ensure_ascii=False))
+            self._write_file(self.packed_dir / f"{month_key}.pack", build_pack({
+                int(date_str[8:10]): self.render_day_markdown(date_str, day_data)
+                for date_str, day_data in merged.items()
+            }))
+
+            logger.info(f"Sačuvani strukturisani podaci: {filepath}")
+            saved.append(filepath)
+
+        return saved
+
+    def load_structured_data(self, year: int, month: int) -> Optional[Dict[str, Dict]]:
+        """Učitaj strukturisane podatke za mesec (None ako ne postoje)"""
+        filepath = self.structured_dir / f"{year:04d}-{month:02d}.json"
+
+        try:
+            content = self._read_file(filepath)
+            return json.loads(content) if content is not None else None
+        except Exception as e:
+            logger.error(f"Greška pri učitavanju {filepath}: {e}")
+            return None
+
+    def load_monthly_summary(self, filepath: Path) -> Dict[str, Dict]:
+        """Učitaj mesečni sumarni fajl (data/YYYY-MM.md) nazad u strukturu menu_data"""
+        month_numbers = {
+            'januar': 1, 'februar': 2, 'mart': 3, 'april': 4,
+            'maj': 5, 'jun': 6, 'jul': 7, 'avgust': 8,
+            'septembar': 9, 'oktobar': 10, 'novembar': 11, 'decembar': 12
+        }
+        menu_data = {}
+        current = None
+
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+
+                day_match = re.match(r'^## (\S+) (\d{1,2})\. (\S+) (\d{4})\.$', line)
+                if day_match and day_match.group(3) in month_numbers:
+                    date_str = (
+                        f"{int(day_match.group(4)):04d}-"
+                        f"{month_numbers[day_match.group(3)]:02d}-"
+                        f"{int(day_match.group(2)):02d}"
+                    )
+                    current = {
+                        'day_name': day_match.group(1).lower(),
+                        'date': date_str,
+                        'meals': {key: [] for key in SUMMARY_MEAL_KEYS.values()}
+                    }
+                    menu_data[date_str] = current
+                    continue
+
+                meal_match = re.match(r'^\*\*(.+?)\*\*: (.*)$', line)
+                if meal_match and current and meal_match.group(1) in SUMMARY_MEAL_KEYS:
+                    current['meals'][SUMMARY_MEAL_KEYS[meal_match.group(1)]] = [meal_match.group(2)]
+
+        return menu_data
+
+    def remove_day_files(self, dates: Iterable[str]) -> int:
+        """Obriši dnevne fajlove za datume koji više nisu u jelovniku"""
+        removed = 0
+        for date_str in dates:
+            filepath = self.output_dir / f"{date_str}.md"
+            if filepath.exists():
+                self._write_file(filepath, None)
+                removed += 1
+                logger.info(f"Obrisan fajl: {filepath}")
+        return removed
+
+    def save_page_state(self, pdf_key: str, pages: List[Dict], source: Optional[str] = None):
+        """Sačuvaj otiske stranica PDF-a (data/menus/pages/<pdf_key>.json) za inkrementalno parsiranje
+
+        Args:
+            source: URL sa kog je PDF preuzet - identitet PDF-a uz mesec iz datuma stranica
+        """
+        self._write_file(self.structured_dir / "pages" / f"{pdf_key}.json",
+                         json.dumps({'source': source, 'pages': pages}, indent=2))
+
+    def load_page_state(self, pdf_key: str) -> Optional[Dict]:
+        """Učitaj otiske stranica iz prethodnog parsiranja PDF-a: {'source', 'pages'} (None ako ne postoje)"""
+        filepath = self.structured_dir / "pages" / f"{pdf_key}.json"
+        if not filepath.exists():
+            return None
+
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception as e:
+            logger.error(f"Greška pri učitavanju {filepath}: {e}")
+            return None
+
+        # Stariji format je samo lista stranica, bez izvora
+        if isinstance(state, list):
+            return {'source': None, 'pages': state}
+        return state
+
+    def load_all_menus(self) -> Dict[str, Dict]:
+        """Svi poznati dani - mesečni sumari (data/YYYY-MM.md), pa strukturisani podaci preko njih"""
+        menu_data = {}
+
+        for summary_file in sorted(self.output_dir.parent.glob("[0-9][0-9][0-9][0-9]-[0-9][0-9].md")):
+            try:
+                menu_data.update(self.load_monthly_summary(summary_file))
+            except Exception as e:
+                logger.error(f"Greška pri učitavanju {summary_file}: {e}")
+
+        for month_file in sorted(self.structured_dir.glob("[0-9][0-9][0-9][0-9]-[0-9][0-9].json")):
+            year, month = (int(part) for part in month_file.stem.split('-'))
+            menu_data.update(self.load_structured_data(year, month) or {})
+
+        return dict(sorted(menu_data.items()))
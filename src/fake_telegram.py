@@ -0,0 +1,236 @@
+"""
+Modul sa lažnim Telegram Bot API-jem za testiranje opterećenja bez mreže i bez pravih korisnika
+
+Isti FakeBotAPI se koristi na dva načina: kao HTTP sloj u procesu bota
+(FakeTelegramRequest) ili kao lokalni HTTP server (FakeBotAPIServer) na koji
+se bot usmerava preko TELEGRAM_API_BASE_URL.
+"""
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from telegram.request import BaseRequest, RequestData
+
+logger = logging.getLogger(__name__)
+
+# Metode koje Telegram ograničava po broju poruka (flood control)
+RATE_LIMITED_METHODS = {'sendMessage', 'editMessageText', 'sendDocument'}
+
+
+class FakeBotAPI:
+    """Stanje i odgovori lažnog Bot API-ja
+
+    Odgovori imaju isti oblik kao pravi API, pa ih telegram.Bot parsira kao i
+    inače. Svaki poziv se beleži u `calls` (metoda, chat_id, status, vreme).
+    Deli se između niti HTTP servera, pa je stanje zaštićeno lock-om.
+    """
+
+    def __init__(self, latency_ms: Tuple[float, float] = (20, 80), flood_rate: float = 0.0,
+                 retry_after: int = 1, blocked_rate: float = 0.0, bot_username: str = "klopasbot",
+                 seed: Optional[int] = None):
+        """
+        Args:
+            latency_ms: Opseg simuliranog kašnjenja odgovora (min, max) u milisekundama
+            flood_rate: Verovatnoća 429 odgovora (retry_after) za metode koje šalju poruke
+            retry_after: Sekunde u retry_after parametru 429 odgovora
+            blocked_rate: Udeo korisnika koji su blokirali bota (403 na svako slanje tom korisniku)
+            bot_username: Username koji vraća getMe
+            seed: Seed za ponovljive simulacije
+        """
+        self.latency_ms = latency_ms
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.blocked_rate = blocked_rate
+        self.bot_username = bot_username
+        self.random = random.Random(seed)
+        self.calls: List[Dict] = []
+        self._blocked: Dict[int, bool] = {}
+        self._message_id = 0
+        self._lock = threading.Lock()
+
+    def latency(self, api_method: str = '', params: Optional[Dict] = None) -> float:
+        """Simulirano kašnjenje jednog poziva u sekundama
+
+        getUpdates bez novih update-a čeka `timeout` sekundi kao long polling
+        pravog API-ja (najviše 30s), da bot koji poluje ne bi vrteo petlju.
+        """
+        if api_method == 'getUpdates':
+            return min(float((params or {}).get('timeout') or 0), 30.0)
+        low, high = self.latency_ms
+        with self._lock:
+            return self.random.uniform(low, high) / 1000
+
+    def is_blocked(self, chat_id) -> bool:
+        """Da li je korisnik blokirao bota - odluka se pamti, pa je isti korisnik uvek blokiran"""
+        if not self.blocked_rate or chat_id is None or int(chat_id) < 0:
+            return False
+        chat_id = int(chat_id)
+        with self._lock:
+            if chat_id not in self._blocked:
+                self._blocked[chat_id] = self.random.random() < self.blocked_rate
+            return self._blocked[chat_id]
+
+    def handle(self, api_method: str, params: Dict) -> Tuple[int, Dict]:
+        """Odgovor na jedan poziv - (HTTP status, JSON telo)"""
+        chat_id = params.get('chat_id')
+
+        if api_method in RATE_LIMITED_METHODS:
+            if self.is_blocked(chat_id):
+                return self._record(api_method, chat_id, 403, {
+                    'ok': False,
+                    'error_code': 403,
+                    'description': "Forbidden: bot was blocked by the user",
+                })
+
+            with self._lock:
+                flooded = self.flood_rate and self.random.random() < self.flood_rate
+            if flooded:
+                return self._record(api_method, chat_id, 429, {
+                    'ok': False,
+                    'error_code': 429,
+                    'description': f"Too Many Requests: retry after {self.retry_after}",
+                    'parameters': {'retry_after': self.retry_after},
+                })
+
+        return self._record(api_method, chat_id, 200, {'ok': True, 'result': self._result(api_method, params)})
+
+    def _record(self, api_method: str, chat_id, status: int, body: Dict) -> Tuple[int, Dict]:
+        with self._lock:
+            self.calls.append({'method': api_method, 'chat_id': chat_id, 'status': status, 'time': time.time()})
+        return status, body
+
+    def _result(self, api_method: str, params: Dict):
+        if api_method == 'getMe':
+            return {'id': 1, 'is_bot': True, 'first_name': 'Klopas', 'username': self.bot_username}
+        if api_method == 'getUpdates':
+            return []
+        if api_method in ('sendMessage', 'editMessageText'):
+            return self._message(params)
+        return True
+
+    def _message(self, params: Dict) -> Dict:
+        with self._lock:
+            self._message_id += 1
+            message_id = self._message_id
+        chat_id = int(params.get('chat_id') or 0)
+        return {
+            'message_id': int(params.get('message_id') or message_id),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'group'},
+            'from': {'id': 1, 'is_bot': True, 'first_name': 'Klopas', 'username': self.bot_username},
+            'text': params.get('text', ''),
+        }
+
+    def count(self, api_method: Optional[str] = None, status: Optional[int] = None) -> int:
+        with self._lock:
+            return sum(
+                1 for call in self.calls
+                if (api_method is None or call['method'] == api_method) and (status is None or call['status'] == status)
+            )
+
+
+class FakeTelegramRequest(BaseRequest):
+    """HTTP sloj za telegram.Bot koji umesto mreže odgovara iz FakeBotAPI, uz simulirano kašnjenje"""
+
+    def __init__(self, api: FakeBotAPI):
+        self.api = api
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None,
+                         *args, **kwargs) -> Tuple[int, bytes]:
+        api_method = url.rsplit('/', 1)[-1]
+        params = request_data.parameters if request_data is not None else {}
+        await asyncio.sleep(self.api.latency(api_method, params))
+        status, body = self.api.handle(api_method, params)
+        return status, json.dumps(body).encode('utf-8')
+
+
+def _parse_value(value: str):
+    # telegram.Bot šalje složene parametre kao JSON stringove u form polju
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+class _FakeBotAPIHandler(BaseHTTPRequestHandler):
+    # Keep-alive kao pravi API - HTTPX pool ponovo koristi konekcije
+    protocol_version = 'HTTP/1.1'
+    api: FakeBotAPI = None
+
+    def _params(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        content_type = self.headers.get('Content-Type', '')
+
+        if content_type.startswith('application/json'):
+            return json.loads(body) if body else {}
+        params = dict(parse_qsl(self.path.split('?', 1)[1])) if '?' in self.path else {}
+        params.update(parse_qsl(body))
+        return {key: _parse_value(value) for key, value in params.items()}
+
+    def _handle(self):
+        # Putanja je /bot<token>/<metoda>, kao na api.telegram.org
+        api_method = self.path.split('?', 1)[0].rsplit('/', 1)[-1]
+        try:
+            params = self._params()
+        except Exception as e:
+            self._respond(400, {'ok': False, 'error_code': 400, 'description': f"Bad Request: {e}"})
+            return
+
+        time.sleep(self.api.latency(api_method, params))
+        self._respond(*self.api.handle(api_method, params))
+
+    def _respond(self, status: int, body: Dict):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, format, *args):
+        # Hiljade poziva u benchmarku ne treba da pune izlaz
+        pass
+
+
+class FakeBotAPIServer:
+    """Lažni Bot API kao lokalni HTTP server u pozadinskoj niti
+
+    Bot se usmerava na njega sa TELEGRAM_API_BASE_URL=http://<host>:<port>/bot,
+    pa ceo HTTP sloj (HTTPX, pool konekcija, retry) radi kao u produkciji.
+    """
+
+    def __init__(self, api: FakeBotAPI, port: int = 0, host: str = '127.0.0.1'):
+        handler = type('FakeBotAPIHandler', (_FakeBotAPIHandler,), {'api': api})
+        self.api = api
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='fake-bot-api', daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def start(self):
+        self.thread.start()
+        logger.info(f"Lažni Bot API dostupan na {self.base_url}<token>/")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
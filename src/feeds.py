@@ -0,0 +1,87 @@
+"""
+Modul za statičke feed-ove jelovnika - iCalendar (.ics) i kompaktan JSON po mesecu
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict
+
+from src.menu_diff import MEAL_LABELS
+
+logger = logging.getLogger(__name__)
+
+ICS_PRODID = "-//Klopas//Jelovnik vrtica//SR"
+
+
+def _ics_escape(text: str) -> str:
+    """Escape vrednosti po RFC 5545 (\\, ;, , i novi red)"""
+    return (text.replace('\\', '\\\\').replace(';', '\\;')
+                .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def _ics_fold(line: str) -> str:
+    """Prelomi liniju na 75 okteta (nastavak počinje razmakom), bez sečenja UTF-8 znaka"""
+    folded = []
+    current = ''
+    for char in line:
+        limit = 75 if not folded else 74
+        if len((current + char).encode('utf-8')) > limit:
+            folded.append(current)
+            current = ''
+        current += char
+    folded.append(current)
+    return '\r\n '.join(folded)
+
+
+def render_ics(month_data: Dict[str, Dict], year: int, month: int) -> str:
+    """iCalendar feed - jedan celodnevni događaj po radnom danu sa obrocima u opisu
+
+    Sadržaj zavisi samo od jelovnika (DTSTAMP je datum dana), pa ponovljeni
+    upis istog meseca daje isti fajl.
+    """
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{ICS_PRODID}',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:Jelovnik {month:02d}/{year}',
+    ]
+
+    for date_str, day_data in sorted(month_data.items()):
+        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+        meals = day_data.get('meals', {})
+
+        description = '\n'.join(
+            f"{MEAL_LABELS[meal].split(' ', 1)[1]}: {', '.join(meals[meal])}"
+            for meal in MEAL_LABELS if meals.get(meal)
+        )
+        lunch = ', '.join(meals.get('ručak') or [])
+
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:{date_str}@klopas',
+            f"DTSTAMP:{date_obj.strftime('%Y%m%d')}T000000Z",
+            f"DTSTART;VALUE=DATE:{date_obj.strftime('%Y%m%d')}",
+            f"DTEND;VALUE=DATE:{(date_obj + timedelta(days=1)).strftime('%Y%m%d')}",
+            f"SUMMARY:{_ics_escape('Ručak: ' + lunch if lunch else 'Jelovnik')}",
+            f'DESCRIPTION:{_ics_escape(description)}',
+            'TRANSP:TRANSPARENT',
+            'END:VEVENT',
+        ]
+
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_ics_fold(line) for line in lines) + '\r\n'
+
+
+def render_json_feed(month_data: Dict[str, Dict], year: int, month: int) -> str:
+    """Kompaktan JSON feed meseca: {"month": "YYYY-MM", "days": [{date, day, meals}]}"""
+    days = [
+        {
+            'date': date_str,
+            'day': day_data.get('day_name', ''),
+            'meals': {meal: items for meal, items in day_data.get('meals', {}).items() if items},
+        }
+        for date_str, day_data in sorted(month_data.items())
+    ]
+    return json.dumps({'month': f"{year:04d}-{month:02d}", 'days': days},
+                      ensure_ascii=False, separators=(',', ':'))
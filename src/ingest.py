@@ -0,0 +1,475 @@
+"""
+Modul za preuzimanje jelovnika kao jedinstveni niz faza: scrape -> parse -> organize
+
+Isti pipeline koriste main.py i bot. Svaka faza se meri, a posle svake
+uspešne faze pamti se checkpoint - ako upis pukne, parsirani dani ostaju
+sačuvani i sledeće pokretanje nastavlja od faze koja nije uspela.
+
+BatchIngest je offline varijanta za skup već sačuvanih PDF-ova (npr. ponovno
+parsiranje arhive posle izmene parsera).
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from src.data_organizer import DataOrganizer, atomic_write_text
+from src.menu_diff import MenuDiff
+from src.allergens import AllergenIndex
+from src.profiling import ProfilingHooks
+from src.metrics import INGEST_STAGE_DURATION
+
+if TYPE_CHECKING:
+    from src.scraper import MenuScraper
+    from src.pdf_parser import MenuParser
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('scrape', 'parse', 'organize')
+
+# progress(faza, broj obrađenih dana, poslednji datum) - poziva se iz niti u kojoj radi pipeline
+ProgressCallback = Callable[[str, int, Optional[str]], None]
+
+
+class IngestPipeline:
+    """Preuzimanje, parsiranje i upis jelovnika za tekući mesec
+
+    run() vraća rezultat kao dict:
+        status          - 'ok', 'unchanged', 'not_found', 'empty', 'failed' ili 'busy'
+        pdf_path        - preuzeti PDF (ili None)
+        menu_data       - parsirani dani (kod inkrementalnog parsiranja samo izmenjene stranice)
+        removed_dates   - datumi koji više nisu u PDF-u
+        parse_mode      - način parsiranja (MenuParser.last_parse_mode, npr. 'pypdf2' ili 'pypdf2+tables')
+        menu_diff       - MenuDiff prema prethodno sačuvanim danima (posle upisa)
+        changed_files   - broj fajlova koje je upis zaista promenio
+        summaries       - mesečni sumari
+        stages          - faza -> trajanje u sekundama (samo faze koje su se izvršile)
+        resumed_from    - faza od koje je nastavljeno iz checkpoint-a (ili None)
+        failed_stage    - faza koja nije uspela, error - poruka greške
+    """
+
+    def __init__(self, scraper: Optional['MenuScraper'] = None, parser: Optional['MenuParser'] = None,
+                 organizer: Optional[DataOrganizer] = None, profiling: Optional[ProfilingHooks] = None,
+                 incremental: bool = True, checkpoint_ttl: timedelta = timedelta(hours=6)):
+        """
+        Args:
+            scraper: MenuScraper za preuzimanje PDF-a (None = kreira se pri prvom pokretanju)
+            parser: MenuParser; sa workers > 1 parsira se ceo PDF paralelno (None = kao scraper)
+            organizer: DataOrganizer za upis rezultata
+            profiling: Profilisanje faza (ProfilingHooks.stage)
+            incremental: Parsiraj samo stranice izmenjene od prethodnog parsiranja istog PDF-a
+            checkpoint_ttl: Stariji checkpoint se ne nastavlja (na sajtu je možda novi PDF)
+        """
+        self._scraper = scraper
+        self._parser = parser
+        self.organizer = organizer or DataOrganizer()
+        self.profiling = profiling or ProfilingHooks()
+        self.incremental = incremental
+        self.checkpoint_ttl = checkpoint_ttl
+        self.checkpoint_file = self.organizer.output_dir.parent / "ingest_checkpoint.json"
+        self.allergen_index_file = self.organizer.output_dir.parent / "allergen_index.json"
+        self._lock = threading.Lock()
+
+    # Scraper (requests, BeautifulSoup) i parser (pdfplumber, PyPDF2) se uvoze tek pri prvom
+    # preuzimanju - bot koji samo odgovara na poruke ih nikad ne učitava
+
+    @property
+    def scraper(self) -> 'MenuScraper':
+        if self._scraper is None:
+            from src.scraper import MenuScraper
+            self._scraper = MenuScraper()
+        return self._scraper
+
+    @property
+    def parser(self) -> 'MenuParser':
+        if self._parser is None:
+            from src.pdf_parser import MenuParser
+            self._parser = MenuParser(layout_cache_file=self.organizer.layout_cache_file)
+        return self._parser
+
+    def load_checkpoint(self) -> Optional[Dict]:
+        """Checkpoint prethodnog nedovršenog pokretanja (None ako ne postoji ili je zastareo)"""
+        if not self.checkpoint_file.exists():
+            return None
+
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except Exception as e:
+            logger.error(f"Greška pri učitavanju checkpoint-a {self.checkpoint_file}: {e}")
+            return None
+
+        updated = datetime.fromisoformat(checkpoint.get('updated', '1970-01-01T00:00:00'))
+        if datetime.now() - updated > self.checkpoint_ttl:
+            logger.info(f"Checkpoint iz {updated} je zastareo - počinjem od preuzimanja")
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: Dict):
+        # Upisuje se odmah, van batch()-a organizatora - mora da preživi neuspeli upis
+        checkpoint['updated'] = datetime.now().isoformat(timespec='seconds')
+        try:
+            atomic_write_text(self.checkpoint_file, json.dumps(checkpoint, indent=2, ensure_ascii=False))
+        except Exception as e:
+            logger.error(f"Greška pri čuvanju checkpoint-a: {e}")
+
+    def clear_checkpoint(self):
+        if self.checkpoint_file.exists():
+            self.checkpoint_file.unlink()
+
+    def run(self, resume: bool = True, progress: Optional[ProgressCallback] = None) -> Dict:
+        """Izvrši faze redom, nastavljajući od checkpoint-a ako postoji
+
+        Args:
+            resume: Nastavi od faze koja prošli put nije uspela (False = počni od preuzimanja)
+            progress: Opciona funkcija za prikaz napretka
+        """
+        result = {
+            'status': None,
+            'pdf_path': None,
+            'menu_data': {},
+            'removed_dates': [],
+            'parse_mode': None,
+            'menu_diff': None,
+            'changed_files': 0,
+            'summaries': [],
+            'stages': {},
+            'resumed_from': None,
+            'failed_stage': None,
+            'error': None,
+        }
+
+        # Dva preuzimanja istovremeno (npr. dva admina) bi pisala isti checkpoint
+        if not self._lock.acquire(blocking=False):
+            result['status'] = 'busy'
+            return result
+
+        try:
+            checkpoint = self.load_checkpoint() if resume else None
+            if checkpoint is None:
+                checkpoint = {'completed': None}
+            elif checkpoint.get('completed'):
+                result['resumed_from'] = STAGES[STAGES.index(checkpoint['completed']) + 1]
+                logger.info(f"Nastavljam preuzimanje od faze '{result['resumed_from']}'")
+
+            for stage in STAGES:
+                if checkpoint.get('completed') and STAGES.index(stage) <= STAGES.index(checkpoint['completed']):
+                    continue
+
+                if progress:
+                    progress(stage, 0, None)
+
+                start = time.perf_counter()
+                try:
+                    with self.profiling.stage(stage):
+                        status = getattr(self, f"_{stage}")(checkpoint, result, progress)
+                except Exception as e:
+                    logger.error(f"Greška u fazi '{stage}': {e}")
+                    checkpoint['failed_stage'] = stage
+                    checkpoint['error'] = str(e)
+                    self._save_checkpoint(checkpoint)
+                    result.update(status='failed', failed_stage=stage, error=str(e))
+                    return result
+                finally:
+                    duration = time.perf_counter() - start
+                    result['stages'][stage] = round(duration, 3)
+                    INGEST_STAGE_DURATION.observe(duration, stage=stage)
+
+                if status:
+                    # Faza je završila ceo posao (nema PDF-a, nema izmena...) - nema šta da se nastavi
+                    self.clear_checkpoint()
+                    result['status'] = status
+                    return result
+
+                checkpoint['completed'] = stage
+                checkpoint.pop('failed_stage', None)
+                checkpoint.pop('error', None)
+                if stage != STAGES[-1]:
+                    self._save_checkpoint(checkpoint)
+
+            self.clear_checkpoint()
+            result['status'] = 'ok'
+            return result
+        finally:
+            self._lock.release()
+
+    def _scrape(self, checkpoint: Dict, result: Dict, progress: Optional[ProgressCallback]) -> Optional[str]:
+        pdf_path = self.scraper.get_current_month_menu()
+        if not pdf_path:
+            return 'not_found'
+
+        checkpoint['pdf_path'] = str(pdf_path)
+        checkpoint['source_url'] = getattr(self.scraper, 'last_pdf_url', None)
+        result['pdf_path'] = pdf_path
+        return None
+
+    def _parse(self, checkpoint: Dict, result: Dict, progress: Optional[ProgressCallback]) -> Optional[str]:
+        pdf_path = Path(checkpoint['pdf_path'])
+        result['pdf_path'] = pdf_path
+
+        if not self.incremental or self.parser.workers > 1:
+            menu_data = self.parser.parse_pdf(pdf_path)
+            result['parse_mode'] = self.parser.last_parse_mode
+            if not menu_data:
+                return 'empty'
+            checkpoint.update(menu_data=menu_data, removed_dates=[], pages=None, parse_mode=result['parse_mode'])
+            result['menu_data'] = menu_data
+            return None
+
+        # Otisci stranica iz prethodnog parsiranja istog PDF-a - parsiraju se samo izmenjene stranice.
+        # Stanje drugog izvora (drugi URL) ne važi: na istoj putanji je sada drugi PDF.
+        source_url = checkpoint.get('source_url')
+        previous_state = self.organizer.load_page_state(pdf_path.stem)
+        previous_pages = None
+        if previous_state and _same_source(previous_state.get('source'), source_url):
+            previous_pages = previous_state['pages']
+
+        menu_data = self._iter_days(pdf_path, previous_pages, progress)
+        pages = self.parser.last_pages
+
+        if previous_pages and _menu_month(previous_pages) != _menu_month(pages):
+            # Isti fajl, ali jelovnik za drugi mesec (npr. novembarski PDF sačuvan kao oktobarski) -
+            # datumi prethodnog meseca nisu uklonjeni, samo ih ovaj PDF ne sadrži
+            logger.warning(f"{pdf_path.name}: prethodno stanje je za {_menu_month(previous_pages)}, "
+                           f"PDF je za {_menu_month(pages)} - parsiram ceo PDF bez uklanjanja dana")
+            previous_pages = None
+            menu_data = self._iter_days(pdf_path, None, progress)
+            pages = self.parser.last_pages
+
+        removed_dates = self.parser.removed_dates(previous_pages or [], pages)
+        result['parse_mode'] = self.parser.last_parse_mode
+
+        if not menu_data and not removed_dates:
+            return 'unchanged' if previous_pages else 'empty'
+
+        checkpoint.update(menu_data=menu_data, removed_dates=removed_dates, pages=pages,
+                          parse_mode=result['parse_mode'])
+        result.update(menu_data=menu_data, removed_dates=removed_dates)
+        return None
+
+    def _iter_days(self, pdf_path: Path, previous_pages: Optional[List[Dict]],
+                   progress: Optional[ProgressCallback]) -> Dict[str, Dict]:
+        menu_data = {}
+        for day_data in self.parser.iter_days(pdf_path, previous_pages):
+            menu_data[day_data['date']] = day_data
+            if progress:
+                progress('parse', len(menu_data), day_data['date'])
+        return menu_data
+
+    def _organize(self, checkpoint: Dict, result: Dict, progress: Optional[ProgressCallback]) -> Optional[str]:
+        pdf_path = Path(checkpoint['pdf_path'])
+        menu_data = checkpoint['menu_data']
+        removed_dates: List[str] = checkpoint.get('removed_dates') or []
+
+        # Uklanja se samo dan iz meseca koji ovaj PDF pokriva - ostali su u PDF-u drugog meseca
+        pages = checkpoint.get('pages')
+        months = {date[:7] for page in pages for date in page['dates']} if pages is not None \
+            else {date[:7] for date in menu_data}
+        removed_dates = [date for date in removed_dates if date[:7] in months]
+        result.update(pdf_path=pdf_path, menu_data=menu_data, removed_dates=removed_dates,
+                      parse_mode=checkpoint.get('parse_mode'))
+
+        # Prethodna verzija dana iz istih meseci - za poređenje po danima i obrocima
+        previous_data = {}
+        for month_key in sorted({date[:7] for date in list(menu_data) + removed_dates}):
+            year, month = (int(part) for part in month_key.split('-'))
+            previous_data.update(self.organizer.load_structured_data(year, month) or {})
+        result['menu_diff'] = MenuDiff(previous_data, menu_data, removed_dates, months)
+
+        # Svi fajlovi se objavljuju zajedno na kraju bloka - čitaoci ne vide polovičan upis
+        with self.organizer.batch():
+            if self.organizer.export_daily:
+                self.organizer.create_daily_markdown_files(menu_data)
+            self.organizer.remove_day_files(removed_dates)
+            self.organizer.save_structured_data(menu_data, removed_dates)
+            if checkpoint.get('pages') is not None:
+                self.organizer.save_page_state(pdf_path.stem, checkpoint['pages'], checkpoint.get('source_url'))
+
+            # Mesečni sumar za svaki mesec iz PDF-a (ceo mesec, i nepromenjeni dani)
+            result['summaries'] = self.organizer.create_monthly_summaries(menu_data, removed_dates)
+
+            allergen_index = AllergenIndex(self.allergen_index_file)
+            allergen_index.update(menu_data, removed_dates)
+            allergen_index.save(self.organizer)
+
+        result['changed_files'] = len(self.organizer.last_batch_changed)
+        return None
+
+
+def _same_source(previous: Optional[str], current: Optional[str]) -> bool:
+    """Da li je PDF iz istog izvora - nepoznat URL (stariji zapis, PDF bez scraper-a) se ne poredi"""
+    return previous is None or current is None or previous == current
+
+
+def _menu_month(pages: List[Dict]) -> Optional[str]:
+    """Mesec jelovnika (YYYY-MM) - mesec kome pripada najviše datuma sa stranica"""
+    months = Counter(date[:7] for page in pages for date in page['dates'])
+    return months.most_common(1)[0][0] if months else None
+
+
+def _parse_pdf_timed(pdf_path: Path) -> Dict:
+    """Parsira jedan PDF u posebnom procesu i meri trajanje"""
+    from src.pdf_parser import MenuParser
+
+    start = time.perf_counter()
+    parser = MenuParser()
+    menu_data = parser.parse_pdf(pdf_path)
+    return {
+        'menu_data': menu_data,
+        'seconds': round(time.perf_counter() - start, 3),
+        'mode': parser.last_parse_mode,
+    }
+
+
+class BatchIngest:
+    """Parsiranje skupa sačuvanih PDF-ova (direktorijum ili glob) bez preuzimanja sa sajta
+
+    PDF-ovi se parsiraju u pool-u procesa, a rezultat svakog fajla se upisuje
+    čim je na redu (strukturisani JSON, pakovani mesec, mesečni sumar i feed-ovi).
+    Izveštaj po fajlu (status, trajanje, broj dana, greška) čuva se posle
+    svakog fajla, pa prekinuto pokretanje nastavlja sa fajlovima koji nisu
+    obrađeni ili su se promenili (veličina/vreme izmene).
+    """
+
+    def __init__(self, organizer: Optional[DataOrganizer] = None, workers: Optional[int] = None,
+                 report_file: Optional[Path] = None):
+        """
+        Args:
+            organizer: DataOrganizer za upis rezultata
+            workers: Broj procesa za parsiranje (None = broj jezgara)
+            report_file: JSON izveštaj po fajlu (podrazumevano data/batch_report.json)
+        """
+        self.organizer = organizer or DataOrganizer()
+        self.workers = workers
+        self.report_file = report_file or self.organizer.output_dir.parent / "batch_report.json"
+        self.allergen_index_file = self.organizer.output_dir.parent / "allergen_index.json"
+
+    @staticmethod
+    def collect(sources: List[str]) -> List[Path]:
+        """PDF-ovi iz direktorijuma (svi *.pdf) ili glob obrazaca (i apsolutnih, sa ~ i **), sortirani i bez duplikata"""
+        pdfs = set()
+        for source in sources:
+            source = os.path.expanduser(source)
+            path = Path(source)
+            if path.is_dir():
+                pdfs.update(path.glob("*.pdf"))
+            elif path.is_file():
+                pdfs.add(path)
+            else:
+                # glob.glob prihvata i apsolutne obrasce ("/arhiva/2023-*.pdf"), a ** samo uz recursive
+                pdfs.update(Path(match) for match in glob.glob(source, recursive=True)
+                            if match.lower().endswith('.pdf'))
+        return sorted(pdfs)
+
+    def load_report(self) -> Dict[str, Dict]:
+        """Izveštaj prethodnog pokretanja: putanja PDF-a -> stavka"""
+        if not self.report_file.exists():
+            return {}
+        try:
+            with open(self.report_file, 'r', encoding='utf-8') as f:
+                return {entry['path']: entry for entry in json.load(f).get('files', [])}
+        except Exception as e:
+            logger.error(f"Greška pri učitavanju izveštaja {self.report_file}: {e}")
+            return {}
+
+    def _save_report(self, entries: Dict[str, Dict]):
+        files = sorted(entries.values(), key=lambda entry: entry['path'])
+        report = {
+            'updated': datetime.now().isoformat(timespec='seconds'),
+            'files': files,
+            'ok': sum(1 for entry in files if entry['status'] == 'ok'),
+            'failed': sum(1 for entry in files if entry['status'] != 'ok'),
+        }
+        atomic_write_text(self.report_file, json.dumps(report, indent=2, ensure_ascii=False))
+
+    @staticmethod
+    def _signature(pdf_path: Path) -> Dict:
+        stat = pdf_path.stat()
+        return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+    def pending(self, pdfs: List[Path], resume: bool = True) -> List[Path]:
+        """PDF-ovi koje treba obraditi - bez uspešno obrađenih i nepromenjenih iz prethodnog izveštaja"""
+        if not resume:
+            return list(pdfs)
+        report = self.load_report()
+        return [
+            pdf_path for pdf_path in pdfs
+            if not (report.get(str(pdf_path), {}).get('status') == 'ok'
+                    and report[str(pdf_path)].get('signature') == self._signature(pdf_path))
+        ]
+
+    def _write(self, menu_data: Dict[str, Dict], allergen_index: AllergenIndex):
+        try:
+            with self.organizer.batch():
+                self.organizer.save_structured_data(menu_data)
+                if self.organizer.export_daily:
+                    self.organizer.create_daily_markdown_files(menu_data)
+                self.organizer.create_monthly_summaries(menu_data)
+                allergen_index.update(menu_data)
+                allergen_index.save(self.organizer)
+        except Exception:
+            # Dani neuspelog fajla ne smeju da uđu u indeks sledećeg fajla
+            allergen_index.reload()
+            raise
+
+    def run(self, pdfs: List[Path], resume: bool = True,
+            progress: Optional[Callable[[int, int, Dict], None]] = None) -> Dict:
+        """Parsiraj i upiši PDF-ove
+
+        Args:
+            pdfs: PDF fajlovi (npr. iz collect())
+            resume: Preskoči fajlove koji su uspešno obrađeni u prethodnom pokretanju
+            progress: Opciona funkcija (obrađeno, ukupno, stavka izveštaja) posle svakog fajla
+
+        Returns:
+            Dict sa brojem fajlova (total, skipped, ok, failed), dana, trajanjem i stavkama izveštaja
+        """
+        entries = self.load_report() if resume else {}
+        todo = self.pending(pdfs, resume)
+        allergen_index = AllergenIndex(self.allergen_index_file)
+        processed = []
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(_parse_pdf_timed, pdf_path) for pdf_path in todo]
+
+            # Parsiranje teče paralelno, a upis redom kojim su fajlovi zadati - ako dva PDF-a
+            # sadrže isti dan, pobeđuje kasniji, nezavisno od toga koji je proces prvi završio
+            for pdf_path, future in zip(todo, futures):
+                entry = {'path': str(pdf_path), 'signature': self._signature(pdf_path)}
+
+                try:
+                    parsed = future.result()
+                    entry.update(seconds=parsed['seconds'], mode=parsed['mode'], days=len(parsed['menu_data']))
+                    if parsed['menu_data']:
+                        write_start = time.perf_counter()
+                        self._write(parsed['menu_data'], allergen_index)
+                        entry.update(status='ok', write_seconds=round(time.perf_counter() - write_start, 3))
+                    else:
+                        entry.update(status='empty', error="PDF ne sadrži podatke o jelovniku")
+                except Exception as e:
+                    logger.error(f"Greška pri obradi {pdf_path}: {e}")
+                    entry.update(status='error', error=str(e))
+
+                entries[entry['path']] = entry
+                self._save_report(entries)
+                processed.append(entry)
+                if progress:
+                    progress(len(processed), len(todo), entry)
+
+        return {
+            'total': len(pdfs),
+            'skipped': len(pdfs) - len(todo),
+            'ok': sum(1 for entry in processed if entry['status'] == 'ok'),
+            'failed': sum(1 for entry in processed if entry['status'] != 'ok'),
+            'days': sum(entry.get('days', 0) for entry in processed if entry['status'] == 'ok'),
+            'seconds': round(time.perf_counter() - start, 3),
+            'files': processed,
+        }
@@ -0,0 +1,272 @@
+"""
+Modul za test opterećenja bota - sintetički update-i kroz pravi Application, bez mreže
+
+Update-i (komande, dugmići sa tastature, mention u grupi, callback dugmad) prolaze
+kroz iste handlere kao u produkciji, a Bot API pozivi idu u FakeBotAPI koji
+simulira kašnjenje, 429 odgovore i blokirane korisnike. Meri se trajanje obrade svakog update-a.
+"""
+import asyncio
+import logging
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from telegram import Update
+
+from src.data_organizer import DataOrganizer
+from src.fake_telegram import FakeBotAPI
+from src.metrics import SEND_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Udeo tipova update-a u mešovitom scenariju
+DEFAULT_MIX = {
+    'command': 0.3,
+    'keyboard': 0.4,
+    'group_mention': 0.15,
+    'callback': 0.15,
+}
+
+COMMANDS = ['/danas', '/sutra', '/nedelja', '/jelovnik']
+KEYBOARD_BUTTONS = ['🍽️ Danas', '📅 Sutra', '🗓️ Nedelja']
+GROUP_TEXTS = ['danas', 'sutra', 'nedelja']
+CALLBACKS = ['today', 'tomorrow']
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil (nearest-rank) iz sortirane liste"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def seed_current_menus(source: DataOrganizer, target: DataOrganizer, now: Optional[datetime] = None) -> int:
+    """Prepiši poznate dane na radne dane tekućeg i sledećeg meseca
+
+    Load test radi sa datumom `now`, a sačuvani jelovnici su iz prošlih meseci -
+    bez ovoga bi svaki zahtev završio na "nema jelovnika" putanji.
+    """
+    now = now or datetime.now()
+    known = list(source.load_all_menus().values())
+    if not known:
+        return 0
+
+    first = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    after_next = (first + timedelta(days=62)).replace(day=1)
+
+    seeded = {}
+    day = first
+    while day < after_next:
+        if day.weekday() < 5:
+            date_str = day.strftime('%Y-%m-%d')
+            template = known[len(seeded) % len(known)]
+            seeded[date_str] = dict(template, date=date_str)
+        day += timedelta(days=1)
+
+    with target.batch():
+        target.save_structured_data(seeded)
+    return len(seeded)
+
+
+class SyntheticUpdates:
+    """Generator sintetičkih update-a u obliku koji šalje Telegram"""
+
+    def __init__(self, bot_username: str = "klopasbot", seed: Optional[int] = None):
+        self.bot_username = bot_username
+        self.random = random.Random(seed)
+        self._update_id = 0
+
+    def _next_id(self) -> int:
+        self._update_id += 1
+        return self._update_id
+
+    def _user(self, user_id: int) -> Dict:
+        return {'id': user_id, 'is_bot': False, 'first_name': f"Korisnik {user_id}", 'username': f"user{user_id}"}
+
+    def _message(self, chat: Dict, user_id: int, text: str, entities: Optional[List[Dict]] = None) -> Dict:
+        message = {
+            'message_id': self._next_id(),
+            'date': int(time.time()),
+            'chat': chat,
+            'from': self._user(user_id),
+            'text': text,
+        }
+        if entities:
+            message['entities'] = entities
+        return message
+
+    def command(self, user_id: int, text: str = '/danas') -> Dict:
+        chat = {'id': user_id, 'type': 'private'}
+        entities = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return {'update_id': self._next_id(), 'message': self._message(chat, user_id, text, entities)}
+
+    def keyboard(self, user_id: int, text: str = '🍽️ Danas') -> Dict:
+        chat = {'id': user_id, 'type': 'private'}
+        return {'update_id': self._next_id(), 'message': self._message(chat, user_id, text)}
+
+    def group_mention(self, chat_id: int, user_id: int, text: str = 'danas') -> Dict:
+        mention = f"@{self.bot_username}"
+        chat = {'id': chat_id, 'type': 'group', 'title': f"Grupa {chat_id}"}
+        # Offset/dužina entiteta su u UTF-16 jedinicama - mention je na početku i ASCII je
+        entities = [{'type': 'mention', 'offset': 0, 'length': len(mention)}]
+        return {'update_id': self._next_id(), 'message': self._message(chat, user_id, f"{mention} {text}", entities)}
+
+    def callback(self, user_id: int, data: str = 'today') -> Dict:
+        chat = {'id': user_id, 'type': 'private'}
+        return {
+            'update_id': self._next_id(),
+            'callback_query': {
+                'id': str(self._next_id()),
+                'from': self._user(user_id),
+                'chat_instance': str(user_id),
+                'data': data,
+                'message': {
+                    'message_id': self._next_id(),
+                    'date': int(time.time()),
+                    'chat': chat,
+                    'from': {'id': 1, 'is_bot': True, 'first_name': 'Klopas', 'username': self.bot_username},
+                    'text': 'Izaberite opciju',
+                },
+            },
+        }
+
+    def mixed(self, count: int, users: int, mix: Optional[Dict[str, float]] = None) -> List[Dict]:
+        """Mešavina svih tipova update-a od `users` različitih korisnika"""
+        mix = mix or DEFAULT_MIX
+        kinds = list(mix)
+        weights = [mix[kind] for kind in kinds]
+
+        updates = []
+        for _ in range(count):
+            user_id = self.random.randint(1, users) + 1000
+            kind = self.random.choices(kinds, weights)[0]
+            if kind == 'command':
+                updates.append(self.command(user_id, self.random.choice(COMMANDS)))
+            elif kind == 'keyboard':
+                updates.append(self.keyboard(user_id, self.random.choice(KEYBOARD_BUTTONS)))
+            elif kind == 'group_mention':
+                chat_id = -1000 - self.random.randint(1, max(1, users // 20))
+                updates.append(self.group_mention(chat_id, user_id, self.random.choice(GROUP_TEXTS)))
+            else:
+                updates.append(self.callback(user_id, self.random.choice(CALLBACKS)))
+        return updates
+
+    def morning_rush(self, users: int) -> List[Dict]:
+        """Svaki korisnik jednom tapne "🍽️ Danas" (jutarnji talas)"""
+        return [self.keyboard(user_id + 1000) for user_id in range(1, users + 1)]
+
+
+class LoadTestRunner:
+    """Propušta update-e kroz Application bota i meri latenciju i protok"""
+
+    def __init__(self, bot, api: FakeBotAPI):
+        """
+        Args:
+            bot: KlopasBot usmeren na api (FakeTelegramRequest ili FakeBotAPIServer)
+            api: Lažni Bot API (brojanje poziva i 429 odgovora)
+        """
+        self.bot = bot
+        self.api = api
+        self.handler_errors: List[str] = []
+        bot.application.add_error_handler(self._on_error)
+
+    async def _on_error(self, update, context):
+        # Application hvata izuzetke iz handlera - ovde se samo prebrojavaju
+        self.handler_errors.append(type(context.error).__name__)
+
+    async def _process(self, update_data: Dict, semaphore: asyncio.Semaphore,
+                       latencies: List[float], errors: List[str]):
+        application = self.bot.application
+        async with semaphore:
+            update = Update.de_json(update_data, application.bot)
+            start = time.perf_counter()
+            try:
+                await application.process_update(update)
+            except Exception as e:
+                errors.append(type(e).__name__)
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+    async def run_updates(self, updates: List[Dict], concurrency: int = 64) -> Dict:
+        """Obradi update-e sa najviše `concurrency` istovremenih handlera"""
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+        errors: List[str] = []
+        calls_before = len(self.api.calls)
+        handler_errors_before = len(self.handler_errors)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(self._process(update, semaphore, latencies, errors) for update in updates))
+        duration = time.perf_counter() - start
+
+        errors += self.handler_errors[handler_errors_before:]
+        return self._report(latencies, duration, errors, self.api.calls[calls_before:])
+
+    async def run_broadcast(self, recipients: int) -> Dict:
+        """Pošalji poruku `recipients` korisnika kroz _send_to_users"""
+        calls_before = len(self.api.calls)
+        retries_before = SEND_RETRIES.value()
+        user_ids = list(range(1001, 1001 + recipients))
+
+        start = time.perf_counter()
+        success, failed = await self.bot._send_to_users(self.bot.application.bot, user_ids, "🍽️ Load test")
+        duration = time.perf_counter() - start
+
+        report = self._report([], duration, [], self.api.calls[calls_before:])
+        report.update({
+            'recipients': recipients,
+            'sent': success,
+            'failed': failed,
+            'retried': int(SEND_RETRIES.value() - retries_before),
+            'messages_per_second': round(recipients / duration, 1) if duration > 0 else 0.0,
+        })
+        return report
+
+    def _report(self, latencies: List[float], duration: float, errors: List[str], calls: List[Dict]) -> Dict:
+        ordered = sorted(latencies)
+        report = {
+            'updates': len(latencies),
+            'duration_s': round(duration, 3),
+            'throughput_per_s': round(len(latencies) / duration, 1) if duration > 0 and latencies else 0.0,
+            'errors': len(errors),
+            'error_types': sorted(set(errors)),
+            'api_calls': len(calls),
+            'api_rate_limited': sum(1 for call in calls if call['status'] == 429),
+            'api_blocked': sum(1 for call in calls if call['status'] == 403),
+        }
+        if ordered:
+            report.update({
+                'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+                'max_ms': round(ordered[-1] * 1000, 2),
+            })
+        return report
+
+    async def run(self, scenarios: List[str], updates: int, users: int, concurrency: int,
+                  broadcast: int = 0, seed: Optional[int] = None) -> Dict[str, Dict]:
+        """Pokreni scenarije ('mixed', 'morning') i opcioni broadcast, vrati izveštaj po scenariju"""
+        application = self.bot.application
+        generator = SyntheticUpdates(self.api.bot_username, seed=seed)
+        results = {}
+
+        await application.initialize()
+        try:
+            for scenario in scenarios:
+                if scenario == 'morning':
+                    batch = generator.morning_rush(users)
+                else:
+                    batch = generator.mixed(updates, users)
+                logger.info(f"Scenario '{scenario}': {len(batch)} update-a, konkurentnost {concurrency}")
+                results[scenario] = await self.run_updates(batch, concurrency)
+
+            if broadcast:
+                logger.info(f"Broadcast: {broadcast} primalaca")
+                results['broadcast'] = await self.run_broadcast(broadcast)
+        finally:
+            await application.shutdown()
+
+        return results
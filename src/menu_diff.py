@@ -0,0 +1,126 @@
+"""
+Modul za poređenje dve verzije jelovnika po danima i obrocima
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from telegram.helpers import escape_markdown
+
+logger = logging.getLogger(__name__)
+
+MEAL_LABELS = {
+    'doručak': '🥐 Doručak',
+    'užina_i': '🍎 Užina I',
+    'ručak': '🍲 Ručak',
+    'užina_ii': '🍪 Užina II',
+}
+
+DAYS_SR = {
+    0: 'Ponedeljak', 1: 'Utorak', 2: 'Sreda',
+    3: 'Četvrtak', 4: 'Petak', 5: 'Subota', 6: 'Nedelja'
+}
+
+
+class MenuDiff:
+    """Razlike između prethodnog i novog menu_data, po danu i obroku
+
+    Porede se samo dani koji su u novom parsiranju (i obrisani dani) - dani
+    sa nepromenjenih stranica ne ulaze u poređenje.
+    """
+
+    def __init__(self, old: Dict[str, Dict], new: Dict[str, Dict], removed_dates: Iterable[str] = (),
+                 months: Optional[Iterable[str]] = None):
+        """
+        Args:
+            old: Prethodni podaci (npr. iz data/menus)
+            new: Novoparsirani dani
+            removed_dates: Datumi koji su uklonjeni iz jelovnika
+            months: Meseci (YYYY-MM) koje PDF pokriva - uklonjen datum iz drugog meseca nije
+                izbačen iz jelovnika, nego je PDF za drugi mesec (None = bez provere)
+        """
+        # date -> {'status': 'added'|'changed'|'removed', 'meals': {obrok: (staro, novo)}}
+        self.changes: Dict[str, Dict] = {}
+
+        for date_str, day_data in new.items():
+            old_day = old.get(date_str)
+            if old_day is None:
+                self.changes[date_str] = {'status': 'added', 'meals': {}}
+                continue
+
+            meals = self._diff_meals(old_day.get('meals', {}), day_data.get('meals', {}))
+            if meals:
+                self.changes[date_str] = {'status': 'changed', 'meals': meals}
+
+        months = set(months) if months is not None else None
+        for date_str in removed_dates:
+            if months is not None and date_str[:7] not in months:
+                logger.warning(f"{date_str} nije u mesecima PDF-a - ne prijavljuje se kao uklonjen")
+                continue
+            if date_str in old:
+                self.changes[date_str] = {'status': 'removed', 'meals': {}}
+
+        self.changes = dict(sorted(self.changes.items()))
+
+    def _diff_meals(self, old_meals: Dict, new_meals: Dict) -> Dict:
+        meals = {}
+        for meal in MEAL_LABELS:
+            old_value = ', '.join(old_meals.get(meal) or [])
+            new_value = ', '.join(new_meals.get(meal) or [])
+            if old_value != new_value:
+                meals[meal] = (old_value, new_value)
+        return meals
+
+    def changed_dates(self) -> List[str]:
+        """Datumi koji su postojali ranije, a sada su izmenjeni ili uklonjeni"""
+        return [date for date, change in self.changes.items() if change['status'] != 'added']
+
+    def added_dates(self) -> List[str]:
+        return [date for date, change in self.changes.items() if change['status'] == 'added']
+
+    def upcoming_changes(self, now: Optional[datetime] = None, hours: int = 48) -> List[str]:
+        """Izmenjeni datumi od danas do now + hours"""
+        now = now or datetime.now()
+        first = now.strftime('%Y-%m-%d')
+        last = (now + timedelta(hours=hours)).strftime('%Y-%m-%d')
+        return [date for date in self.changed_dates() if first <= date <= last]
+
+    def format_summary(self) -> str:
+        """Kratak spisak izmenjenih dana za izveštaj o preuzimanju"""
+        changed = self.changed_dates()
+        if not changed:
+            return ""
+
+        lines = []
+        for date_str in changed:
+            change = self.changes[date_str]
+            date_label = datetime.strptime(date_str, '%Y-%m-%d').strftime('%d.%m.')
+            if change['status'] == 'removed':
+                lines.append(f"{date_label} (uklonjen)")
+            else:
+                meals = ', '.join(MEAL_LABELS[meal].split(' ', 1)[1] for meal in change['meals'])
+                lines.append(f"{date_label} ({meals})")
+
+        return "🔁 Izmenjeni dani: " + "; ".join(lines)
+
+    def format_notification(self, dates: List[str]) -> str:
+        """Jedna kompaktna poruka 'izmena jelovnika' za date datume"""
+        message = "🔁 *Izmena jelovnika*\n"
+
+        for date_str in dates:
+            change = self.changes[date_str]
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+            message += f"\n*{DAYS_SR[date_obj.weekday()]}, {date_obj.strftime('%d.%m.%Y.')}*\n"
+
+            if change['status'] == 'removed':
+                message += "   • Dan je uklonjen iz jelovnika\n"
+                continue
+
+            # Tekst jela je iz PDF-a - '_', '*', '`' i '[' se escape-uju. U legacy Markdown-u
+            # escape ne radi unutar entiteta, pa je stara vrednost van kurziva.
+            for meal, (old_value, new_value) in change['meals'].items():
+                message += f"{MEAL_LABELS[meal]}: {escape_markdown(new_value) if new_value else '-'}\n"
+                if old_value:
+                    message += f"   _ranije:_ {escape_markdown(old_value)}\n"
+
+        return message
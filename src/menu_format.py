@@ -0,0 +1,46 @@
+"""
+Modul za formatiranje dnevnog jelovnika u Telegram poruku
+
+Ne zavisi od stanja bota, pa ga koriste i bot i benchmark (bez uvoza
+telegram_bot modula i otvaranja bot.log-a).
+"""
+from datetime import datetime
+
+from src.menu_diff import DAYS_SR
+
+
+def format_menu_message(markdown_content: str, date: datetime) -> str:
+    """Formatira markdown sadržaj dana u Telegram poruku"""
+
+    lines = markdown_content.split('\n')
+
+    day_name = DAYS_SR[date.weekday()]
+    formatted_date = date.strftime('%d.%m.%Y.')
+
+    message = f"🍽️ *Jelovnik za {day_name}, {formatted_date}*\n\n"
+
+    current_meal = None
+    for line in lines:
+        line = line.strip()
+
+        if line.startswith('## Doručak'):
+            current_meal = '🥐 *Doručak:*\n'
+            message += current_meal
+        elif line.startswith('## Užina I'):
+            current_meal = '🍎 *Užina I:*\n'
+            message += '\n' + current_meal
+        elif line.startswith('## Ručak'):
+            current_meal = '🍲 *Ručak:*\n'
+            message += '\n' + current_meal
+        elif line.startswith('## Užina II'):
+            current_meal = '🍪 *Užina II:*\n'
+            message += '\n' + current_meal
+        elif line.startswith('- ') and current_meal:
+            # Ukloni "- " i dodaj sa boljim formatiranjem
+            item = line[2:]
+            # Skrati ako je predugačko
+            if len(item) > 100:
+                item = item[:100] + '...'
+            message += f"   • {item}\n"
+
+    return message
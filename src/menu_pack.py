@@ -0,0 +1,102 @@
+"""
+Modul za pakovani mesečni fajl jelovnika (data/packed/YYYY-MM.pack)
+
+Format:
+    zaglavlje   - magic "KLPK", verzija (u16), broj slotova (u16)
+    indeks      - 31 slot (offset u32, dužina u32), slot = dan u mesecu - 1
+    zapisi      - renderovani markdown dana (UTF-8), jedan za drugim
+
+Dužina 0 znači da za taj dan nema jelovnika. Čitanje dana je jedan slice
+iz mmap-a - bez parsiranja i bez otvaranja fajla po danu.
+"""
+import logging
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+PACK_MAGIC = b'KLPK'
+PACK_VERSION = 1
+PACK_SLOTS = 31
+
+_HEADER = struct.Struct('<4sHH')
+_SLOT = struct.Struct('<II')
+_INDEX_OFFSET = _HEADER.size
+_DATA_OFFSET = _INDEX_OFFSET + PACK_SLOTS * _SLOT.size
+
+
+def build_pack(records: Dict[int, str]) -> bytes:
+    """Spakuj renderovane dane jednog meseca
+
+    Args:
+        records: Dan u mesecu (1-31) -> renderovani markdown
+    """
+    index = bytearray(PACK_SLOTS * _SLOT.size)
+    data = bytearray()
+
+    for day, content in sorted(records.items()):
+        encoded = content.encode('utf-8')
+        _SLOT.pack_into(index, (day - 1) * _SLOT.size, _DATA_OFFSET + len(data), len(encoded))
+        data += encoded
+
+    return _HEADER.pack(PACK_MAGIC, PACK_VERSION, PACK_SLOTS) + bytes(index) + bytes(data)
+
+
+class MenuPackReader:
+    """Čitanje dana iz pakovanih mesečnih fajlova preko mmap-a
+
+    Mapiranja se čuvaju po mesecu. Upis menja fajl rename-om, pa postojeće
+    mapiranje i dalje vidi staru verziju - posle nove generacije podataka
+    pozovite reset().
+    """
+
+    def __init__(self, packed_dir: Path = Path("data/packed")):
+        self.packed_dir = packed_dir
+        self._maps: Dict[str, Optional[mmap.mmap]] = {}
+
+    def _month_map(self, month_key: str) -> Optional[mmap.mmap]:
+        if month_key in self._maps:
+            CACHE_REQUESTS.inc(cache='pack', result='hit')
+            return self._maps[month_key]
+        CACHE_REQUESTS.inc(cache='pack', result='miss')
+
+        pack_map = None
+        filepath = self.packed_dir / f"{month_key}.pack"
+        try:
+            with open(filepath, 'rb') as f:
+                pack_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, slots = _HEADER.unpack_from(pack_map, 0)
+            if magic != PACK_MAGIC or version != PACK_VERSION or slots != PACK_SLOTS:
+                logger.error(f"Neispravno zaglavlje pakovanog fajla: {filepath}")
+                pack_map.close()
+                pack_map = None
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Greška pri otvaranju {filepath}: {e}")
+            pack_map = None
+
+        self._maps[month_key] = pack_map
+        return pack_map
+
+    def get(self, date_str: str) -> Optional[str]:
+        """Renderovani markdown za datum (YYYY-MM-DD), ili None ako ga nema u paketu"""
+        pack_map = self._month_map(date_str[:7])
+        if pack_map is None:
+            return None
+
+        offset, length = _SLOT.unpack_from(pack_map, _INDEX_OFFSET + (int(date_str[8:10]) - 1) * _SLOT.size)
+        if not length:
+            return None
+        return pack_map[offset:offset + length].decode('utf-8')
+
+    def reset(self):
+        """Zatvori sva mapiranja - sledeće čitanje otvara aktuelne fajlove"""
+        for pack_map in self._maps.values():
+            if pack_map is not None:
+                pack_map.close()
+        self._maps = {}
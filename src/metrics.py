@@ -0,0 +1,251 @@
+"""
+Modul za metrike bota - registar u procesu i HTTP endpoint u Prometheus text formatu
+"""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Podrazumevane granice histograma (sekunde) - od brzog čitanja keša do preuzimanja PDF-a
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Zajednička osnova - vrednosti po kombinaciji labela, zaštićene lock-om"""
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines += self._render_value(key, value)
+        return lines
+
+    def _render_value(self, key, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][index] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Izmeri trajanje bloka (i kada blok baci izuzetak)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_value(self, key, state) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state['counts']):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registar metrika - metrika se kreira pri prvom traženju i posle se deli"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """Sve metrike u Prometheus text formatu (verzija 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HANDLER_DURATION = REGISTRY.histogram(
+    'klopas_handler_duration_seconds', 'Trajanje obrade Telegram handlera', ['handler'])
+HANDLER_ERRORS = REGISTRY.counter(
+    'klopas_handler_errors_total', 'Izuzeci iz Telegram handlera', ['handler'])
+TELEGRAM_API_DURATION = REGISTRY.histogram(
+    'klopas_telegram_api_duration_seconds', 'Trajanje poziva Telegram Bot API-ja', ['method', 'status'])
+SAVE_STATS_DURATION = REGISTRY.histogram(
+    'klopas_save_stats_duration_seconds', 'Trajanje upisa user_stats.json')
+SAVE_STATS_BYTES = REGISTRY.histogram(
+    'klopas_save_stats_bytes', 'Veličina upisanog user_stats.json', buckets=BYTES_BUCKETS)
+BROADCAST_DURATION = REGISTRY.histogram(
+    'klopas_broadcast_duration_seconds', 'Trajanje slanja poruke listi korisnika')
+BROADCAST_MESSAGES = REGISTRY.counter(
+    'klopas_broadcast_messages_total', 'Poruke poslate u broadcast-u', ['status'])
+BROADCAST_THROUGHPUT = REGISTRY.gauge(
+    'klopas_broadcast_last_throughput_messages_per_second', 'Protok poslednjeg broadcast-a')
+SEND_FAILURES = REGISTRY.counter(
+    'klopas_send_failures_total', 'Neuspela slanja poruka po tipu greške', ['reason'])
+SEND_RETRIES = REGISTRY.counter(
+    'klopas_send_retries_total', 'Ponovljena slanja posle 429 (retry_after)')
+INGEST_STAGE_DURATION = REGISTRY.histogram(
+    'klopas_ingest_stage_duration_seconds', 'Trajanje faza preuzimanja jelovnika', ['stage'])
+CACHE_REQUESTS = REGISTRY.counter(
+    'klopas_cache_requests_total', 'Pristupi keševima', ['cache', 'result'])
+POLLING_ERRORS = REGISTRY.counter(
+    'klopas_polling_errors_total', 'Greške pri polling-u (getUpdates) po tipu', ['error'])
+CLUSTER_LEADER = REGISTRY.gauge(
+    'klopas_cluster_leader', 'Da li ovaj proces drži zakup vođe (1) ili ne (0)')
+POLLING_RECONNECTS = REGISTRY.counter(
+    'klopas_polling_reconnects_total', 'Ponovna povezivanja mrežnog sloja bez restarta procesa', ['reason'])
+
+
+def timed_handler(func: Callable) -> Callable:
+    """Dekorator - meri trajanje (async) handlera u klopas_handler_duration_seconds"""
+    name = func.__name__
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                HANDLER_ERRORS.inc(handler=name)
+                raise
+            finally:
+                HANDLER_DURATION.observe(time.perf_counter() - start, handler=name)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with HANDLER_DURATION.time(handler=name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrape svakih par sekundi ne treba da puni bot.log
+        pass
+
+
+class MetricsServer:
+    """HTTP endpoint /metrics u pozadinskoj niti (samo lokalno, podrazumevano 127.0.0.1)"""
+
+    def __init__(self, port: int, host: str = '127.0.0.1', registry: Optional[MetricsRegistry] = None):
+        handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry or REGISTRY})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics-server', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        logger.info(f"Metrike dostupne na http://{host}:{port}/metrics")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,17 +1,69 @@
 import pdfplumber
 import PyPDF2
+from pdfminer.pdftypes import resolve1
 from pathlib import Path
+import hashlib
+import json
 import logging
 import re
-from typing import Dict, List, Optional
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tokeni ćelije jednog dana: zaglavlja obroka (sa opcionom crticom) i nazivi dana (sa opcionim datumom).
+# VAŽNO: \b ispred RUČAK/DORUČAK da "RUČAK" ne bi matchovao unutar "DORUČAK";
+# UŽINA II mora biti pre UŽINA I u alternaciji.
+_TOKEN_RE = re.compile(
+    r'(?P<meal>\bDORUČAK|UŽINA\s*II|UŽINA\s*I|\bRUČAK)(?P<separator>\s*[–-]\s*)?'
+    r'|(?P<day>PONEDELJAK|UTORAK|SREDA|ČETVRTAK|PETAK)(?:\s+(?P<date>\d{1,2}\.\d{1,2}\.\d{4}))?',
+    re.IGNORECASE
+)
+# Zaglavlje dana u tekstualnom sloju - početak bloka jednog dana
+_DAY_HEADER_RE = re.compile(
+    r'(PONEDELJAK|UTORAK|SREDA|ČETVRTAK|PETAK)\s+(\d{1,2}\.\d{1,2}\.\d{4})\.?',
+    re.IGNORECASE
+)
+_LAST_MEAL_RE = re.compile(r'^\s*UŽINA\s*II', re.IGNORECASE)
+# Margina oko leve kolone da ivice tabele ostanu u isečku
+_COLUMN_PADDING = 2
+_MEAL_KEYS = {
+    'DORUČAK': 'doručak',
+    'UŽINAI': 'užina_i',
+    'RUČAK': 'ručak',
+    'UŽINAII': 'užina_ii',
+}
+
+
+def _parse_page_range(pdf_path: Path, start: int, end: int,
+                      bbox: Optional[Tuple[float, float, float, float]] = None) -> Dict[str, Dict]:
+    """Parsira stranice [start, end) u posebnom procesu - svaki proces otvara PDF zasebno"""
+    return MenuParser().parse_pages(pdf_path, start, end, bbox)
+
 
 class MenuParser:
-    def __init__(self):
+    # Keš leve kolone po otisku rasporeda stranice - deljen između instanci u procesu
+    _layout_cache: Dict[str, List[float]] = {}
+
+    def __init__(self, workers: int = 1, text_layer: bool = True, column_crop: bool = True,
+                 layout_cache_file: Optional[Path] = None):
+        """
+        Args:
+            workers: Broj procesa za paralelno parsiranje stranica (1 = serijski)
+            text_layer: Prvo probaj brzo čitanje tekstualnog sloja pre detekcije tabela
+            column_crop: Detekcija tabela samo u levoj koloni (isečak stranice)
+            layout_cache_file: Fajl za trajni keš leve kolone (None = samo u memoriji). Zadaje ga
+                pozivalac (DataOrganizer.layout_cache_file) - procesi iz pool-a i benchmark ne pišu na disk
+        """
+        self.workers = workers
+        self.text_layer = text_layer
+        self.column_crop = column_crop
+        self.layout_cache_file = layout_cache_file
+        # Način poslednjeg parsiranja: 'pypdf2', 'text' ili 'tables' (iter_days: načini
+        # ponovo parsiranih stranica spojeni sa '+', None ako nijedna stranica nije parsirana)
+        self.last_parse_mode = None
         self.month_names_sr = {
             'januar': 1, 'februar': 2, 'mart': 3, 'april': 4,
             'maj': 5, 'jun': 6, 'jul': 7, 'avgust': 8,
@@ -23,33 +75,355 @@ class MenuParser:
         }
         
     def parse_pdf(self, pdf_path: Path) -> Dict[str, Dict]:
-        """Parsira PDF koristeći tabelarnu strukturu"""
+        """Parsira PDF - prvo iz tekstualnog sloja, a ako validacija ne prođe iz tabela"""
         menu_data = {}
+        self.last_parse_mode = None
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    logger.info(f"Obrađujem stranicu {page_num + 1}")
-                    
-                    # Ekstraktuj tabele sa stranice
-                    tables = page.extract_tables()
-                    
-                    if not tables:
-                        table = page.extract_table()
-                        if table:
-                            tables = [table]
-                    
-                    # Obradi svaku tabelu
-                    for table in tables:
-                        if table:
-                            self._parse_table(table, menu_data)
-                
-                logger.info(f"Uspešno parsirano {len(menu_data)} dana")
+            if self.text_layer:
+                menu_data = self._parse_text_layers(pdf_path)
+
+            if not menu_data:
+                menu_data = self._parse_tables(pdf_path)
+                self.last_parse_mode = 'tables'
+
+            logger.info(f"Uspešno parsirano {len(menu_data)} dana (način: {self.last_parse_mode})")
                 
         except Exception as e:
             logger.error(f"Greška pri parsiranju PDF-a: {e}")
             
         return menu_data
+
+    def iter_days(self, pdf_path: Path, previous_pages: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        """Generator - vraća svaki parsirani dan čim je njegova stranica obrađena
+
+        Svaka izmenjena stranica se prvo čita iz tekstualnog sloja (kao parse_pdf),
+        a ako validacija ne prođe, detekcijom tabela u levoj koloni. Keš objekata
+        stranice se oslobađa posle obrade, pa je memorija ograničena na jednu stranicu.
+
+        Args:
+            pdf_path: Putanja do PDF-a
+            previous_pages: Stanje stranica iz prethodnog parsiranja istog PDF-a
+                (self.last_pages) - stranice sa istim otiskom se preskaču
+
+        Posle iscrpljivanja generatora self.last_pages sadrži otisak i datume
+        svake stranice, a self.last_reparsed_pages brojeve ponovo parsiranih stranica.
+        """
+        self.last_parse_mode = None
+        self.last_pages = []
+        self.last_reparsed_pages = []
+        modes = []
+
+        with pdfplumber.open(pdf_path) as pdf:
+            bbox = None
+            bbox_detected = False
+            reader = None
+
+            for page_num, page in enumerate(pdf.pages):
+                fingerprint = self._page_fingerprint(page)
+
+                previous = None
+                if previous_pages and page_num < len(previous_pages):
+                    previous = previous_pages[page_num]
+
+                if previous and previous['fingerprint'] == fingerprint:
+                    self.last_pages.append(previous)
+                    continue
+
+                page_days, mode = {}, None
+                if self.text_layer:
+                    if reader is None:
+                        reader = PyPDF2.PdfReader(str(pdf_path))
+                    text_bbox = bbox if bbox_detected else (
+                        self._cached_left_column_bbox(pdf) if self.column_crop else None
+                    )
+                    page_days, mode = self._parse_text_extractors([
+                        ('pypdf2', lambda: reader.pages[page_num].extract_text() or ''),
+                        ('text', lambda: self._crop_page(page, text_bbox).extract_text() or ''),
+                    ])
+
+                if not page_days:
+                    # Levu kolonu tražimo tek kada neka stranica zaista mora kroz detekciju tabela
+                    if self.column_crop and not bbox_detected:
+                        bbox = self._left_column_bbox(pdf)
+                        bbox_detected = True
+                    self._parse_page(self._crop_page(page, bbox), page_num, page_days)
+                    mode = 'tables'
+                page.flush_cache()
+                if mode not in modes:
+                    modes.append(mode)
+
+                self.last_pages.append({'fingerprint': fingerprint, 'dates': sorted(page_days)})
+                self.last_reparsed_pages.append(page_num)
+
+                yield from page_days.values()
+
+        self.last_parse_mode = '+'.join(modes) or None
+        if previous_pages is not None:
+            logger.info(
+                f"Ponovo parsirano {len(self.last_reparsed_pages)}/{len(self.last_pages)} stranica "
+                f"(način: {self.last_parse_mode})"
+            )
+
+    def _page_fingerprint(self, page) -> str:
+        """Otisak stranice - hash sirovog content stream-a (bez parsiranja rasporeda)"""
+        digest = hashlib.sha1()
+        for stream in page.page_obj.contents:
+            digest.update(resolve1(stream).get_data())
+        return digest.hexdigest()
+
+    @staticmethod
+    def removed_dates(previous_pages: List[Dict], pages: List[Dict]) -> List[str]:
+        """Datumi koji su postojali u prethodnoj verziji PDF-a, a više ne postoje"""
+        previous = {date for page in previous_pages for date in page['dates']}
+        current = {date for page in pages for date in page['dates']}
+        return sorted(previous - current)
+
+    def _parse_tables(self, pdf_path: Path) -> Dict[str, Dict]:
+        """Parsira PDF koristeći tabelarnu strukturu (detekcija tabela na svakoj stranici)"""
+        with pdfplumber.open(pdf_path) as pdf:
+            page_count = len(pdf.pages)
+            bbox = self._left_column_bbox(pdf) if self.column_crop else None
+
+            if not (self.workers > 1 and page_count > 1):
+                # Serijski - isti otvoreni PDF, pa se prva stranica ne parsira ponovo
+                return self._parse_open_pages(pdf, 0, page_count, bbox)
+
+        return self._parse_pages_parallel(pdf_path, page_count, bbox)
+
+    def _parse_text_layers(self, pdf_path: Path) -> Dict[str, Dict]:
+        """Probaj tekstualne slojeve od najjeftinijeg - vrati {} ako nijedan ne prođe validaciju"""
+        menu_data, mode = self._parse_text_extractors([
+            ('pypdf2', lambda: self._extract_text_pypdf2(pdf_path)),
+            ('text', lambda: self._extract_text_pdfplumber(pdf_path)),
+        ])
+        if menu_data:
+            self.last_parse_mode = mode
+        return menu_data
+
+    def _parse_text_extractors(self, extractors: List[Tuple[str, Callable[[], str]]]
+                               ) -> Tuple[Dict[str, Dict], Optional[str]]:
+        """Parsiraj tekst prvog izvora koji prođe validaciju - ({}, None) ako nijedan ne prođe"""
+        for mode, extract in extractors:
+            try:
+                text = extract()
+            except Exception as e:
+                logger.warning(f"Greška pri čitanju tekstualnog sloja ({mode}): {e}")
+                continue
+
+            menu_data = self._parse_text(text)
+            if self._validate_text_parse(text, menu_data):
+                return menu_data, mode
+
+            logger.info(f"Tekstualni sloj ({mode}) nije prošao validaciju")
+
+        return {}, None
+
+    def _extract_text_pypdf2(self, pdf_path: Path) -> str:
+        """Tekst svih stranica preko PyPDF2 (redosled iz content stream-a)"""
+        reader = PyPDF2.PdfReader(str(pdf_path))
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+    def _extract_text_pdfplumber(self, pdf_path: Path) -> str:
+        """Tekst svih stranica preko pdfplumber-a (bez detekcije tabela)"""
+        with pdfplumber.open(pdf_path) as pdf:
+            # Ako je raspored već poznat, čitaj samo levu kolonu
+            bbox = self._cached_left_column_bbox(pdf) if self.column_crop else None
+            return '\n'.join(
+                self._crop_page(page, bbox).extract_text() or '' for page in pdf.pages
+            )
+
+    def _parse_text(self, text: str) -> Dict[str, Dict]:
+        """Deli tekst na blokove po zaglavlju dana i parsira svaki blok kao levu kolonu"""
+        menu_data = {}
+        headers = list(_DAY_HEADER_RE.finditer(text))
+
+        for i, header in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+            day_data = self._parse_day_column(self._trim_text_block(text[header.start():end]))
+
+            if day_data and day_data.get('date'):
+                menu_data[day_data['date']] = day_data
+
+        return menu_data
+
+    def _trim_text_block(self, block: str) -> str:
+        """Odseci tekst desne kolone (recept) koji u tekstualnom sloju sledi posle UŽINE II
+
+        Posle reda sa UŽINOM II zadržavaju se samo redovi nastavka - kada prethodni
+        red završava zarezom ili crticom.
+        """
+        lines = block.split('\n')
+
+        for i, line in enumerate(lines):
+            if _LAST_MEAL_RE.match(line):
+                end = i + 1
+                while end < len(lines) and lines[end - 1].rstrip().endswith((',', '-', '–')):
+                    end += 1
+                return '\n'.join(lines[:end])
+
+        return block
+
+    def _validate_text_parse(self, text: str, menu_data: Dict[str, Dict]) -> bool:
+        """Proveri da li je parsiranje tekstualnog sloja pouzdano
+
+        - svako zaglavlje dana je sam u redu (kolone nisu izmešane)
+        - svako zaglavlje je dalo tačno jedan dan sa ručkom i ispravnim danom u nedelji
+        - broj datuma odgovara broju radnih dana između prvog i poslednjeg datuma
+        """
+        headers = list(_DAY_HEADER_RE.finditer(text))
+        if not headers or len(headers) != len(menu_data):
+            return False
+
+        for header in headers:
+            line_end = text.find('\n', header.end())
+            rest_of_line = text[header.end():line_end if line_end != -1 else len(text)]
+            if rest_of_line.strip():
+                return False
+
+        for date_str, day_data in menu_data.items():
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+            if self.day_names.get(day_data['day_name']) != date_obj.isoweekday():
+                return False
+            if not day_data['meals'].get('ručak'):
+                return False
+
+        dates = sorted(datetime.strptime(d, '%Y-%m-%d') for d in menu_data)
+        working_days = sum(
+            1 for i in range((dates[-1] - dates[0]).days + 1)
+            if (dates[0] + timedelta(days=i)).weekday() < 5
+        )
+        return working_days == len(menu_data)
+
+    def parse_pages(self, pdf_path: Path, start: int, end: int,
+                    bbox: Optional[Tuple[float, float, float, float]] = None) -> Dict[str, Dict]:
+        """Parsira samo stranice u opsegu [start, end), opciono samo isečak bbox"""
+        with pdfplumber.open(pdf_path) as pdf:
+            return self._parse_open_pages(pdf, start, end, bbox)
+
+    def _parse_open_pages(self, pdf, start: int, end: int,
+                          bbox: Optional[Tuple[float, float, float, float]] = None) -> Dict[str, Dict]:
+        menu_data = {}
+
+        for page_num in range(start, min(end, len(pdf.pages))):
+            self._parse_page(self._crop_page(pdf.pages[page_num], bbox), page_num, menu_data)
+
+        return menu_data
+
+    def _crop_page(self, page, bbox: Optional[Tuple[float, float, float, float]]):
+        """Iseci stranicu na levu kolonu (visina uvek cela stranica)"""
+        if not bbox:
+            return page
+
+        x0 = max(bbox[0], page.bbox[0])
+        x1 = min(bbox[2], page.bbox[2])
+        if x1 <= x0:
+            return page
+        return page.crop((x0, page.bbox[1], x1, page.bbox[3]))
+
+    def _layout_fingerprint(self, page) -> str:
+        """Otisak rasporeda: dimenzije stranice i x pozicije vertikalnih linija tabele"""
+        vertical_lines = sorted({round(edge['x0']) for edge in page.vertical_edges})
+        layout = f"{round(page.width)}x{round(page.height)}:{','.join(map(str, vertical_lines))}"
+        return hashlib.sha1(layout.encode('utf-8')).hexdigest()
+
+    def _load_layout_cache(self):
+        """Učitaj trajni keš rasporeda u memorijski keš (jednom po procesu)"""
+        if MenuParser._layout_cache or not self.layout_cache_file or not self.layout_cache_file.exists():
+            return
+
+        try:
+            with open(self.layout_cache_file, 'r', encoding='utf-8') as f:
+                MenuParser._layout_cache.update(json.load(f))
+        except Exception as e:
+            logger.warning(f"Greška pri učitavanju keša rasporeda: {e}")
+
+    def _save_layout_cache(self):
+        if not self.layout_cache_file:
+            return
+
+        try:
+            self.layout_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.layout_cache_file, 'w', encoding='utf-8') as f:
+                json.dump(MenuParser._layout_cache, f, indent=2)
+        except Exception as e:
+            logger.warning(f"Greška pri čuvanju keša rasporeda: {e}")
+
+    def _cached_left_column_bbox(self, pdf) -> Optional[Tuple[float, float, float, float]]:
+        """Leva kolona iz keša, bez detekcije (None ako raspored nije poznat)"""
+        if not pdf.pages:
+            return None
+
+        self._load_layout_cache()
+        bbox = MenuParser._layout_cache.get(self._layout_fingerprint(pdf.pages[0]))
+        return tuple(bbox) if bbox else None
+
+    def _left_column_bbox(self, pdf) -> Optional[Tuple[float, float, float, float]]:
+        """Leva kolona za ceo PDF - iz keša ili detekcijom sa prve stranice"""
+        if not pdf.pages:
+            return None
+
+        bbox = self._cached_left_column_bbox(pdf)
+        if bbox:
+            return bbox
+
+        first_page = pdf.pages[0]
+        tables = first_page.find_tables()
+        if not tables:
+            return None
+
+        # Prva ćelija svakog reda prve tabele je leva kolona
+        cells = [row.cells[0] for row in tables[0].rows if row.cells and row.cells[0]]
+        if not cells:
+            return None
+
+        bbox = (
+            min(cell[0] for cell in cells) - _COLUMN_PADDING,
+            first_page.bbox[1],
+            max(cell[2] for cell in cells) + _COLUMN_PADDING,
+            first_page.bbox[3],
+        )
+
+        MenuParser._layout_cache[self._layout_fingerprint(first_page)] = list(bbox)
+        self._save_layout_cache()
+        logger.info(f"Detektovana leva kolona: x={bbox[0]:.1f}-{bbox[2]:.1f}")
+
+        return bbox
+
+    def _parse_pages_parallel(self, pdf_path: Path, page_count: int,
+                              bbox: Optional[Tuple[float, float, float, float]] = None) -> Dict[str, Dict]:
+        """Raspoređuje stranice u self.workers procesa i spaja rezultate po datumu"""
+        workers = min(self.workers, page_count)
+        chunk = -(-page_count // workers)  # zaokruži naviše
+        ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+
+        logger.info(f"Paralelno parsiranje {page_count} stranica u {len(ranges)} procesa")
+
+        menu_data = {}
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [executor.submit(_parse_page_range, pdf_path, start, end, bbox) for start, end in ranges]
+            # Spajanje redom stranica - kasnija stranica prepisuje isti datum kao i kod serijskog parsiranja
+            for future in futures:
+                menu_data.update(future.result())
+
+        return dict(sorted(menu_data.items()))
+
+    def _parse_page(self, page, page_num: int, menu_data: Dict):
+        """Parsira jednu stranicu PDF-a i dodaje pronađene dane u menu_data"""
+        logger.info(f"Obrađujem stranicu {page_num + 1}")
+
+        # Ekstraktuj tabele sa stranice
+        tables = page.extract_tables()
+
+        if not tables:
+            table = page.extract_table()
+            if table:
+                tables = [table]
+
+        # Obradi svaku tabelu
+        for table in tables:
+            if table:
+                self._parse_table(table, menu_data)
     
     def _parse_table(self, table: List[List[str]], menu_data: Dict):
         """Parsira tabelu - svaki red je jedan dan"""
@@ -71,32 +445,14 @@ class MenuParser:
                 menu_data[day_data['date']] = day_data
     
     def _parse_day_column(self, meals_text: str) -> Optional[Dict]:
-        """Parsira kolonu sa danom i obrocima - samo leva strana PDF-a"""
-
-        # Pronađi dan i datum
-        day_pattern = r'(PONEDELJAK|UTORAK|SREDA|ČETVRTAK|PETAK)\s+(\d{1,2}\.\d{1,2}\.\d{4})'
-        day_match = re.search(day_pattern, meals_text, re.IGNORECASE)
-
-        if not day_match:
-            return None
-
-        day_name = day_match.group(1).lower()
-        date_str = day_match.group(2).rstrip('.')
-
-        # Konvertuj datum u YYYY-MM-DD format
-        try:
-            date_obj = datetime.strptime(date_str, '%d.%m.%Y')
-            formatted_date = date_obj.strftime('%Y-%m-%d')
-        except:
-            return None
+        """Parsira kolonu sa danom i obrocima - samo leva strana PDF-a
 
-        # Ekstraktuj obroke koristeći regex da nađemo pozicije svih obroka
-        # Ovo omogućava da uhvatimo sadržaj koji se prostire na više linija
-        # VAŽNO: Koristimo \b za word boundary da izbegnemo da "RUČAK" matchuje "DORUČAK"
-        doručak_pattern = r'\bDORUČAK\s*[–-]\s*(.+?)(?=UŽINA\s*I|$)'
-        užina_i_pattern = r'\bUŽINA\s*I\s*[–-]\s*(.+?)(?=\bRUČAK|$)'
-        ručak_pattern = r'\bRUČAK\s*[–-]\s*(.+?)(?=UŽINA\s*II|$)'
-        užina_ii_pattern = r'\bUŽINA\s*II\s*[–-]\s*(.+?)(?=PONEDELJAK|UTORAK|SREDA|ČETVRTAK|PETAK|$)'
+        Tekst se deli na sekcije u jednom prolazu: svaki token (zaglavlje obroka
+        ili naziv dana) zatvara prethodnu sekciju, pa redosled i nedostajuća
+        zaglavlja ne zahtevaju ponovno pretraživanje.
+        """
+        day_name = None
+        date_str = None
 
         meals = {
             'doručak': [],
@@ -105,30 +461,43 @@ class MenuParser:
             'užina_ii': []
         }
 
-        # Ekstraktuj svaki obrok
-        doručak_match = re.search(doručak_pattern, meals_text, re.IGNORECASE | re.DOTALL)
-        if doručak_match:
-            content = self._clean_meal_content(doručak_match.group(1))
-            if content:
-                meals['doručak'] = [content]
+        current_meal = None
+        content_start = 0
 
-        užina_i_match = re.search(užina_i_pattern, meals_text, re.IGNORECASE | re.DOTALL)
-        if užina_i_match:
-            content = self._clean_meal_content(užina_i_match.group(1))
-            if content:
-                meals['užina_i'] = [content]
+        for token in _TOKEN_RE.finditer(meals_text):
+            # Token zatvara sekciju obroka koja je trenutno otvorena
+            if current_meal:
+                content = self._clean_meal_content(meals_text[content_start:token.start()])
+                if content:
+                    meals[current_meal] = [content]
+                current_meal = None
 
-        ručak_match = re.search(ručak_pattern, meals_text, re.IGNORECASE | re.DOTALL)
-        if ručak_match:
-            content = self._clean_meal_content(ručak_match.group(1))
-            if content:
-                meals['ručak'] = [content]
+            if token.group('day'):
+                if day_name is None and token.group('date'):
+                    day_name = token.group('day').lower()
+                    date_str = token.group('date')
+                continue
 
-        užina_ii_match = re.search(užina_ii_pattern, meals_text, re.IGNORECASE | re.DOTALL)
-        if užina_ii_match:
-            content = self._clean_meal_content(užina_ii_match.group(1))
+            meal_type = _MEAL_KEYS[''.join(token.group('meal').split()).upper()]
+            # Zaglavlje bez crtice je samo granica; računa se samo prvo pojavljivanje obroka
+            if token.group('separator') and not meals[meal_type]:
+                current_meal = meal_type
+                content_start = token.end()
+
+        if current_meal:
+            content = self._clean_meal_content(meals_text[content_start:])
             if content:
-                meals['užina_ii'] = [content]
+                meals[current_meal] = [content]
+
+        if day_name is None:
+            return None
+
+        # Konvertuj datum u YYYY-MM-DD format
+        try:
+            date_obj = datetime.strptime(date_str, '%d.%m.%Y')
+            formatted_date = date_obj.strftime('%Y-%m-%d')
+        except:
+            return None
 
         return {
             'day_name': day_name,
@@ -138,10 +507,8 @@ class MenuParser:
 
     def _clean_meal_content(self, content: str) -> str:
         """Očisti sadržaj obroka od višak whitespace-a i newline-ova"""
-        # Zameni višestruke spaces i newlines sa jednim space-om
-        content = re.sub(r'\s+', ' ', content)
-        # Ukloni whitespace na početku i kraju
-        content = content.strip()
+        # Zameni višestruke spaces i newlines sa jednim space-om (split bez regex-a)
+        content = ' '.join(content.split())
         # Ukloni trailing zareze i crtice
         content = content.rstrip(',-–')
         return content
@@ -0,0 +1,166 @@
+"""
+Modul za profilisanje procesa na zahtev - cProfile sesije, tracemalloc snimci i profilisanje faza preuzimanja
+"""
+import cProfile
+import io
+import logging
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingHooks:
+    """Profilisanje u procesu koji radi - pokreće ga admin, rezultati idu na disk
+
+    - CPU: cProfile sesija između start_cpu() i stop_cpu() (.prof fajl, čita se sa pstats/snakeviz)
+    - Memorija: tracemalloc od start_memory(), snimak sa memory_snapshot() (.snapshot fajl)
+    - Faze preuzimanja: kada je ingest_profiling uključen, stage()/profile_iter() pišu .prof po fazi
+
+    cProfile meri samo nit u kojoj je uključen - za bot je to event loop nit
+    (handleri), a posao u asyncio.to_thread se profiliše kroz profile_iter().
+    """
+
+    def __init__(self, output_dir: Path = Path("data/profiles"), top_n: int = 15,
+                 ingest_profiling: bool = False):
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.ingest_profiling = ingest_profiling
+        self._cpu_profile: Optional[cProfile.Profile] = None
+        self._cpu_started: Optional[datetime] = None
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def _dump_path(self, prefix: str, suffix: str) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        return self.output_dir / f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}{suffix}"
+
+    def _summary(self, profile: cProfile.Profile) -> str:
+        """Top N funkcija po kumulativnom vremenu"""
+        output = io.StringIO()
+        stats = pstats.Stats(profile, stream=output)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+        return output.getvalue().strip()
+
+    @property
+    def cpu_running(self) -> bool:
+        return self._cpu_profile is not None
+
+    def start_cpu(self) -> bool:
+        """Pokreni cProfile sesiju (False ako je već pokrenuta)"""
+        if self._cpu_profile is not None:
+            return False
+
+        self._cpu_profile = cProfile.Profile()
+        self._cpu_started = datetime.now()
+        self._cpu_profile.enable()
+        logger.info("CPU profilisanje pokrenuto")
+        return True
+
+    def stop_cpu(self) -> Optional[Tuple[Path, str]]:
+        """Zaustavi sesiju, sačuvaj .prof fajl i vrati (putanja, sažetak) - None ako sesija ne radi"""
+        if self._cpu_profile is None:
+            return None
+
+        profile = self._cpu_profile
+        profile.disable()
+        self._cpu_profile = None
+
+        path = self._dump_path("cpu", ".prof")
+        profile.dump_stats(str(path))
+        duration = (datetime.now() - self._cpu_started).total_seconds()
+        logger.info(f"CPU profil sačuvan: {path} ({duration:.0f}s)")
+        return path, f"Trajanje sesije: {duration:.0f}s\n\n{self._summary(profile)}"
+
+    def start_memory(self, frames: int = 10) -> bool:
+        """Pokreni tracemalloc (False ako već radi)"""
+        if tracemalloc.is_tracing():
+            return False
+
+        tracemalloc.start(frames)
+        self._last_snapshot = None
+        logger.info("Praćenje memorije (tracemalloc) pokrenuto")
+        return True
+
+    def memory_snapshot(self) -> Optional[Tuple[Path, str]]:
+        """Snimak memorije - sačuvaj ga i vrati top N linija (i razliku od prethodnog snimka)"""
+        if not tracemalloc.is_tracing():
+            return None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        path = self._dump_path("memory", ".snapshot")
+        snapshot.dump(str(path))
+
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Trenutno: {current / 1024 / 1024:.1f} MB, vrh: {peak / 1024 / 1024:.1f} MB", ""]
+        lines += [str(stat) for stat in snapshot.statistics('lineno')[:self.top_n]]
+
+        if self._last_snapshot is not None:
+            lines += ["", "Razlika od prethodnog snimka:"]
+            lines += [str(stat) for stat in snapshot.compare_to(self._last_snapshot, 'lineno')[:self.top_n]]
+        self._last_snapshot = snapshot
+
+        logger.info(f"Snimak memorije sačuvan: {path}")
+        return path, '\n'.join(lines)
+
+    def stop_memory(self) -> bool:
+        if not tracemalloc.is_tracing():
+            return False
+
+        tracemalloc.stop()
+        self._last_snapshot = None
+        logger.info("Praćenje memorije zaustavljeno")
+        return True
+
+    def _dump_stage(self, name: str, profile: cProfile.Profile):
+        path = self._dump_path(f"ingest-{name}", ".prof")
+        profile.dump_stats(str(path))
+        logger.info(f"Profil faze '{name}' sačuvan: {path}\n{self._summary(profile)}")
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profiliši fazu preuzimanja ako je ingest_profiling uključen (inače samo izvrši blok)"""
+        if not self.ingest_profiling:
+            yield
+            return
+
+        if self._cpu_profile is not None:
+            # Dva cProfile-a u istoj niti se isključuju - CPU sesija već meri i ovu fazu
+            logger.info(f"CPU sesija je aktivna - faza '{name}' se ne profiliše posebno")
+            yield
+            return
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._dump_stage(name, profile)
+
+    def profile_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """Profiliši generator fazu - svaki next() se meri u niti u kojoj se poziva"""
+        if not self.ingest_profiling:
+            yield from iterable
+            return
+
+        profile = cProfile.Profile()
+        iterator = iter(iterable)
+        try:
+            while True:
+                profile.enable()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    profile.disable()
+                yield item
+        finally:
+            self._dump_stage(name, profile)
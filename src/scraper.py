@@ -5,11 +5,18 @@ from pathlib import Path
 from datetime import datetime
 import logging
 import re
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin, urldefrag
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MONTH_NAMES_SR = {
+    1: 'januar', 2: 'februar', 3: 'mart', 4: 'april',
+    5: 'maj', 6: 'jun', 7: 'jul', 8: 'avgust',
+    9: 'septembar', 10: 'oktobar', 11: 'novembar', 12: 'decembar'
+}
+
 
 class MenuScraper:
     def __init__(self, base_url: str = "https://www.nasaradost.edu.rs/jelovnik/"):
@@ -18,9 +25,16 @@ class MenuScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # URL poslednjeg PDF-a koji je get_current_month_menu preuzeo (identitet izvora za ingest)
+        self.last_pdf_url: Optional[str] = None
         
-    def find_current_month_pdf_url(self) -> Optional[str]:
-        """Pronađi URL PDF-a za trenutni mesec - prvi koji ima 'jelovnik' u nazivu"""
+    def find_current_month_pdf_url(self, now: Optional[datetime] = None) -> Optional[Tuple[int, int, str]]:
+        """Pronađi PDF za trenutni mesec - prvi koji ima 'jelovnik' u nazivu
+
+        Returns:
+            (godina, mesec, url) - mesec za koji je jelovnik tražen (od 25. u mesecu
+            to je sledeći mesec), ili None ako PDF nije pronađen
+        """
         try:
             response = self.session.get(self.base_url, timeout=10)
             response.raise_for_status()
@@ -28,12 +42,7 @@ class MenuScraper:
             
             soup = BeautifulSoup(response.content, 'html.parser')
             
-            current_date = datetime.now()
-            month_names_sr = {
-                1: 'januar', 2: 'februar', 3: 'mart', 4: 'april',
-                5: 'maj', 6: 'jun', 7: 'jul', 8: 'avgust',
-                9: 'septembar', 10: 'oktobar', 11: 'novembar', 12: 'decembar'
-            }
+            current_date = now or datetime.now()
 
             # Ako smo u poslednjih 5 dana meseca, traži sledeći mesec
             if current_date.day >= 25:
@@ -43,7 +52,7 @@ class MenuScraper:
                 target_month = current_date.month
                 target_year = current_date.year
 
-            current_month_name = month_names_sr[target_month]
+            current_month_name = MONTH_NAMES_SR[target_month]
             current_year = target_year
             
             links = soup.find_all('a', href=True)
@@ -53,20 +62,11 @@ class MenuScraper:
                 href = link['href']
                 link_text = link.get_text(strip=True).lower()
                 
-                if href.endswith('.pdf'):
-                    # Mora imati "jelovnik" u tekstu linka
-                    if 'jelovnik' in link_text:
-                        # Mora imati naziv trenutnog meseca
-                        if current_month_name in link_text:
-                            # Ne sme imati "lanč" ili "užina"
-                            if 'lanč' not in link_text and 'užina' not in link_text:
-                                logger.info(f"Pronađen jelovnik: {link_text}")
-                                if href.startswith('http'):
-                                    return href
-                                elif href.startswith('/'):
-                                    return f"https://www.nasaradost.edu.rs{href}"
-                                else:
-                                    return f"https://www.nasaradost.edu.rs/{href}"
+                if self._is_menu_link(href, link_text):
+                    # Mora imati naziv trenutnog meseca
+                    if current_month_name in link_text:
+                        logger.info(f"Pronađen jelovnik: {link_text}")
+                        return target_year, target_month, urljoin(response.url, href)
                             
             logger.warning(f"Nije pronađen PDF jelovnika za {current_month_name} {current_year}")
             return None
@@ -75,13 +75,117 @@ class MenuScraper:
             logger.error(f"Greška pri traženju PDF linka: {e}")
             return None
     
+    def _is_menu_link(self, href: str, link_text: str) -> bool:
+        """Proveri da li link vodi na PDF jelovnika (bez lanč paketa i užina)"""
+        if not href.lower().endswith('.pdf'):
+            return False
+        # Mora imati "jelovnik" u tekstu linka
+        if 'jelovnik' not in link_text:
+            return False
+        # Ne sme imati "lanč" ili "užina"
+        return 'lanč' not in link_text and 'užina' not in link_text
+
+    def _month_from_link(self, link_text: str, href: str) -> Optional[Tuple[int, int]]:
+        """Odredi (godina, mesec) jelovnika iz teksta linka ili imena fajla
+
+        Tekst linka ima prednost nad href-om. Godina se uzima redom: iz teksta linka, iz imena fajla, pa iz
+        WordPress putanje uploads/GGGG/MM/ - jelovnik se postavlja unapred,
+        pa je januarski PDF iz uploads/2024/12/ jelovnik za januar 2025.
+        """
+        link_text = link_text.lower()
+        href = href.lower()
+
+        month = None
+        for source in (link_text, href):
+            month = next((number for number, name in MONTH_NAMES_SR.items() if name in source), None)
+            if month is not None:
+                break
+        if month is None:
+            return None
+
+        filename = href.rsplit('/', 1)[-1]
+        for source in (link_text, filename):
+            year_match = re.search(r'(20\d{2})', source)
+            if year_match:
+                return int(year_match.group(1)), month
+
+        upload_match = re.search(r'/(20\d{2})/(\d{2})/', href)
+        if upload_match:
+            upload_year, upload_month = int(upload_match.group(1)), int(upload_match.group(2))
+            # Mesec daleko pre meseca postavljanja je iz sledeće godine (decembar -> januar),
+            # a ispravka postavljena mesec-dva kasnije ostaje u istoj godini
+            return (upload_year + 1 if upload_month - month >= 6 else upload_year), month
+
+        # Stariji linkovi nemaju godinu - pretpostavi poslednje pojavljivanje tog meseca
+        current_date = datetime.now()
+        if month <= current_date.month + 1:
+            return current_date.year, month
+        return current_date.year - 1, month
+
+    def find_all_menu_pdf_urls(self, max_pages: int = 20) -> List[Tuple[int, int, str]]:
+        """Pronađi sve PDF jelovnike sa listing stranice i njenih arhivskih stranica
+
+        Prolazi kroz sve stranice ispod base_url (paginacija, arhiva) najviše
+        max_pages stranica.
+
+        Returns:
+            Lista (godina, mesec, url) sortirana po mesecu, jedan PDF po mesecu
+        """
+        found = {}
+        queue = [self.base_url]
+        visited = set()
+
+        while queue and len(visited) < max_pages:
+            page_url = queue.pop(0)
+            if page_url in visited:
+                continue
+            visited.add(page_url)
+
+            try:
+                response = self.session.get(page_url, timeout=10)
+                response.raise_for_status()
+            except Exception as e:
+                logger.error(f"Greška pri učitavanju stranice {page_url}: {e}")
+                continue
+
+            soup = BeautifulSoup(response.content, 'html.parser')
+
+            for link in soup.find_all('a', href=True):
+                href = link['href']
+                link_text = link.get_text(strip=True).lower()
+                url = urldefrag(urljoin(response.url, href))[0]
+
+                if self._is_menu_link(href, link_text):
+                    month_key = self._month_from_link(link_text, href)
+                    if month_key is None:
+                        logger.warning(f"Nepoznat mesec za jelovnik: {link_text}")
+                        continue
+                    # Prvi link za mesec je najnovija verzija (listing je od najnovijeg)
+                    if month_key not in found:
+                        logger.info(f"Pronađen jelovnik {month_key[0]}-{month_key[1]:02d}: {url}")
+                        found[month_key] = url
+                elif url.startswith(self.base_url) and url not in visited and not url.lower().endswith('.pdf'):
+                    # Arhivske stranice i paginacija su ispod listing stranice
+                    queue.append(url)
+
+        logger.info(f"Pronađeno {len(found)} jelovnika na {len(visited)} stranica")
+        return [(year, month, url) for (year, month), url in sorted(found.items())]
+
+    def month_pdf_path(self, year: int, month: int) -> Path:
+        """Putanja PDF-a za dati mesec"""
+        return Path("data/pdfs") / f"{year:04d}-{month:02d}.pdf"
+
     def download_pdf(self, url: str, save_path: Optional[Path] = None) -> Optional[Path]:
-        """Preuzmi PDF sa date URL adrese"""
+        """Preuzmi PDF sa date URL adrese
+
+        Args:
+            save_path: Gde se čuva PDF (None = putanja tekućeg meseca - pozivalac koji zna
+                mesec jelovnika treba da prosledi month_pdf_path za taj mesec)
+        """
         try:
             if save_path is None:
                 current_date = datetime.now()
-                filename = f"{current_date.year:04d}-{current_date.month:02d}.pdf"
-                save_path = Path("data/pdfs") / filename
+                save_path = self.month_pdf_path(current_date.year, current_date.month)
                 
             save_path.parent.mkdir(parents=True, exist_ok=True)
             
@@ -99,13 +203,22 @@ class MenuScraper:
             logger.error(f"Greška pri preuzimanju PDF-a: {e}")
             return None
     
-    def get_current_month_menu(self) -> Optional[Path]:
-        """Glavna metoda - pronađi i preuzmi PDF za trenutni mesec"""
-        pdf_url = self.find_current_month_pdf_url()
+    def get_current_month_menu(self, now: Optional[datetime] = None) -> Optional[Path]:
+        """Glavna metoda - pronađi i preuzmi PDF za trenutni mesec
+
+        PDF se čuva pod mesecem jelovnika (data/pdfs/YYYY-MM.pdf), ne pod mesecem
+        preuzimanja - novembarski jelovnik preuzet 27. oktobra ne prepisuje oktobarski.
+        """
+        self.last_pdf_url = None
+        found = self.find_current_month_pdf_url(now)
         
-        if not pdf_url:
+        if not found:
             logger.error("PDF URL nije pronađen")
             return None
-            
-        logger.info(f"Pronađen PDF URL: {pdf_url}")
-        return self.download_pdf(pdf_url)
\ No newline at end of file
+
+        year, month, pdf_url = found
+        logger.info(f"Pronađen PDF URL za {year}-{month:02d}: {pdf_url}")
+        pdf_path = self.download_pdf(pdf_url, self.month_pdf_path(year, month))
+        if pdf_path:
+            self.last_pdf_url = pdf_url
+        return pdf_path
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Modul za pretragu jela kroz istoriju jelovnika (invertovani indeks u memoriji)
+"""
+import bisect
+import logging
+import re
+import unicodedata
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.allergens import extract_allergens
+
+logger = logging.getLogger(__name__)
+
+# Đ nema dekompoziciju u Unicode-u, pa se mapira ručno
+_SPECIAL_CHARS = str.maketrans({'đ': 'dj', 'Đ': 'dj'})
+_WORD_RE = re.compile(r'[a-z]+')
+
+# Kraći tokeni (veznici "i", "sa" ...) se ne indeksiraju
+MIN_TOKEN_LENGTH = 2
+
+
+def normalize(text: str) -> str:
+    """Mala slova bez dijakritika - "ĆEVAPI" i "cevapi" daju isto"""
+    text = unicodedata.normalize('NFKD', text.translate(_SPECIAL_CHARS).lower())
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Reči za indeks - normalizovane, bez oznaka alergena i kratkih reči"""
+    return [token for token in _WORD_RE.findall(normalize(text)) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+class DishSearchIndex:
+    """Invertovani indeks token -> stavke jelovnika
+
+    Dokument je jedna stavka obroka (datum, obrok, naziv). Indeks se puni
+    inkrementalno pri preuzimanju jelovnika, a upit traži tokene kao prefikse
+    ("pasu" nalazi "PASULJ") preko sortiranog rečnika.
+    """
+
+    def __init__(self):
+        # doc_id -> (datum, obrok, stavka)
+        self.documents: Dict[int, Tuple[str, str, str]] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self._docs_by_date: Dict[str, List[int]] = {}
+        self._vocabulary: List[str] = []
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.documents)
+
+    def update(self, menu_data: Dict[str, Dict], removed_dates: Iterable[str] = ()):
+        """Dodaj ili zameni dane u indeksu i ukloni obrisane datume"""
+        for date_str in list(removed_dates) + list(menu_data):
+            self._remove_date(date_str)
+
+        for date_str, day_data in menu_data.items():
+            doc_ids = []
+            for meal, items in day_data.get('meals', {}).items():
+                for entry in (entry for item in items or [] for entry in extract_allergens(item)):
+                    doc_id = self._next_id
+                    self._next_id += 1
+                    self.documents[doc_id] = (date_str, meal, entry['item'])
+                    for token in set(tokenize(entry['item'])):
+                        self.postings.setdefault(token, set()).add(doc_id)
+                    doc_ids.append(doc_id)
+            self._docs_by_date[date_str] = doc_ids
+
+        self._vocabulary = sorted(self.postings)
+
+    def _remove_date(self, date_str: str):
+        for doc_id in self._docs_by_date.pop(date_str, []):
+            _, _, item = self.documents.pop(doc_id)
+            for token in set(tokenize(item)):
+                postings = self.postings.get(token)
+                if postings is None:
+                    continue
+                postings.discard(doc_id)
+                if not postings:
+                    del self.postings[token]
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        """Unija postings lista za sve reči koje počinju sa prefix"""
+        matches = set()
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self.postings[token]
+        return matches
+
+    def search(self, query: str, now: Optional[datetime] = None, limit: int = 10) -> List[Dict]:
+        """Stavke koje sadrže sve reči upita
+
+        Naredni datumi (od danas) su prvi, rastuće; zatim prošli, od najskorijeg.
+
+        Returns:
+            Lista {'date', 'meal', 'item'}
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        doc_ids = None
+        for token in sorted(set(tokens), key=len, reverse=True):
+            matches = self._prefix_matches(token)
+            doc_ids = matches if doc_ids is None else doc_ids & matches
+            if not doc_ids:
+                return []
+
+        today = (now or datetime.now()).strftime('%Y-%m-%d')
+        # doc_id čuva redosled obroka u danu
+        results = [self.documents[doc_id] for doc_id in sorted(doc_ids)]
+        upcoming = sorted((result for result in results if result[0] >= today), key=lambda result: result[0])
+        past = sorted((result for result in results if result[0] < today), key=lambda result: result[0], reverse=True)
+
+        return [
+            {'date': date_str, 'meal': meal, 'item': item}
+            for date_str, meal, item in (upcoming + past)[:limit]
+        ]
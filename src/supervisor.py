@@ -0,0 +1,231 @@
+"""
+Modul za nadzor polling-a - ponovno povezivanje mreže unutar istog procesa
+
+Umesto da se posle greške ceo Application ugasi i ponovo pokrene (uz gubitak
+keševa i zakazanih poslova), supervizor jednom pokrene Application (JobQueue,
+handlere), a pri problemu sa mrežom zaustavi samo Updater, ponovo otvori HTTP
+klijente bota i nastavi polling. Pauze između pokušaja su asyncio.sleep, pa
+poslovi i handleri rade i dok se čeka.
+"""
+import asyncio
+import logging
+import random
+import signal
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from telegram.error import InvalidToken, TelegramError
+from telegram.ext import Application
+
+from src.metrics import POLLING_ERRORS, POLLING_RECONNECTS
+
+logger = logging.getLogger(__name__)
+
+
+class PollingSupervisor:
+    """Drži polling živim - ponovo povezuje mrežni sloj bez restarta procesa
+
+    - Backoff: base_delay * 2^(n-1), najviše max_delay, sa jitter-om (50-100%)
+    - Brojač pokušaja se vraća na nulu posle healthy_after sekundi bez greške
+    - Reconnect kada Updater prestane da radi ili kada se u error_window sekundi
+      skupi error_threshold grešaka polling-a
+    - InvalidToken je fatalan - pogrešan token se ne popravlja ponavljanjem
+    - Sa can_poll polling radi samo dok can_poll() vraća True (npr. samo vođa
+      među više procesa) - Application i poslovi rade i kada polling stoji
+    """
+
+    def __init__(self, application: Application, base_delay: float = 1.0, max_delay: float = 60.0,
+                 healthy_after: float = 300.0, error_threshold: int = 5, error_window: float = 60.0,
+                 check_interval: float = 5.0, polling_kwargs: Optional[Dict] = None,
+                 can_poll: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            application: Application bota (handleri i poslovi su već postavljeni)
+            base_delay: Pauza pre prvog ponovnog pokušaja (sekunde)
+            max_delay: Najduža pauza između pokušaja (sekunde)
+            healthy_after: Posle ovoliko sekundi bez greške brojač pokušaja kreće od nule
+            error_threshold: Broj grešaka polling-a u error_window posle kog se mreža ponovo povezuje
+            error_window: Prozor (sekunde) u kom se broje greške polling-a
+            check_interval: Koliko često se proverava stanje Updater-a (sekunde)
+            polling_kwargs: Dodatni argumenti za Updater.start_polling (npr. allowed_updates)
+            can_poll: Da li ovaj proces sme da poluje (None = uvek)
+        """
+        self.application = application
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.healthy_after = healthy_after
+        self.error_threshold = error_threshold
+        self.error_window = error_window
+        self.check_interval = check_interval
+        self.polling_kwargs = polling_kwargs or {}
+        self.can_poll = can_poll
+
+        self.attempt = 0
+        self.reconnects = 0
+        self._errors: deque = deque()
+        self._healthy_since = time.monotonic()
+        self._stop: Optional[asyncio.Event] = None
+        # Polling koji je supervizor pokrenuo i nije namerno zaustavio
+        self._polling = False
+
+    def delay(self, attempt: int) -> float:
+        """Pauza pre pokušaja `attempt` (1, 2, ...) - eksponencijalno, ograničeno, sa jitter-om"""
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def stop(self):
+        """Zatraži zaustavljanje (SIGINT/SIGTERM ili iz koda)"""
+        if self._stop is not None:
+            self._stop.set()
+
+    def _may_poll(self) -> bool:
+        return self.can_poll is None or self.can_poll()
+
+    def _on_polling_error(self, error: TelegramError):
+        # Updater sam ponavlja getUpdates posle greške - ovde se samo broje, watchdog odlučuje o reconnect-u
+        now = time.monotonic()
+        self._errors.append(now)
+        self._healthy_since = now
+        POLLING_ERRORS.inc(error=type(error).__name__)
+        logger.warning(f"Greška pri polling-u: {type(error).__name__}: {error}")
+
+    def _recent_errors(self) -> int:
+        cutoff = time.monotonic() - self.error_window
+        while self._errors and self._errors[0] < cutoff:
+            self._errors.popleft()
+        return len(self._errors)
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Čekaj `seconds` ili do zaustavljanja - True ako je zatraženo zaustavljanje"""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        return self._stop.is_set()
+
+    async def _connect(self, first: bool) -> bool:
+        """Poveži bota i pokreni polling, ponavljaj sa backoff-om - False ako je zaustavljen pre uspeha"""
+        application = self.application
+
+        while not self._stop.is_set():
+            try:
+                if first:
+                    await application.initialize()
+                else:
+                    # Zatvoreni HTTPX klijenti se u initialize() prave iznova (nove konekcije)
+                    await application.bot.shutdown()
+                    await application.bot.initialize()
+
+                if self._may_poll():
+                    await application.updater.start_polling(
+                        # Stare poruke se odbacuju samo pri pokretanju - posle prekida se odgovara i na njih
+                        drop_pending_updates=first,
+                        bootstrap_retries=0,
+                        error_callback=self._on_polling_error,
+                        **self.polling_kwargs
+                    )
+                    self._polling = True
+                self._errors.clear()
+                self._healthy_since = time.monotonic()
+                return True
+
+            except InvalidToken:
+                logger.error("Neispravan TELEGRAM_BOT_TOKEN - bot se zaustavlja")
+                raise
+
+            except Exception as e:
+                self.attempt += 1
+                delay = self.delay(self.attempt)
+                logger.error(f"Povezivanje nije uspelo (pokušaj {self.attempt}): {e} - novi pokušaj za {delay:.1f}s")
+                if await self._sleep(delay):
+                    return False
+
+        return False
+
+    async def _reconnect(self, reason: str) -> bool:
+        """Zaustavi Updater i ponovo poveži mrežni sloj - Application, keševi i poslovi ostaju"""
+        self.reconnects += 1
+        self.attempt += 1
+        POLLING_RECONNECTS.inc(reason=reason)
+
+        delay = self.delay(self.attempt)
+        logger.warning(f"Ponovno povezivanje ({reason}), pokušaj {self.attempt} za {delay:.1f}s")
+
+        updater = self.application.updater
+        self._polling = False
+        if updater.running:
+            try:
+                await updater.stop()
+            except Exception as e:
+                logger.error(f"Greška pri zaustavljanju polling-a: {e}")
+
+        if await self._sleep(delay):
+            return False
+        return await self._connect(first=False)
+
+    async def _watch(self):
+        """Prati Updater dok se ne zatraži zaustavljanje"""
+        while not await self._sleep(self.check_interval):
+            updater = self.application.updater
+            if not self._may_poll():
+                if updater.running:
+                    logger.info("Polling se zaustavlja - ovaj proces više ne prima update-e")
+                    self._polling = False
+                    await updater.stop()
+                continue
+
+            if not updater.running and not self._polling:
+                logger.info("Polling se pokreće - ovaj proces sada prima update-e")
+                if not await self._connect(first=False):
+                    return
+                continue
+
+            if not updater.running:
+                reason = 'polling_stopped'
+            elif self._recent_errors() >= self.error_threshold:
+                reason = 'polling_errors'
+            else:
+                if self.attempt and time.monotonic() - self._healthy_since >= self.healthy_after:
+                    logger.info(f"Polling stabilan {self.healthy_after:.0f}s - brojač pokušaja vraćen na 0")
+                    self.attempt = 0
+                continue
+
+            if not await self._reconnect(reason):
+                return
+
+    def _install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows ili event loop van glavne niti - zaustavlja se preko KeyboardInterrupt
+                pass
+
+    async def _shutdown(self):
+        application = self.application
+        try:
+            if application.updater.running:
+                await application.updater.stop()
+            if application.running:
+                await application.stop()
+            await application.shutdown()
+        except Exception as e:
+            logger.error(f"Greška pri gašenju bota: {e}")
+
+    async def run(self):
+        """Pokreni Application i polling, zatim ga nadgledaj do SIGINT/SIGTERM"""
+        self._stop = asyncio.Event()
+        self._install_signal_handlers()
+
+        try:
+            if not await self._connect(first=True):
+                return
+            # Application (JobQueue, obrada update-a) se pokreće jednom i radi i tokom reconnect-a
+            await self.application.start()
+            logger.info("Bot pokrenut pod supervizorom polling-a")
+            await self._watch()
+        finally:
+            logger.info("Zaustavljanje bota...")
+            await self._shutdown()
@@ -1,29 +1,47 @@
 import os
+import asyncio
 import logging
+import time as time_module
+from collections import OrderedDict
 from logging.handlers import RotatingFileHandler
 from datetime import datetime, timedelta, time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import pytz
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes, MessageHandler, filters
 from telegram.ext import JobQueue
+from telegram.error import RetryAfter
+from telegram.request import BaseRequest, HTTPXRequest
+from telegram.helpers import escape_markdown
 from dotenv import load_dotenv
 
-from src.scraper import MenuScraper
-from src.pdf_parser import MenuParser
 from src.data_organizer import DataOrganizer
-from src.user_stats import UserStatsTracker
+from src.user_stats import UserStatsTracker, SharedUserStatsTracker
+from src.menu_diff import MenuDiff, MEAL_LABELS, DAYS_SR
+from src.menu_format import format_menu_message
+from src.allergens import AllergenIndex
+from src.search import DishSearchIndex
+from src.menu_pack import MenuPackReader
+from src.profiling import ProfilingHooks
+from src.ingest import IngestPipeline
+from src.supervisor import PollingSupervisor
+from src.cluster import WorkerCluster
+from src.metrics import (
+    MetricsServer, timed_handler, TELEGRAM_API_DURATION, BROADCAST_DURATION, BROADCAST_MESSAGES,
+    BROADCAST_THROUGHPUT, SEND_FAILURES, SEND_RETRIES, CACHE_REQUESTS, CLUSTER_LEADER
+)
 
 load_dotenv()
 
 # Setup log rotation - max 5MB per file, keep 5 backup files
 log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-# File handler with rotation
+# File handler with rotation - svaki proces bota (KLOPAS_WORKER_INDEX) ima svoj log, da rotacije ne smetaju jedna drugoj
+worker_index = os.getenv('KLOPAS_WORKER_INDEX')
 file_handler = RotatingFileHandler(
-    'bot.log', 
+    f'bot-{worker_index}.log' if worker_index else 'bot.log', 
     maxBytes=5*1024*1024,  # 5MB
     backupCount=5          # Keep 5 old log files
 )
@@ -40,14 +58,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Najviše ovoliko nedelja u kešu nedeljnog prikaza (listanje unazad ne sme da raste bez granice)
+WEEK_CACHE_WEEKS = 8
+
 # Disable verbose logging from httpx (Telegram API requests)
 logging.getLogger('httpx').setLevel(logging.WARNING)
 # Disable verbose logging from apscheduler
 logging.getLogger('apscheduler').setLevel(logging.WARNING)
 
 
+class MetricsHTTPXRequest(HTTPXRequest):
+    """HTTPXRequest koji meri trajanje svakog poziva Bot API-ja (po metodi i HTTP statusu)"""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        api_method = url.rsplit('/', 1)[-1]
+        start = time_module.perf_counter()
+        status = 'error'
+        try:
+            status, payload = await super().do_request(url, method, *args, **kwargs)
+            return status, payload
+        finally:
+            TELEGRAM_API_DURATION.observe(time_module.perf_counter() - start, method=api_method, status=status)
+
+
 class KlopasBot:
-    def __init__(self):
+    def __init__(self, request: Optional[BaseRequest] = None):
+        """
+        Args:
+            request: HTTP sloj za Bot API (npr. lažni sloj u load testu); podrazumevano HTTPX sa metrikama
+        """
         self.token = os.getenv('TELEGRAM_BOT_TOKEN')
         
         if not self.token:
@@ -57,18 +96,81 @@ class KlopasBot:
         admin_id = os.getenv('TELEGRAM_ADMIN_ID')
         self.admin_id = int(admin_id) if admin_id else None
             
-        self.application = Application.builder().token(self.token).build()
+        # Pool veličine kao podrazumevani u ApplicationBuilder-u, uz merenje poziva API-ja
+        builder = Application.builder().token(self.token)
+        
+        # Drugi Bot API server (npr. lažni API za benchmark: http://127.0.0.1:8081/bot)
+        base_url = os.getenv('TELEGRAM_API_BASE_URL')
+        if base_url:
+            builder = builder.base_url(base_url)
+            logger.info(f"Bot API: {base_url}")
+        if request is not None:
+            builder = builder.request(request).get_updates_request(request)
+        else:
+            builder = builder.request(MetricsHTTPXRequest(connection_pool_size=256))
+            # Poseban klijent za getUpdates (long polling), sa timeout-ima koji su ranije išli u run_polling
+            builder = builder.get_updates_request(HTTPXRequest(connect_timeout=60, read_timeout=60, write_timeout=60))
+        self.application = builder.build()
         
         # Komponente za rad sa jelovnikom
-        self.scraper = MenuScraper()
-        self.parser = MenuParser()
         self.organizer = DataOrganizer()
         
-        # Tracker za statistiku korisnika
-        self.stats_tracker = UserStatsTracker()
+        # Više procesa bota (KLOPAS_WORKERS > 1): deljena SQLite baza, zakup vođe i podela broadcast-a
+        self.cluster = WorkerCluster.from_env()
         
-        # Putanja do markdown fajlova
+        # Tracker za statistiku korisnika - sa više procesa u deljenoj bazi umesto user_stats.json
+        if self.cluster.enabled:
+            self.stats_tracker = SharedUserStatsTracker(self.cluster.store)
+        else:
+            self.stats_tracker = UserStatsTracker()
+        
+        # Putanja do markdown fajlova (izvoz po danu - koristi se ako nema pakovanog meseca)
         self.daily_dir = Path("data/daily")
+        self.pack_reader = MenuPackReader(self.organizer.packed_dir)
+        
+        # Profilisanje na zahtev admina; faze preuzimanja se profilišu uz KLOPAS_PROFILE_INGEST=1
+        self.profiling = ProfilingHooks(ingest_profiling=os.getenv('KLOPAS_PROFILE_INGEST') == '1')
+        
+        # Preuzimanje jelovnika (isti pipeline kao main.py) - nastavlja od checkpoint-a posle greške.
+        # Scraper i parser (i njihove biblioteke) pipeline učitava tek pri prvom preuzimanju.
+        self.ingest = IngestPipeline(organizer=self.organizer, profiling=self.profiling)
+        
+        # Nedeljni prikaz: ISO (godina, nedelja) -> fragmenti dana (pon-pet), LRU sa WEEK_CACHE_WEEKS nedelja
+        self._week_cache: 'OrderedDict[Tuple[int, int], list]' = OrderedDict()
+        
+        # Generacija podataka za koju su učitani indeksi (DataOrganizer je povećava pri svakom upisu)
+        self._data_generation = self.organizer.current_generation()
+        self._load_indexes()
+        
+    def _load_indexes(self):
+        """Učitaj indekse alergena i pretrage iz sačuvanih jelovnika"""
+        all_menus = self.organizer.load_all_menus()
+        
+        # Invertovani indeks alergena - računa se pri preuzimanju jelovnika
+        self.allergen_index = AllergenIndex()
+        if not self.allergen_index.by_date:
+            self.allergen_index.update(all_menus)
+            self.allergen_index.save()
+        
+        # Indeks za pretragu jela - gradi se jednom iz svih sačuvanih meseci, pa dopunjuje pri preuzimanju
+        self.search_index = DishSearchIndex()
+        self.search_index.update(all_menus)
+        logger.info(f"Indeks pretrage: {len(self.search_index)} stavki iz {len(all_menus)} dana")
+        
+    async def check_data_generation(self, context: ContextTypes.DEFAULT_TYPE):
+        """Ponovo učitaj indekse kada je neki drugi proces (main.py, backfill) objavio nove podatke"""
+        generation = self.organizer.current_generation()
+        if generation == self._data_generation:
+            return
+        
+        logger.info(f"Nova generacija podataka {generation} (bila {self._data_generation}) - učitavam indekse")
+        self.pack_reader.reset()
+        self._week_cache.clear()
+        try:
+            await asyncio.to_thread(self._load_indexes)
+            self._data_generation = generation
+        except Exception as e:
+            logger.error(f"Greška pri učitavanju indeksa: {e}")
     
     def _is_admin(self, user_id: int) -> bool:
         """Proveri da li je korisnik admin"""
@@ -83,6 +185,11 @@ class KlopasBot:
         self.application.add_handler(CommandHandler("sutra", self.tomorrow_command))
         self.application.add_handler(CommandHandler("danas", self.today_command))
         self.application.add_handler(CommandHandler("help", self.help_command))
+        self.application.add_handler(CommandHandler("alergeni", self.allergens_command))
+        self.application.add_handler(CommandHandler("trazi", self.search_command))
+        self.application.add_handler(CommandHandler("nedelja", self.week_command))
+        self.application.add_handler(CommandHandler("profil", self.profile_command))
+        self.application.add_handler(CommandHandler("memorija", self.memory_command))
         
         # Message handler za mention poruke (@KlopasBOT) - samo u grupama  
         self.application.add_handler(MessageHandler(
@@ -126,7 +233,8 @@ class KlopasBot:
         keyboard = [
             [
                 KeyboardButton("🍽️ Danas"),
-                KeyboardButton("📅 Sutra")
+                KeyboardButton("📅 Sutra"),
+                KeyboardButton("🗓️ Nedelja")
             ]
         ]
         
@@ -147,6 +255,7 @@ class KlopasBot:
         
         return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
     
+    @timed_handler
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler za /start komandu"""
         self._track_user(update, "start")
@@ -160,9 +269,14 @@ class KlopasBot:
             reply_markup=self.get_main_keyboard(user_id)
         )
         
+    @timed_handler
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler za /help komandu"""
         self._track_user(update, "help")
+        await self.send_help(update)
+
+    async def send_help(self, update: Update):
+        """Pomoć - zajednička za /help, dugme i mention (meri je handler koji poziva)"""
         
         user_id = update.message.from_user.id
         is_admin = self._is_admin(user_id)
@@ -174,7 +288,13 @@ class KlopasBot:
 /start - Početni meni sa opcijama
 /danas - Jelovnik za danas
 /sutra - Jelovnik za sutra  
+/nedelja - Jelovnik za celu nedelju (pon-pet)
 /jelovnik - Prikaži opcije za jelovnik
+/alergeni - Alergeni za danas i sutra
+/alergeni 1 - Kada se u jelovniku pojavljuje alergen 1
+/alergeni dodaj 1,4 - Upozorenje u podsetniku za alergene 1 i 4
+/alergeni ukloni 1 - Ukloni upozorenje za alergen
+/trazi pasulj - Kada je (ili je bilo) neko jelo
 /help - Ova poruka
 
 *U grupama (tagovi):*
@@ -185,6 +305,7 @@ class KlopasBot:
 *Dugmići (privatni chat):*
 🍽️ Danas - Prikaži današnji jelovnik
 📅 Sutra - Prikaži sutrašnji jelovnik
+🗓️ Nedelja - Prikaži jelovnik za celu nedelju
 ⚙️ Podešavanja - Upravljaj automatskim obaveštenjima
 ℹ️ Pomoć - Ova poruka
 
@@ -198,6 +319,9 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
             help_text += """
 *Admin opcije:*
 🔄 Novi mesec - Preuzmi najnoviji jelovnik sa sajta vrtića (samo za admina)
+/profil start|stop - CPU profil (cProfile) procesa bota
+/profil ingest - Uključi/isključi profilisanje faza preuzimanja
+/memorija start|snimak|stop - Praćenje memorije (tracemalloc)
             """
         
         await update.message.reply_text(
@@ -206,9 +330,14 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
             reply_markup=self.get_main_keyboard(user_id)
         )
         
+    @timed_handler
     async def menu_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler za /jelovnik komandu"""
         self._track_user(update, "menu")
+        await self.send_menu_options(update)
+
+    async def send_menu_options(self, update: Update):
+        """Opcije za jelovnik - zajedničke za /jelovnik i mention (meri ih handler koji poziva)"""
         
         user_id = update.message.from_user.id
         
@@ -231,20 +360,264 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
             reply_markup=reply_markup
         )
         
+    @timed_handler
+    async def allergens_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler za /alergeni komandu - odgovor iz unapred izračunatog indeksa"""
+        self._track_user(update, "allergens")
+        
+        user_id = update.message.from_user.id
+        args = context.args or []
+        
+        # /alergeni dodaj 1,4 | /alergeni ukloni 1
+        if args and args[0].lower() in ('dodaj', 'ukloni'):
+            codes = [code for code in ','.join(args[1:]).replace(' ', '').split(',') if code.isdigit()]
+            if not codes:
+                await update.message.reply_text("Navedite oznake alergena, npr. /alergeni dodaj 1,4")
+                return
+            
+            current = set(self.stats_tracker.get_allergens(user_id))
+            if args[0].lower() == 'dodaj':
+                current |= set(codes)
+            else:
+                current -= set(codes)
+            self.stats_tracker.set_allergens(user_id, list(current))
+            
+            if current:
+                message = f"✅ Podsetnik će vas upozoriti na alergene: {', '.join(sorted(current, key=int))}"
+            else:
+                message = "✅ Upozorenja za alergene su isključena."
+            await update.message.reply_text(message)
+            return
+        
+        # /alergeni 1 - naredne pojave alergena
+        if args and args[0].isdigit():
+            code = args[0]
+            today_str = datetime.now().strftime('%Y-%m-%d')
+            entries = self.allergen_index.dates_for_code(code, from_date=today_str)
+            
+            if not entries:
+                await update.message.reply_text(f"Alergen {code} se ne pojavljuje u narednim jelovnicima.")
+                return
+            
+            message = f"⚠️ *Alergen {code}* - naredni dani:\n\n"
+            for entry in entries[:20]:
+                date_label = datetime.strptime(entry['date'], '%Y-%m-%d').strftime('%d.%m.')
+                meal_label = entry['meal'].replace('_', ' ').capitalize()
+                message += f"{date_label} {meal_label}: {escape_markdown(entry['item'])}\n"
+            await update.message.reply_text(message, parse_mode='Markdown')
+            return
+        
+        # /alergeni - danas i sutra
+        message = "⚠️ *Alergeni u jelovniku*\n"
+        for label, date in (("Danas", datetime.now()), ("Sutra", datetime.now() + timedelta(days=1))):
+            codes = self.allergen_index.codes_for_date(date.strftime('%Y-%m-%d'))
+            message += f"\n*{label}, {date.strftime('%d.%m.%Y.')}*\n"
+            if not codes:
+                message += "   • Nema podataka\n"
+            for code, items in codes.items():
+                message += f"   • {code}: {escape_markdown(', '.join(items))}\n"
+        
+        user_allergens = self.stats_tracker.get_allergens(user_id)
+        if user_allergens:
+            message += f"\n🔔 Vaša upozorenja: {', '.join(user_allergens)}"
+        else:
+            message += "\nZa upozorenje u podsetniku: /alergeni dodaj 1,4"
+        
+        await update.message.reply_text(message, parse_mode='Markdown')
+        
+    @timed_handler
+    async def search_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler za /trazi komandu - pretraga jela kroz sve sačuvane mesece"""
+        self._track_user(update, "search")
+        
+        query = ' '.join(context.args or []).strip()
+        if not query:
+            await update.message.reply_text("Navedite jelo koje tražite, npr. /trazi pasulj")
+            return
+        
+        results = self.search_index.search(query)
+        if not results:
+            await update.message.reply_text(f"🔍 Nema jela \"{query}\" u sačuvanim jelovnicima.")
+            return
+        
+        today_str = datetime.now().strftime('%Y-%m-%d')
+        # Upit i nazivi jela idu u Markdown poruku - *, _, ` i [ bi Telegram odbio kao BadRequest
+        message = f"🔍 *{escape_markdown(query)}*\n"
+        shown_past = False
+        for result in results:
+            if result['date'] < today_str and not shown_past:
+                message += "\n_Ranije:_\n"
+                shown_past = True
+            date_label = datetime.strptime(result['date'], '%Y-%m-%d').strftime('%d.%m.%Y.')
+            message += f"{date_label} {MEAL_LABELS.get(result['meal'], result['meal'])}: {escape_markdown(result['item'])}\n"
+        
+        await update.message.reply_text(message, parse_mode='Markdown')
+        
+    @timed_handler
+    async def week_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler za /nedelja komandu - ponedeljak-petak u jednoj poruci"""
+        self._track_user(update, "week")
+        await self.send_week(update)
+
+    async def send_week(self, update: Update):
+        """Ponedeljak-petak u jednoj poruci - zajedničko za /nedelja, dugme i mention"""
+        
+        today = datetime.now()
+        # Vikendom se prikazuje naredna nedelja
+        if today.weekday() >= 5:
+            today += timedelta(days=7 - today.weekday())
+        monday = datetime(today.year, today.month, today.day) - timedelta(days=today.weekday())
+        
+        await update.message.reply_text(
+            self._render_week(monday),
+            parse_mode='Markdown',
+            reply_markup=self._week_keyboard(monday)
+        )
+        
+    def _week_keyboard(self, monday: datetime) -> InlineKeyboardMarkup:
+        """Inline dugmad za prethodnu i sledeću nedelju (callback nosi datum ponedeljka)"""
+        return InlineKeyboardMarkup([[
+            InlineKeyboardButton("⬅️ Prethodna", callback_data=f"week:{(monday - timedelta(days=7)).strftime('%Y-%m-%d')}"),
+            InlineKeyboardButton("Sledeća ➡️", callback_data=f"week:{(monday + timedelta(days=7)).strftime('%Y-%m-%d')}")
+        ]])
+        
+    def _render_week(self, monday: datetime) -> str:
+        """Poruka sa jelovnikom za nedelju od datog ponedeljka
+        
+        Fragmenti dana se računaju jednom po ISO nedelji i čuvaju do sledeće
+        generacije podataka. Keširaju se samo nedelje sa jelovnikom, najviše
+        WEEK_CACHE_WEEKS poslednje korišćenih.
+        """
+        week_key = monday.isocalendar()[:2]
+        fragments = self._week_cache.get(week_key)
+        CACHE_REQUESTS.inc(cache='week', result='hit' if fragments is not None else 'miss')
+        if fragments is not None:
+            self._week_cache.move_to_end(week_key)
+        else:
+            fragments = []
+            for offset in range(5):
+                date = monday + timedelta(days=offset)
+                content = self._read_day_content(date.strftime('%Y-%m-%d'))
+                if content is not None:
+                    fragments.append(self._format_day_fragment(content, date))
+            if fragments:
+                self._week_cache[week_key] = fragments
+                if len(self._week_cache) > WEEK_CACHE_WEEKS:
+                    self._week_cache.popitem(last=False)
+        
+        friday = monday + timedelta(days=4)
+        message = f"🗓️ *Jelovnik {monday.strftime('%d.%m.')} - {friday.strftime('%d.%m.%Y.')}*\n"
+        if not fragments:
+            return message + "\n⚠️ Za ovu nedelju nema jelovnika."
+        return message + ''.join(fragments)
+        
+    def _format_day_fragment(self, markdown_content: str, date: datetime) -> str:
+        """Kratak prikaz jednog dana za nedeljnu poruku - jedan red po obroku"""
+        fragment = f"\n*{DAYS_SR[date.weekday()]}, {date.strftime('%d.%m.')}*\n"
+        meal_icons = {'## Doručak': '🥐', '## Užina I': '🍎', '## Ručak': '🍲', '## Užina II': '🍪'}
+        
+        current_icon = None
+        items = []
+        for line in markdown_content.split('\n') + ['']:
+            line = line.strip()
+            if line in meal_icons or not line:
+                if current_icon and items:
+                    fragment += f"{current_icon} {', '.join(items)}\n"
+                current_icon = meal_icons.get(line)
+                items = []
+            elif line.startswith('- ') and current_icon:
+                items.append(line[2:])
+        
+        return fragment
+        
+    async def _reply_profile_summary(self, update: Update, title: str, result):
+        """Pošalji putanju dump-a i sažetak (skraćen na dužinu Telegram poruke)"""
+        path, summary = result
+        text = f"{title}\n{path}\n\n{summary}"
+        if len(text) > 4000:
+            text = text[:4000] + "\n..."
+        await update.message.reply_text(text)
+        
+    @timed_handler
+    async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler za /profil komandu (samo admin) - cProfile sesija u procesu bota"""
+        self._track_user(update, "profile")
+        
+        if not self._is_admin(update.message.from_user.id):
+            await update.message.reply_text("⛔ Ova opcija je dostupna samo za administratora bota.")
+            return
+        
+        action = (context.args or [''])[0].lower()
+        if action == 'start':
+            if self.profiling.start_cpu():
+                await update.message.reply_text("⏺️ CPU profilisanje pokrenuto. Zaustavite sa /profil stop")
+            else:
+                await update.message.reply_text("CPU profilisanje je već pokrenuto.")
+        elif action == 'stop':
+            result = self.profiling.stop_cpu()
+            if result is None:
+                await update.message.reply_text("CPU profilisanje nije pokrenuto.")
+            else:
+                await self._reply_profile_summary(update, "⏹️ CPU profil sačuvan:", result)
+        elif action == 'ingest':
+            self.profiling.ingest_profiling = not self.profiling.ingest_profiling
+            status = "uključeno" if self.profiling.ingest_profiling else "isključeno"
+            await update.message.reply_text(
+                f"Profilisanje faza preuzimanja je {status} (profili se čuvaju u {self.profiling.output_dir}/)."
+            )
+        else:
+            await update.message.reply_text("Upotreba: /profil start | stop | ingest")
+        
+    @timed_handler
+    async def memory_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler za /memorija komandu (samo admin) - tracemalloc snimci"""
+        self._track_user(update, "memory")
+        
+        if not self._is_admin(update.message.from_user.id):
+            await update.message.reply_text("⛔ Ova opcija je dostupna samo za administratora bota.")
+            return
+        
+        action = (context.args or [''])[0].lower()
+        if action == 'start':
+            if self.profiling.start_memory():
+                await update.message.reply_text("⏺️ Praćenje memorije pokrenuto. Snimak sa /memorija snimak")
+            else:
+                await update.message.reply_text("Praćenje memorije je već pokrenuto.")
+        elif action == 'snimak':
+            result = self.profiling.memory_snapshot()
+            if result is None:
+                await update.message.reply_text("Praćenje memorije nije pokrenuto - /memorija start")
+            else:
+                await self._reply_profile_summary(update, "📸 Snimak memorije sačuvan:", result)
+        elif action == 'stop':
+            if self.profiling.stop_memory():
+                await update.message.reply_text("⏹️ Praćenje memorije zaustavljeno.")
+            else:
+                await update.message.reply_text("Praćenje memorije nije pokrenuto.")
+        else:
+            await update.message.reply_text("Upotreba: /memorija start | snimak | stop")
+        
+    @timed_handler
     async def today_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler za /danas komandu"""
         self._track_user(update, "today")
         await self.send_menu_for_date(update, datetime.now())
         
+    @timed_handler
     async def tomorrow_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler za /sutra komandu"""
         self._track_user(update, "tomorrow")
         tomorrow = datetime.now() + timedelta(days=1)
         await self.send_menu_for_date(update, tomorrow)
     
+    @timed_handler
     async def settings_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler za podešavanja"""
         self._track_user(update, "settings")
+        await self.send_settings(update)
+
+    async def send_settings(self, update: Update):
+        """Podešavanja - zajednička za komandu i dugme (meri ih handler koji poziva)"""
         
         user_id = update.message.from_user.id
         notifications = self.stats_tracker.get_notifications(user_id)
@@ -270,6 +643,7 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
         )
 
         
+    @timed_handler
     async def handle_keyboard_button(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler za dugmiće sa tastature"""
         self._track_user(update, "keyboard")
@@ -281,6 +655,8 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
         elif text == "📅 Sutra":
             tomorrow = datetime.now() + timedelta(days=1)
             await self.send_menu_for_date(update, tomorrow)
+        elif text == "🗓️ Nedelja":
+            await self.send_week(update)
         elif text == "🔄 Novi mesec":
             # Proveri da li je korisnik admin
             if not self._is_admin(user_id):
@@ -291,10 +667,11 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
                 return
             await self.download_new_month_menu(update)
         elif text == "⚙️ Podešavanja":
-            await self.settings_command(update, context)
+            await self.send_settings(update)
         elif text == "ℹ️ Pomoć":
-            await self.help_command(update, context)
+            await self.send_help(update)
     
+    @timed_handler
     async def handle_group_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler za mention poruke (@KlopasBOT danas/sutra)"""
         self._track_user(update, "group_mention")
@@ -345,10 +722,12 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
         elif "sutra" in message_text_lower or "tomorrow" in message_text_lower:
             tomorrow = datetime.now() + timedelta(days=1)
             await self.send_menu_for_date(update, tomorrow)
+        elif "nedelja" in message_text_lower or "week" in message_text_lower:
+            await self.send_week(update)
         elif "jelovnik" in message_text_lower or "menu" in message_text_lower:
-            await self.menu_command(update, context)
+            await self.send_menu_options(update)
         elif "pomoć" in message_text_lower or "help" in message_text_lower:
-            await self.help_command(update, context)
+            await self.send_help(update)
         elif "novi mesec" in message_text_lower or "new month" in message_text_lower:
             # Proveri da li je korisnik admin
             if not self._is_admin(user_id):
@@ -364,6 +743,7 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
                 "Mogu da vam pomožem sa:\n"
                 f"@{bot_username} danas - jelovnik za danas\n"
                 f"@{bot_username} sutra - jelovnik za sutra\n"
+                f"@{bot_username} nedelja - jelovnik za celu nedelju\n"
                 f"@{bot_username} pomoć - sve dostupne opcije"
             )
             
@@ -373,6 +753,7 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
                 
             await update.message.reply_text(help_text)
     
+    @timed_handler
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler za callback dugmad"""
         self._track_user(update, "callback")
@@ -397,7 +778,16 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
             await self.download_new_month_menu(update, is_callback=True)
         elif query.data == 'toggle_notifications':
             await self.toggle_notifications_callback(update, context)
+        elif query.data.startswith('week:'):
+            # Promena nedelje menja postojeću poruku umesto slanja nove
+            monday = datetime.strptime(query.data[5:], '%Y-%m-%d')
+            await query.edit_message_text(
+                self._render_week(monday),
+                parse_mode='Markdown',
+                reply_markup=self._week_keyboard(monday)
+            )
     
+    @timed_handler
     async def toggle_notifications_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Toggle notifications za korisnika"""
         query = update.callback_query
@@ -432,6 +822,7 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
             f"✅ Obaveštenja {'uključena' if new_status else 'isključena'}!"
         )
             
+    @timed_handler
     async def send_menu_for_date(self, update: Update, date: datetime, is_callback: bool = False):
         """Pošalji jelovnik za određeni datum"""
         
@@ -441,9 +832,7 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
         else:
             user_id = update.message.from_user.id
         
-        # Formatiraj datum za ime fajla
         date_str = date.strftime('%Y-%m-%d')
-        file_path = self.daily_dir / f"{date_str}.md"
         
         # Proveri da li je radni dan
         if date.weekday() >= 5:  # Subota ili nedelja
@@ -454,8 +843,9 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
                 await update.message.reply_text(message)
             return
             
-        # Proveri da li fajl postoji
-        if not file_path.exists():
+        # Pročitaj jelovnik
+        content = self._read_day_content(date_str)
+        if content is None:
             message = f"⚠️ Jelovnik za {date.strftime('%d.%m.%Y.')} nije pronađen.\n\n"
             if self._is_admin(user_id):
                 message += "Koristite dugme '🔄 Novi mesec' za preuzimanje najnovijeg jelovnika."
@@ -465,12 +855,8 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
                 await update.message.reply_text(message)
             return
             
-        # Pročitaj jelovnik
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
         # Formatiraj poruku
-        message = self._format_menu_message(content, date)
+        message = format_menu_message(content, date)
         
         # Pošalji poruku
         if is_callback:
@@ -486,48 +872,19 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
                 reply_markup=self.get_main_keyboard(user_id)
             )
             
-    def _format_menu_message(self, markdown_content: str, date: datetime) -> str:
-        """Formatira markdown sadržaj u Telegram poruku"""
-        
-        lines = markdown_content.split('\n')
-        
-        # Dani na srpskom
-        days_sr = {
-            0: 'Ponedeljak', 1: 'Utorak', 2: 'Sreda',
-            3: 'Četvrtak', 4: 'Petak', 5: 'Subota', 6: 'Nedelja'
-        }
+    def _read_day_content(self, date_str: str) -> Optional[str]:
+        """Markdown dana iz pakovanog mesečnog fajla, ili iz izvezenog dnevnog fajla"""
+        content = self.pack_reader.get(date_str)
+        if content is not None:
+            return content
         
-        day_name = days_sr[date.weekday()]
-        formatted_date = date.strftime('%d.%m.%Y.')
-        
-        message = f"🍽️ *Jelovnik za {day_name}, {formatted_date}*\n\n"
-        
-        current_meal = None
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith('## Doručak'):
-                current_meal = '🥐 *Doručak:*\n'
-                message += current_meal
-            elif line.startswith('## Užina I'):
-                current_meal = '🍎 *Užina I:*\n'
-                message += '\n' + current_meal
-            elif line.startswith('## Ručak'):
-                current_meal = '🍲 *Ručak:*\n'
-                message += '\n' + current_meal
-            elif line.startswith('## Užina II'):
-                current_meal = '🍪 *Užina II:*\n'
-                message += '\n' + current_meal
-            elif line.startswith('- ') and current_meal:
-                # Ukloni "- " i dodaj sa boljim formatiranjem
-                item = line[2:]
-                # Skrati ako je predugačko
-                if len(item) > 100:
-                    item = item[:100] + '...'
-                message += f"   • {item}\n"
-                
-        return message
+        file_path = self.daily_dir / f"{date_str}.md"
+        if not file_path.exists():
+            return None
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
         
+    @timed_handler
     async def download_new_month_menu(self, update: Update, is_callback: bool = False):
         """Preuzmi novi jelovnik sa sajta"""
         
@@ -538,43 +895,81 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
         else:
             msg = await update.message.reply_text(loading_message)
             
+        loop = asyncio.get_running_loop()
+
+        def progress(stage: str, days: int, last_date: Optional[str]):
+            # Poziva se iz niti pipeline-a - izmena poruke se zakazuje u event loop-u
+            if stage == 'parse' and days == 0:
+                text = "⏳ Jelovnik preuzet, obrađujem dane..."
+            elif stage == 'parse' and days % 5 == 0:
+                text = (f"⏳ Obrađeno {days} dana "
+                        f"(poslednji: {datetime.strptime(last_date, '%Y-%m-%d').strftime('%d.%m.%Y.')})...")
+            else:
+                return
+            asyncio.run_coroutine_threadsafe(msg.edit_text(text), loop)
+
         try:
-            # Preuzmi PDF
-            pdf_path = self.scraper.get_current_month_menu()
-            
-            if not pdf_path:
+            # Preuzimanje i parsiranje su blokirajući posao - ne blokiraj event loop.
+            # Sa više procesa preuzima samo onaj koji dobije zakup 'ingest' u deljenoj bazi.
+            with self.cluster.exclusive('ingest', ttl=1800) as acquired:
+                if acquired:
+                    result = await asyncio.to_thread(self.ingest.run, progress=progress)
+                else:
+                    result = {'status': 'busy'}
+            status = result['status']
+
+            if status == 'busy':
+                await msg.edit_text("⏳ Preuzimanje jelovnika je već u toku.")
+                return
+            if status == 'not_found':
                 await msg.edit_text(
                     "❌ Nije pronađen jelovnik za trenutni mesec na sajtu.\n"
                     "Proverite da li je objavljen na:\n"
                     "https://www.nasaradost.edu.rs/jelovnik/"
                 )
                 return
-                
-            # Parsiraj PDF
-            menu_data = self.parser.parse_pdf(pdf_path)
-            
-            if not menu_data:
+            if status == 'unchanged':
+                await msg.edit_text("✅ Jelovnik je već ažuran - PDF nije menjan.")
+                return
+            if status == 'empty':
                 await msg.edit_text("❌ Greška pri čitanju PDF fajla.")
                 return
-                
-            # Kreiraj markdown fajlove
-            created_files = self.organizer.create_daily_markdown_files(menu_data)
-            
-            # Kreiraj mesečni sumarni fajl
-            current_date = datetime.now()
-            self.organizer.create_monthly_summary(
-                menu_data,
-                current_date.month,
-                current_date.year
-            )
+            if status == 'failed':
+                await msg.edit_text(
+                    f"❌ Greška pri preuzimanju jelovnika (faza: {result['failed_stage']}).\n"
+                    f"Detalji: {result['error']}\n"
+                    + ("Parsirani dani su sačuvani - sledeći pokušaj nastavlja od upisa."
+                       if result['failed_stage'] == 'organize' else "")
+                )
+                return
+
+            menu_data = result['menu_data']
+            removed_dates = result['removed_dates']
+            menu_diff = result['menu_diff']
+            summaries = result['summaries']
+            created_files = len(menu_data)
+            changed_files = result['changed_files']
+
+            # Pipeline je upisao fajlove; indeksi u memoriji se dopunjuju ovde, u event loop niti
+            self.allergen_index.update(menu_data, removed_dates)
+            self.search_index.update(menu_data, removed_dates)
+            self.pack_reader.reset()
+            self._week_cache.clear()
+            # Sopstveni upis je već u indeksima - ne učitavaj ga ponovo
+            self._data_generation = self.organizer.current_generation()
             
+            changes_summary = menu_diff.format_summary()
             await msg.edit_text(
                 f"✅ *Uspešno preuzet jelovnik!*\n\n"
-                f"📄 Parsiran PDF za {current_date.strftime('%B %Y.')}\n"
-                f"📁 Kreirano {created_files} dnevnih fajlova\n\n"
-                f"Sada možete koristiti komande /danas ili /sutra za prikaz jelovnika.",
+                f"📄 Parsiran PDF za {', '.join(summary.stem for summary in summaries)} "
+                f"(način: {result['parse_mode']})\n"
+                f"📁 Obrađeno {created_files} dana, izmenjeno {changed_files} fajlova\n"
+                + (f"{changes_summary}\n" if changes_summary else "")
+                + f"\nSada možete koristiti komande /danas ili /sutra za prikaz jelovnika.",
                 parse_mode='Markdown'
             )
+
+            await self.notify_menu_changes(menu_diff)
             
         except Exception as e:
             logger.error(f"Greška pri preuzimanju jelovnika: {e}")
@@ -583,8 +978,152 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
                 f"Detalji: {str(e)}"
             )
             
+    async def notify_menu_changes(self, menu_diff: MenuDiff):
+        """Pošalji jednu poruku 'izmena jelovnika' za izmenjene dane u naredna 48h"""
+        upcoming = menu_diff.upcoming_changes()
+        if not upcoming:
+            return
+
+        message = menu_diff.format_notification(upcoming)
+        users_with_notifications = self.stats_tracker.get_users_with_notifications_enabled()
+        logger.info(f"Izmena jelovnika za {', '.join(upcoming)} - šaljem {len(users_with_notifications)} korisnika")
+
+        if self.cluster.enabled:
+            # Ključ je generacija podataka - ista izmena se ne objavljuje dvaput
+            self.cluster.publish_broadcast(f"menu-changes-{self.organizer.current_generation()}", message)
+            await self.process_broadcasts()
+            return
+
+        await self._send_to_users(self.application.bot, users_with_notifications, message)
+
+    async def process_broadcasts(self, context: Optional[ContextTypes.DEFAULT_TYPE] = None):
+        """Pošalji delove broadcast-a koje je ovaj proces preuzeo (korisnici sa chat_id % N == deo)"""
+        try:
+            claims = self.cluster.claim_broadcasts()
+        except Exception as e:
+            logger.error(f"Greška pri preuzimanju broadcast-a: {e}")
+            return
+
+        for claim in claims:
+            user_ids = [
+                user_id for user_id in self.stats_tracker.get_users_with_notifications_enabled()
+                if user_id % claim['workers'] == claim['shard']
+            ]
+            user_suffix = self._allergen_warning(claim['allergen_date']) if claim['allergen_date'] else None
+            logger.info(f"Broadcast '{claim['key']}' deo {claim['shard']}/{claim['workers']}: {len(user_ids)} korisnika")
+
+            # Heartbeat drži zakup dela i dok slanje čeka retry_after - bez njega bi drugi proces
+            # preuzeo deo posle stale_after sekundi i poslao ga ponovo
+            lost = asyncio.Event()
+            heartbeat = asyncio.create_task(self._broadcast_heartbeat(claim, lost))
+            try:
+                success_count, fail_count = await self._send_to_users(
+                    self.application.bot, user_ids, claim['message'], user_suffix=user_suffix,
+                    should_stop=lost.is_set
+                )
+            finally:
+                heartbeat.cancel()
+
+            if lost.is_set():
+                continue
+            # Deo u kom nijedno slanje nije uspelo ponovo čeka (najviše max_attempts pokušaja)
+            self.cluster.finish_broadcast(claim['key'], claim['shard'], success_count, fail_count,
+                                          retry=bool(user_ids) and success_count == 0)
+
+    async def _broadcast_heartbeat(self, claim: Dict, lost: asyncio.Event):
+        """Periodično obnavlja zakup dela broadcast-a; postavlja `lost` ako ga je preuzeo drugi proces"""
+        while True:
+            await asyncio.sleep(self.cluster.heartbeat_interval)
+            try:
+                alive = self.cluster.heartbeat_broadcast(claim['key'], claim['shard'])
+            except Exception as e:
+                logger.error(f"Greška pri obnavljanju broadcast-a '{claim['key']}' deo {claim['shard']}: {e}")
+                continue
+            if not alive:
+                logger.warning(f"Broadcast '{claim['key']}' deo {claim['shard']} preuzeo je drugi proces - "
+                               f"slanje se prekida")
+                lost.set()
+                return
+
+    async def _wait_for_broadcast(self, key: str, timeout: float = 240.0, interval: float = 5.0) -> bool:
+        """Sačekaj da svi delovi broadcast-a završe - False ako nijedna poruka nije poslata ili slanje traje duže
+
+        timeout je kraći od intervala provere podsetnika (5 min), pa sledeća provera ponovo čeka ishod.
+        """
+        deadline = time_module.monotonic() + timeout
+        while True:
+            try:
+                succeeded = self.cluster.broadcast_succeeded(key)
+            except Exception as e:
+                logger.error(f"Greška pri proveri broadcast-a '{key}': {e}")
+                succeeded = None
+            if succeeded is not None:
+                return succeeded
+            if time_module.monotonic() >= deadline:
+                logger.warning(f"Broadcast '{key}' nije završen za {timeout:.0f}s")
+                return False
+            await asyncio.sleep(interval)
+
+    async def renew_leadership(self, context: ContextTypes.DEFAULT_TYPE):
+        """Preuzmi ili produži zakup vođe (svaki proces, periodično)"""
+        CLUSTER_LEADER.set(1 if self.cluster.renew() else 0)
+
+    async def _send_with_retry(self, bot, max_retries: int = 3, **kwargs):
+        """send_message koji posle 429 (flood control) čeka retry_after i pokušava ponovo"""
+        for attempt in range(max_retries + 1):
+            try:
+                return await bot.send_message(**kwargs)
+            except RetryAfter as e:
+                if attempt == max_retries:
+                    raise
+                SEND_RETRIES.inc()
+                logger.warning(f"Flood control za {kwargs.get('chat_id')} - ponovo za {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+
+    async def _send_to_users(self, bot, user_ids: list, message: str, user_suffix=None, should_stop=None):
+        """Pošalji poruku listi korisnika
+
+        Args:
+            user_suffix: Opciona funkcija user_id -> tekst koji se dodaje poruci tog korisnika
+            should_stop: Opciona funkcija - kada vrati True, preostalim korisnicima se ne šalje
+
+        Returns:
+            tuple: (broj uspešnih, broj neuspešnih slanja)
+        """
+        success_count = 0
+        fail_count = 0
+        start = time_module.perf_counter()
+
+        for user_id in user_ids:
+            if should_stop and should_stop():
+                break
+            try:
+                await self._send_with_retry(
+                    bot,
+                    chat_id=user_id,
+                    text=message + (user_suffix(user_id) if user_suffix else ""),
+                    parse_mode='Markdown'
+                )
+                success_count += 1
+                logger.info(f"✅ Poslato korisniku {user_id}")
+            except Exception as e:
+                fail_count += 1
+                SEND_FAILURES.inc(reason=type(e).__name__)
+                logger.warning(f"❌ Greška pri slanju korisniku {user_id}: {e}")
+
+        duration = time_module.perf_counter() - start
+        BROADCAST_DURATION.observe(duration)
+        BROADCAST_MESSAGES.inc(success_count, status='sent')
+        BROADCAST_MESSAGES.inc(fail_count, status='failed')
+        if user_ids and duration > 0:
+            BROADCAST_THROUGHPUT.set(len(user_ids) / duration)
+
+        return success_count, fail_count
+
     async def update_bot_short_description(self, context: ContextTypes.DEFAULT_TYPE):
         """Ažuriraj short description bota sa statistikom aktivnih korisnika"""
+        if not self.cluster.is_leader:
+            return
         try:
             stats = self.stats_tracker.get_current_month_stats()
             current_active = stats["current_month_active"]
@@ -612,6 +1151,9 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
     
     async def check_and_send_menu(self, context: ContextTypes.DEFAULT_TYPE):
         """Proverava svakih 5 minuta da li je vreme (19:55-20:05) za slanje jelovnika"""
+        if not self.cluster.is_leader:
+            return  # Sa više procesa proverava samo vođa
+
         import pytz
         belgrade_tz = pytz.timezone('Europe/Belgrade')
         now = datetime.now(belgrade_tz)
@@ -645,6 +1187,20 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
         else:
             logger.warning(f"⚠️ Slanje nije uspelo, marker NIJE postavljen. Ponoviću pokušaj u sledećem ciklusu.")
 
+    def _allergen_warning(self, date_str: str):
+        """Funkcija user_id -> upozorenje za alergene koje je korisnik prijavio (iz indeksa, bez čitanja teksta)"""
+        day_allergens = self.allergen_index.codes_for_date(date_str)
+
+        def allergen_warning(user_id):
+            matches = [code for code in self.stats_tracker.get_allergens(user_id) if code in day_allergens]
+            if not matches:
+                return ""
+            # Tekst jela je iz PDF-a - escape za Markdown poruku podsetnika
+            lines = [f"   • {code}: {escape_markdown(', '.join(day_allergens[code]))}" for code in matches]
+            return "\n⚠️ *Vaši alergeni sutra:*\n" + "\n".join(lines) + "\n"
+
+        return allergen_warning
+
     async def scheduled_daily_menu(self, context: ContextTypes.DEFAULT_TYPE):
         """Funkcija koja se poziva svaki radni dan u 20:00
         Šalje jelovnik svim aktivnim korisnicima u privatnom chatu
@@ -668,28 +1224,19 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
             logger.info("Sutra je vikend, ne šaljem jelovnik")
             return False
 
-        # Formatiraj datum za ime fajla
         date_str = tomorrow.strftime('%Y-%m-%d')
-        file_path = self.daily_dir / f"{date_str}.md"
 
-        logger.info(f"Looking for menu file: {file_path}")
-
-        # Proveri da li fajl postoji
-        if not file_path.exists():
+        # Pročitaj jelovnik
+        content = self._read_day_content(date_str)
+        if content is None:
             logger.warning(f"Jelovnik za {date_str} ne postoji")
             return False
 
-        logger.info(f"Menu file found! Reading content...")
-
-        # Pročitaj jelovnik
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
         logger.info(f"Menu content read ({len(content)} chars)")
 
         # Formatiraj poruku
         message = "🔔 *Podsetnik za sutra*\n\n"
-        message += self._format_menu_message(content, tomorrow)
+        message += format_menu_message(content, tomorrow)
 
         logger.info(f"Message formatted ({len(message)} chars)")
 
@@ -701,22 +1248,21 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
             logger.warning("Nema korisnika sa uključenim notifikacijama")
             return False
 
-        # Pošalji korisnicima sa uključenim notifikacijama
-        success_count = 0
-        fail_count = 0
+        if self.cluster.enabled:
+            # Svaki proces šalje svom delu korisnika - vođa objavljuje broadcast i odmah šalje svoj deo.
+            # Uspeh zavisi od ishoda svih delova; ponovljeni poziv ne objavljuje broadcast ponovo.
+            key = f"daily-{date_str}"
+            self.cluster.publish_broadcast(key, message, allergen_date=date_str)
+            await self.process_broadcasts(context)
+            success = await self._wait_for_broadcast(key)
+            logger.info(f"SLANJE ZAVRŠENO (broadcast '{key}'): {'uspešno' if success else 'neuspešno'}")
+            logger.info("=" * 50)
+            return success
 
-        for user_id in users_with_notifications:
-            try:
-                await context.bot.send_message(
-                    chat_id=user_id,
-                    text=message,
-                    parse_mode='Markdown'
-                )
-                success_count += 1
-                logger.info(f"✅ Poslato korisniku {user_id}")
-            except Exception as e:
-                fail_count += 1
-                logger.warning(f"❌ Greška pri slanju korisniku {user_id}: {e}")
+        # Pošalji korisnicima sa uključenim notifikacijama
+        success_count, fail_count = await self._send_to_users(
+            context.bot, users_with_notifications, message, user_suffix=self._allergen_warning(date_str)
+        )
 
         logger.info(f"SLANJE ZAVRŠENO: {success_count} uspešno, {fail_count} neuspešno")
         logger.info("=" * 50)
@@ -742,6 +1288,14 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
             name='menu_check_repeating'
         )
 
+        # Praćenje generacije podataka - upisi iz drugih procesa (main.py, backfill)
+        job_queue.run_repeating(
+            self.check_data_generation,
+            interval=60,
+            first=60,
+            name='check_data_generation'
+        )
+        
         # Postavi job za ažuriranje short description - jednom dnevno u 9:00
         job_queue.run_daily(
             self.update_bot_short_description,
@@ -755,43 +1309,55 @@ Možeš uključiti/isključiti obaveštenja u podešavanjima.
             when=5  # Nakon 5 sekundi
         )
 
-        logger.info("Scheduler pokrenut - provera svakih 5 minuta da li je 20:00 za slanje jelovnika")
-        logger.info("Scheduler pokrenut - ažuriranje short description svaki dan u 9:00")
+        if self.cluster.enabled:
+            # Zakup vođe se preuzima pre pokretanja, da bi vođa odmah polovao i pokretao poslove
+            CLUSTER_LEADER.set(1 if self.cluster.renew() else 0)
+            logger.info(f"Proces {self.cluster.index + 1}/{self.cluster.workers} "
+                        f"({'vođa' if self.cluster.is_leader else 'rezerva'})")
 
-        # Pokreni bot sa error handling
-        logger.info("Bot pokrenut...")
-        self._run_bot_with_retry()
+            job_queue.run_repeating(
+                self.renew_leadership,
+                interval=self.cluster.leader.ttl / 3,
+                first=self.cluster.leader.ttl / 3,
+                name='renew_leadership'
+            )
 
-    def _run_bot_with_retry(self):
-        """Pokreni bot sa automatskim retry logikom"""
-        import time
-        retry_count = 0
-        max_retries = 5
-        base_delay = 30  # sekundi
+            # Svaki proces šalje svoj deo broadcast-a koji je objavio vođa
+            job_queue.run_repeating(
+                self.process_broadcasts,
+                interval=15,
+                first=15,
+                name='process_broadcasts'
+            )
 
-        while retry_count < max_retries:
-            try:
-                logger.info(f"Pokušaj pokretanja bota #{retry_count + 1}")
-                self.application.run_polling(
-                    allowed_updates=Update.ALL_TYPES,
-                    drop_pending_updates=True,  # Ignoriši stare poruke
-                    connect_timeout=60,  # 60 sekundi timeout za connection
-                    read_timeout=60,     # 60 sekundi timeout za čitanje
-                    write_timeout=60     # 60 sekundi timeout za pisanje
-                )
-                # Ako dođemo do ovde, bot je uspešno završen
-                logger.info("Bot je uspešno završen")
-                break
+        logger.info("Scheduler pokrenut - provera svakih 5 minuta da li je 20:00 za slanje jelovnika")
+        logger.info("Scheduler pokrenut - ažuriranje short description svaki dan u 9:00")
 
-            except Exception as e:
-                retry_count += 1
-                delay = base_delay * (2 ** (retry_count - 1))  # Exponential backoff
+        # Lokalni endpoint sa metrikama (Prometheus text format), ako je METRICS_PORT postavljen
+        metrics_port = os.getenv('METRICS_PORT')
+        if metrics_port:
+            # Sa više procesa svaki ima svoj port: METRICS_PORT + indeks procesa
+            MetricsServer(int(metrics_port) + self.cluster.index, os.getenv('METRICS_HOST', '127.0.0.1')).start()
 
-                logger.error(f"Greška pri radu bota (pokušaj {retry_count}/{max_retries}): {e}")
+        # Pokreni bot sa error handling
+        logger.info("Bot pokrenut...")
+        self._run_supervised()
 
-                if retry_count < max_retries:
-                    logger.info(f"Restartovanje bota za {delay} sekundi...")
-                    time.sleep(delay)
-                else:
-                    logger.error("Maksimalni broj pokušaja dostignut. Bot se zaustavlja.")
-                    raise
+    def _run_supervised(self):
+        """Pokreni polling pod supervizorom - posle prekida mreže ponovo se povezuje samo mrežni sloj,
+        a keševi, statistika i zakazani poslovi ostaju u memoriji"""
+        supervisor = PollingSupervisor(
+            self.application,
+            base_delay=float(os.getenv('RECONNECT_BASE_DELAY', '1')),
+            max_delay=float(os.getenv('RECONNECT_MAX_DELAY', '60')),
+            healthy_after=float(os.getenv('RECONNECT_HEALTHY_AFTER', '300')),
+            polling_kwargs={'allowed_updates': Update.ALL_TYPES},
+            # Telegram dozvoljava jedan getUpdates po tokenu - sa više procesa update-e prima samo vođa
+            can_poll=lambda: self.cluster.is_leader,
+        )
+        try:
+            asyncio.run(supervisor.run())
+        finally:
+            # Oslobođen zakup - drugi proces preuzima polling i poslove odmah, bez čekanja isteka
+            self.cluster.release()
+        logger.info("Bot je uspešno završen")
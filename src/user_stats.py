@@ -7,6 +7,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 
+from src.metrics import SAVE_STATS_DURATION, SAVE_STATS_BYTES
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,8 +34,11 @@ class UserStatsTracker:
     def _save_stats(self):
         """Sačuvaj statistiku u fajl"""
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=2, ensure_ascii=False)
+            with SAVE_STATS_DURATION.time():
+                content = json.dumps(self.stats, indent=2, ensure_ascii=False)
+                with open(self.stats_file, 'w', encoding='utf-8') as f:
+                    f.write(content)
+            SAVE_STATS_BYTES.observe(len(content.encode('utf-8')))
         except Exception as e:
             logger.error(f"Greška pri čuvanju statistike: {e}")
     
@@ -261,6 +266,46 @@ class UserStatsTracker:
         # Vrati notification status, default True ako polje ne postoji
         return self.stats["users"][user_id_str].get("notifications_enabled", True)
     
+    def set_allergens(self, user_id: int, codes: list):
+        """
+        Postavi oznake alergena za koje korisnik želi upozorenje u podsetniku
+        
+        Args:
+            user_id: Telegram user ID
+            codes: Lista oznaka alergena (npr. ['1', '4'])
+        """
+        user_id_str = str(user_id)
+        
+        # Ako korisnik ne postoji, kreiraj ga
+        if user_id_str not in self.stats["users"]:
+            today = datetime.now().strftime('%Y-%m-%d')
+            self.stats["users"][user_id_str] = {
+                "first_seen": today,
+                "last_seen": today,
+                "username": None,
+                "first_name": None,
+                "total_interactions": 0,
+                "daily_interactions": {},
+                "notifications_enabled": True
+            }
+        
+        self.stats["users"][user_id_str]["allergens"] = sorted(set(codes), key=int)
+        self._save_stats()
+        logger.info(f"Alergeni {codes} postavljeni za korisnika {user_id}")
+    
+    def get_allergens(self, user_id: int) -> list:
+        """
+        Dobavi oznake alergena za korisnika
+        
+        Args:
+            user_id: Telegram user ID
+            
+        Returns:
+            Lista oznaka alergena (prazna ako nisu postavljeni)
+        """
+        user_data = self.stats["users"].get(str(user_id), {})
+        return user_data.get("allergens", [])
+    
     def get_users_with_notifications_enabled(self) -> list:
         """
         Dobavi IDs svih korisnika koji imaju uključene notifikacije
@@ -308,3 +353,211 @@ class UserStatsTracker:
         if keys_to_remove:
             logger.info(f"Očišćeno {len(keys_to_remove)} dnevnih zapisa starijih od {days_to_keep} dana")
             self._save_stats()
+
+
+USER_STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    username TEXT,
+    first_name TEXT,
+    total_interactions INTEGER NOT NULL DEFAULT 0,
+    notifications_enabled INTEGER NOT NULL DEFAULT 1,
+    allergens TEXT
+);
+CREATE TABLE IF NOT EXISTS daily_interactions (
+    day TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, user_id)
+);
+CREATE TABLE IF NOT EXISTS monthly_active (
+    month TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (month, user_id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SharedUserStatsTracker:
+    """Statistika korisnika u deljenoj SQLite bazi - za više procesa bota
+
+    Isti interfejs kao UserStatsTracker, ali svaka izmena je jedna transakcija
+    u bazi, pa procesi ne prepisuju tuđe izmene kao kod user_stats.json.
+    Pri prvom pokretanju se postojeći user_stats.json uvozi u bazu.
+    """
+
+    def __init__(self, store, stats_file: str = "data/user_stats.json"):
+        """
+        Args:
+            store: SharedStore (src.cluster) koji dele svi procesi
+            stats_file: JSON statistika koja se uvozi pri prvom pokretanju
+        """
+        self.store = store
+        self.store.ensure_schema(USER_STATS_SCHEMA)
+        self._import_json(Path(stats_file))
+
+    def _import_json(self, stats_file: Path):
+        """Uvezi user_stats.json u bazu (samo jednom, u transakciji - drugi procesi čekaju)"""
+        with self.store.transaction(immediate=True) as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'user_stats_imported'").fetchone():
+                return
+
+            stats = UserStatsTracker(str(stats_file)).stats if stats_file.exists() else {}
+            for user_id_str, user_data in stats.get("users", {}).items():
+                conn.execute(
+                    "INSERT OR IGNORE INTO users (user_id, first_seen, last_seen, username, first_name, "
+                    "total_interactions, notifications_enabled, allergens) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (int(user_id_str), user_data.get("first_seen", ""), user_data.get("last_seen", ""),
+                     user_data.get("username"), user_data.get("first_name"),
+                     user_data.get("total_interactions", 0), int(user_data.get("notifications_enabled", True)),
+                     json.dumps(user_data["allergens"]) if "allergens" in user_data else None)
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO daily_interactions (day, user_id, count) VALUES (?, ?, ?)",
+                    [(day, int(user_id_str), count) for day, count in user_data.get("daily_interactions", {}).items()]
+                )
+            # daily_active se izvodi iz daily_interactions; dani bez interakcija ostaju bez korisnika
+            for month, user_ids in stats.get("monthly_active", {}).items():
+                conn.executemany(
+                    "INSERT OR IGNORE INTO monthly_active (month, user_id) VALUES (?, ?)",
+                    [(month, int(user_id)) for user_id in user_ids]
+                )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('user_stats_imported', ?)",
+                         (datetime.now().isoformat(),))
+
+        if stats:
+            logger.info(f"Uvezena statistika {len(stats.get('users', {}))} korisnika iz {stats_file}")
+
+    def _ensure_user(self, conn, user_id: int, today: str, notifications_enabled: bool = True):
+        conn.execute(
+            "INSERT OR IGNORE INTO users (user_id, first_seen, last_seen, notifications_enabled) VALUES (?, ?, ?, ?)",
+            (user_id, today, today, int(notifications_enabled))
+        )
+
+    def track_user_activity(self, user_id: int, username: Optional[str] = None,
+                            first_name: Optional[str] = None, action: str = "command"):
+        """Prati aktivnost korisnika (isto kao UserStatsTracker.track_user_activity)"""
+        now = datetime.now()
+        today = now.strftime('%Y-%m-%d')
+        current_month = now.strftime('%Y-%m')
+
+        try:
+            with self.store.transaction(immediate=True) as conn:
+                self._ensure_user(conn, user_id, today)
+                conn.execute(
+                    "UPDATE users SET last_seen = ?, total_interactions = total_interactions + 1, "
+                    "username = COALESCE(?, username), first_name = COALESCE(?, first_name) WHERE user_id = ?",
+                    (today, username or None, first_name or None, user_id)
+                )
+                conn.execute(
+                    "INSERT INTO daily_interactions (day, user_id, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT(day, user_id) DO UPDATE SET count = count + 1",
+                    (today, user_id)
+                )
+                conn.execute("INSERT OR IGNORE INTO monthly_active (month, user_id) VALUES (?, ?)",
+                             (current_month, user_id))
+        except Exception as e:
+            logger.error(f"Greška pri čuvanju statistike: {e}")
+            return
+
+        logger.info(f"Praćena aktivnost: user_id={user_id}, action={action}")
+
+    def _scalar(self, query: str, params: tuple = ()):
+        with self.store.transaction() as conn:
+            return conn.execute(query, params).fetchone()[0]
+
+    def get_monthly_active_users(self, year: Optional[int] = None, month: Optional[int] = None) -> int:
+        if year is None or month is None:
+            now = datetime.now()
+            year = now.year
+            month = now.month
+        return self._scalar("SELECT COUNT(*) FROM monthly_active WHERE month = ?", (f"{year}-{month:02d}",))
+
+    def get_peak_monthly_users(self) -> int:
+        return self._scalar(
+            "SELECT COALESCE(MAX(n), 0) FROM (SELECT COUNT(*) AS n FROM monthly_active GROUP BY month)"
+        )
+
+    def get_current_month_stats(self) -> Dict:
+        current_month = datetime.now().strftime('%Y-%m')
+        with self.store.transaction() as conn:
+            active_users = conn.execute(
+                "SELECT COUNT(*) FROM monthly_active WHERE month = ?", (current_month,)).fetchone()[0]
+            peak_users = conn.execute(
+                "SELECT COALESCE(MAX(n), 0) FROM (SELECT COUNT(*) AS n FROM monthly_active GROUP BY month)"
+            ).fetchone()[0]
+            total_users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+        return {
+            "current_month_active": active_users,
+            "peak_monthly_active": peak_users,
+            "total_users_ever": total_users,
+            "month": current_month
+        }
+
+    def get_daily_active_users(self, date: Optional[str] = None) -> int:
+        if date is None:
+            date = datetime.now().strftime('%Y-%m-%d')
+        return self._scalar("SELECT COUNT(*) FROM daily_interactions WHERE day = ?", (date,))
+
+    def get_average_monthly_users(self, months: int = 3) -> float:
+        now = datetime.now()
+        month_keys = sorted({(now - timedelta(days=30 * i)).strftime('%Y-%m') for i in range(months)})
+        with self.store.transaction() as conn:
+            counts = [
+                row[0] for row in conn.execute(
+                    f"SELECT COUNT(*) FROM monthly_active WHERE month IN ({','.join('?' * len(month_keys))}) "
+                    "GROUP BY month",
+                    month_keys
+                )
+            ]
+        return sum(counts) / len(counts) if counts else 0.0
+
+    def get_active_user_ids(self, days: int = 30) -> list:
+        cutoff_str = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        with self.store.transaction() as conn:
+            return [row[0] for row in conn.execute("SELECT user_id FROM users WHERE last_seen >= ?", (cutoff_str,))]
+
+    def set_notifications(self, user_id: int, enabled: bool):
+        today = datetime.now().strftime('%Y-%m-%d')
+        with self.store.transaction(immediate=True) as conn:
+            self._ensure_user(conn, user_id, today, enabled)
+            conn.execute("UPDATE users SET notifications_enabled = ? WHERE user_id = ?", (int(enabled), user_id))
+        logger.info(f"Notifikacije {'uključene' if enabled else 'isključene'} za korisnika {user_id}")
+
+    def get_notifications(self, user_id: int) -> bool:
+        with self.store.transaction() as conn:
+            row = conn.execute("SELECT notifications_enabled FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return True if row is None else bool(row[0])
+
+    def set_allergens(self, user_id: int, codes: list):
+        today = datetime.now().strftime('%Y-%m-%d')
+        with self.store.transaction(immediate=True) as conn:
+            self._ensure_user(conn, user_id, today)
+            conn.execute("UPDATE users SET allergens = ? WHERE user_id = ?",
+                         (json.dumps(sorted(set(codes), key=int)), user_id))
+        logger.info(f"Alergeni {codes} postavljeni za korisnika {user_id}")
+
+    def get_allergens(self, user_id: int) -> list:
+        with self.store.transaction() as conn:
+            row = conn.execute("SELECT allergens FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row is not None and row[0] else []
+
+    def get_users_with_notifications_enabled(self) -> list:
+        with self.store.transaction() as conn:
+            return [row[0] for row in conn.execute("SELECT user_id FROM users WHERE notifications_enabled = 1")]
+
+    def cleanup_old_data(self, days_to_keep: int = 90):
+        cutoff_str = (datetime.now() - timedelta(days=days_to_keep)).strftime('%Y-%m-%d')
+        with self.store.transaction(immediate=True) as conn:
+            removed_days = conn.execute(
+                "SELECT COUNT(DISTINCT day) FROM daily_interactions WHERE day < ?", (cutoff_str,)).fetchone()[0]
+            conn.execute("DELETE FROM daily_interactions WHERE day < ?", (cutoff_str,))
+        if removed_days:
+            logger.info(f"Očišćeno {removed_days} dnevnih zapisa starijih od {days_to_keep} dana")
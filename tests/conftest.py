@@ -0,0 +1,52 @@
+import functools
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Testovi se pokreću iz korena repozitorijuma ili iz tests/ - src paket mora biti na putanji
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from src.data_organizer import DataOrganizer  # noqa: E402
+
+DATA_DIR = REPO_DIR / "data"
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="session")
+def fixture_site():
+    """Lokalni HTTP server nad tests/fixtures/site (listing stranice i PDF-ovi) - vraća osnovni URL"""
+    handler = functools.partial(_QuietHandler, directory=str(FIXTURES_DIR / "site"))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def expected_month(tmp_path):
+    """Učitava sačuvani mesečni sumar (data/YYYY-MM.md) kao menu_data
+
+    Parser skida zarez i crticu sa kraja obroka (_clean_meal_content), a
+    sačuvani sumari ih ponegde imaju - poređenje ih zanemaruje.
+    """
+    organizer = DataOrganizer(tmp_path / "expected" / "daily")
+
+    def load(month: str):
+        menu_data = organizer.load_monthly_summary(DATA_DIR / f"{month}.md")
+        for day_data in menu_data.values():
+            for meal, items in day_data['meals'].items():
+                day_data['meals'][meal] = [item.rstrip(' ,-–') for item in items]
+        return menu_data
+
+    return load
@@ -0,0 +1,72 @@
+"""
+Pravi PDF jelovnika iz mesečnog sumara (data/YYYY-MM.md) za test fixture-e
+
+Raspored prati PDF vrtića: tabela sa dve kolone, u levoj ćeliji dan sa
+datumom i četiri obroka, u desnoj normativ. Potrebni su reportlab i font
+DejaVuSans (ćirilična i latinična slova sa kvačicama).
+
+    python tests/fixtures/make_pdf.py data/2025-10.md tests/fixtures/site/.../jelovnik.pdf
+"""
+import glob
+import re
+import sys
+from pathlib import Path
+
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+MONTH_NUMBERS = {
+    'januar': 1, 'februar': 2, 'mart': 3, 'april': 4,
+    'maj': 5, 'jun': 6, 'jul': 7, 'avgust': 8,
+    'septembar': 9, 'oktobar': 10, 'novembar': 11, 'decembar': 12
+}
+# Desna kolona PDF-a (normativ) - parser je ne čita
+NORMATIVE = "VARIVO OD BORANIJE SA SVINJSKIM MESOM<br/>BORANIJA, SVINJSKO MESO, LUK CRNI, BRAŠNO, ULJE, SO"
+
+
+def _style():
+    font = glob.glob('/usr/share/fonts/**/DejaVuSans.ttf', recursive=True)[0]
+    pdfmetrics.registerFont(TTFont('DejaVuSans', font))
+    style = getSampleStyleSheet()['Normal']
+    style.fontName = 'DejaVuSans'
+    style.fontSize = 8
+    return style
+
+
+def make_pdf(summary_file: Path, pdf_file: Path, days_per_page: int = 5):
+    # Bez datuma i nasumičnog ID-a - isti sumar daje isti PDF
+    rl_config.invariant = 1
+    style = _style()
+    rows = []
+    for block in summary_file.read_text(encoding='utf-8').split('## ')[1:]:
+        day_match = re.match(r'(\S+) (\d+)\. (\S+) (\d{4})', block)
+        if not day_match:
+            continue
+        meals = dict(re.findall(r'\*\*(.+?)\*\*: (.*)', block))
+        date = f"{int(day_match.group(2)):02d}.{MONTH_NUMBERS[day_match.group(3)]:02d}.{day_match.group(4)}."
+        cell = (
+            f"{day_match.group(1)} {date}<br/>DORUČAK–{meals.get('DORUČAK', '')}"
+            f"<br/>UŽINA I –{meals.get('UŽINA I', '')}<br/>RUČAK – {meals.get('RUČAK', '')}"
+            f"<br/>UŽINA II – {meals.get('UŽINA II', '')}"
+        )
+        rows.append([Paragraph(cell, style), Paragraph(NORMATIVE, style)])
+
+    story = []
+    for start in range(0, len(rows), days_per_page):
+        table = Table(rows[start:start + days_per_page], colWidths=[300, 230])
+        table.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, 'black'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]))
+        story += [table, PageBreak()]
+
+    pdf_file.parent.mkdir(parents=True, exist_ok=True)
+    SimpleDocTemplate(str(pdf_file), pagesize=A4).build(story)
+
+
+if __name__ == '__main__':
+    make_pdf(Path(sys.argv[1]), Path(sys.argv[2]))
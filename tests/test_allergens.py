@@ -0,0 +1,55 @@
+"""
+Testovi izdvajanja alergena - na primerima i na sačuvanom mesečnom jelovniku
+"""
+import re
+from pathlib import Path
+
+from src.allergens import AllergenIndex, extract_allergens
+from src.data_organizer import DataOrganizer
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def test_trailing_separator_keeps_codes():
+    assert extract_allergens('PANIRANI FILET OSLIĆA-3,4,') == [
+        {'item': 'PANIRANI FILET OSLIĆA', 'codes': ['3', '4']}
+    ]
+    assert extract_allergens('ČAJ, PILEĆA PRSA, MASLAC-1,') == [
+        {'item': 'ČAJ', 'codes': []},
+        {'item': 'PILEĆA PRSA', 'codes': []},
+        {'item': 'MASLAC', 'codes': ['1']},
+    ]
+    assert extract_allergens('MLEČNI KAKAO KREM-1,2, HLEB -4 –') == [
+        {'item': 'MLEČNI KAKAO KREM', 'codes': ['1', '2']},
+        {'item': 'HLEB', 'codes': ['4']},
+    ]
+
+
+def test_items_without_codes():
+    assert extract_allergens('VOĆE') == [{'item': 'VOĆE', 'codes': []}]
+    assert extract_allergens('KOLAČ SA JOGURTOM I SIROM - GULAŠ') == [
+        {'item': 'KOLAČ SA JOGURTOM I SIROM - GULAŠ', 'codes': []}
+    ]
+
+
+def test_every_marked_item_in_monthly_file_has_codes(tmp_path):
+    menu_data = DataOrganizer(tmp_path / "daily").load_monthly_summary(DATA_DIR / "2025-10.md")
+    assert menu_data
+
+    marked = 0
+    for day_data in menu_data.values():
+        for items in day_data['meals'].values():
+            for content in items:
+                for entry in extract_allergens(content):
+                    # Naziv stavke ne sme da zadrži oznaku, a stavka sa oznakom mora imati kodove
+                    assert not re.search(r'-\d', entry['item']), entry
+                for raw_item in re.split(r',\s*(?=[^\d\s])', content):
+                    if re.search(r'-\s*\d[\d\s,]*[,\-–\s]*$', raw_item):
+                        marked += 1
+    assert marked
+
+    index = AllergenIndex(tmp_path / "allergen_index.json")
+    index.update(menu_data)
+    # "MASLAC-1," i "KUVANO JAJE-3," u oktobru 2025.
+    assert 'MASLAC' in index.codes_for_date('2025-10-03')['1']
+    assert any(entry['item'] == 'KUVANO JAJE' for entry in index.by_code['3'])
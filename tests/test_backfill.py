@@ -0,0 +1,33 @@
+"""
+Test preuzimanja arhive (discover -> download -> parse) nad lokalnim HTTP serverom
+"""
+from src.backfill import MenuBackfill
+from src.data_organizer import DataOrganizer
+
+
+def test_backfill_against_fixture_site(fixture_site, expected_month, tmp_path):
+    organizer = DataOrganizer(tmp_path / "data" / "daily")
+    backfill = MenuBackfill(base_url=f"{fixture_site}/jelovnik/", organizer=organizer,
+                            pdf_dir=tmp_path / "data" / "pdfs", download_workers=2, parse_workers=2)
+
+    menus = backfill.discover()
+    # Lanč paket i užine se preskaču, druga strana listinga se obilazi
+    assert [(year, month, url.rsplit('/', 1)[-1]) for year, month, url in menus] == [
+        (2025, 9, 'jelovnik-septembar-2025.pdf'),
+        (2025, 10, 'jelovnik-oktobar.pdf'),
+        (2025, 11, 'jelovnik-novembar.pdf'),
+    ]
+
+    result = backfill.run()
+    assert result == {'found': 3, 'downloaded': 3, 'parsed': 3, 'days': 64}
+    assert sorted(path.name for path in backfill.pdf_dir.iterdir()) == ['2025-09.pdf', '2025-10.pdf', '2025-11.pdf']
+
+    for month in ('2025-09', '2025-10', '2025-11'):
+        year, month_number = int(month[:4]), int(month[5:])
+        assert organizer.load_structured_data(year, month_number) == expected_month(month)
+        assert organizer.load_monthly_summary(tmp_path / "data" / f"{month}.md") == expected_month(month)
+
+    # Ponovno pokretanje ne preuzima postojeće PDF-ove
+    mtimes = {path.name: path.stat().st_mtime_ns for path in backfill.pdf_dir.iterdir()}
+    assert backfill.run()['downloaded'] == 3
+    assert {path.name: path.stat().st_mtime_ns for path in backfill.pdf_dir.iterdir()} == mtimes
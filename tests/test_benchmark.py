@@ -0,0 +1,36 @@
+"""
+Testovi zlatnog korpusa i benchmark-a parsera
+"""
+import json
+import sys
+from pathlib import Path
+
+from src.benchmark import BenchmarkRunner, GoldenCorpus
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def test_golden_corpus_matches_parser_and_summaries(tmp_path):
+    corpus = GoldenCorpus(DATA_DIR / "golden", DATA_DIR)
+    pdfs = corpus.pdfs()
+    assert [path.name for path in pdfs] == ['2025-10.pdf', '2025-11.pdf']
+
+    for pdf_path in pdfs:
+        with open(pdf_path.with_suffix('.json'), 'r', encoding='utf-8') as f:
+            recorded = json.load(f)
+        assert corpus.parser.parse_pdf(pdf_path) == recorded
+        # Snimljeni izlaz je isti kao sačuvani mesečni sumar
+        summary = corpus.organizer.load_monthly_summary(DATA_DIR / f"{pdf_path.stem}.md")
+        for day_data in summary.values():
+            for meal, items in day_data['meals'].items():
+                day_data['meals'][meal] = [corpus.parser._clean_meal_content(item) for item in items]
+        assert summary == recorded
+
+
+def test_benchmark_runs_without_drift_or_bot_import():
+    results = BenchmarkRunner(GoldenCorpus(DATA_DIR / "golden", DATA_DIR), repeat=1).run()
+
+    assert results['drift'] == []
+    assert {'parse_pdf[2025-10]', 'parse_pdf[2025-11]', 'format_menu_message'} <= set(results['stages'])
+    # Formatiranje poruke ne uvozi bota (i ne otvara bot.log)
+    assert 'src.telegram_bot' not in sys.modules
@@ -0,0 +1,108 @@
+"""
+Testovi deljenog stanja procesa - zakup delova broadcast-a i heartbeat
+"""
+import pytest
+
+from src import cluster as cluster_module
+from src.cluster import SharedStore, WorkerCluster
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cluster_module.time, 'time', fake.time)
+    return fake
+
+
+@pytest.fixture
+def workers(tmp_path, clock):
+    store = SharedStore(tmp_path / "klopas.db")
+    return [WorkerCluster(2, index, store, worker_id=f"worker-{index}") for index in range(2)]
+
+
+def _claimed(worker):
+    return [(claim['key'], claim['shard']) for claim in worker.claim_broadcasts()]
+
+
+def test_sending_shard_with_heartbeat_is_not_reclaimed(workers, clock):
+    first, second = workers
+    assert first.publish_broadcast('daily-2025-10-03', "Jelovnik")
+    assert _claimed(first) == [('daily-2025-10-03', 0)]
+    assert _claimed(second) == [('daily-2025-10-03', 1)]
+
+    # Dugo slanje (429 retry_after) - heartbeat drži deo 0 kod prvog procesa
+    for _ in range(20):
+        clock.now += first.heartbeat_interval
+        assert first.heartbeat_broadcast('daily-2025-10-03', 0)
+        assert second.heartbeat_broadcast('daily-2025-10-03', 1)
+        assert _claimed(second) == []
+
+    first.finish_broadcast('daily-2025-10-03', 0, sent=10, failed=0)
+    assert [shard['status'] for shard in first.broadcast_status('daily-2025-10-03')] == ['done', 'sending']
+
+
+def test_shard_without_heartbeat_is_reclaimed_once(workers, clock):
+    first, second = workers
+    first.publish_broadcast('daily-2025-10-03', "Jelovnik")
+    _claimed(first)
+    _claimed(second)
+
+    clock.now += first.stale_after + 1
+    second.heartbeat_broadcast('daily-2025-10-03', 1)
+    assert _claimed(second) == [('daily-2025-10-03', 0)]
+
+    # Prvi proces je izgubio deo - heartbeat to javlja, a njegov ishod se ne upisuje
+    assert not first.heartbeat_broadcast('daily-2025-10-03', 0)
+    first.finish_broadcast('daily-2025-10-03', 0, sent=3, failed=0)
+    shard = second.broadcast_status('daily-2025-10-03')[0]
+    assert (shard['status'], shard['owner'], shard['attempts'], shard['sent']) == ('sending', 'worker-1', 2, 0)
+
+
+def test_heartbeat_must_be_shorter_than_stale_after(tmp_path, clock):
+    with pytest.raises(ValueError):
+        WorkerCluster(2, 0, SharedStore(tmp_path / "klopas.db"), stale_after=30, heartbeat_interval=30)
+
+
+def test_crashing_shard_is_failed_after_max_attempts(workers, clock):
+    first, second = workers
+    first.publish_broadcast('daily-2025-10-03', "Jelovnik")
+    _claimed(second)
+    second.finish_broadcast('daily-2025-10-03', 1, sent=4, failed=0)
+
+    # Proces koji šalje deo 0 pada pri svakom pokušaju - bez heartbeat-a deo se preuzima ponovo
+    assert _claimed(first) == [('daily-2025-10-03', 0)]
+    for _ in range(first.max_attempts - 1):
+        clock.now += first.stale_after + 1
+        assert _claimed(second) == [('daily-2025-10-03', 0)]
+        assert first.broadcast_succeeded('daily-2025-10-03') is None
+
+    clock.now += first.stale_after + 1
+    assert _claimed(second) == []
+    shard = second.broadcast_status('daily-2025-10-03')[0]
+    assert (shard['status'], shard['attempts']) == ('failed', first.max_attempts)
+    # Deo 1 je poslat, pa broadcast ipak ima ishod
+    assert first.broadcast_succeeded('daily-2025-10-03') is True
+
+
+def test_broadcast_without_sent_messages_is_not_a_success(workers):
+    first, second = workers
+    first.publish_broadcast('daily-2025-10-03', "Jelovnik")
+    assert first.broadcast_succeeded('daily-2025-10-03') is None
+
+    for worker, shard in ((first, 0), (second, 1)):
+        _claimed(worker)
+        for _ in range(worker.max_attempts):
+            worker.finish_broadcast('daily-2025-10-03', shard, sent=0, failed=5, retry=True)
+            _claimed(worker)
+
+    assert [shard['status'] for shard in first.broadcast_status('daily-2025-10-03')] == ['failed', 'failed']
+    assert first.broadcast_succeeded('daily-2025-10-03') is False
+    assert first.broadcast_succeeded('daily-missing') is None
@@ -0,0 +1,132 @@
+"""
+Testovi offline preuzimanja - izbor PDF-ova i upis za BatchIngest
+"""
+import json
+import shutil
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from src.allergens import AllergenIndex
+from src.data_organizer import DataOrganizer
+from src.ingest import BatchIngest, IngestPipeline
+
+UPLOADS = FIXTURES_DIR / "site" / "wp-content" / "uploads"
+OCTOBER_PDF = UPLOADS / "2025" / "09" / "jelovnik-oktobar.pdf"
+NOVEMBER_PDF = UPLOADS / "2025" / "10" / "jelovnik-novembar.pdf"
+
+
+class FakeScraper:
+    """Vraća PDF koji je test postavio na putanju, sa zadatim izvornim URL-om"""
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+        self.last_pdf_url = None
+
+    def get_current_month_menu(self):
+        return self.pdf_path
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    organizer = DataOrganizer(tmp_path / "data" / "daily")
+    scraper = FakeScraper(tmp_path / "data" / "pdfs" / "2025-10.pdf")
+    scraper.pdf_path.parent.mkdir(parents=True)
+    return IngestPipeline(scraper=scraper, organizer=organizer)
+
+
+def _ingest(pipeline, pdf, url):
+    shutil.copyfile(pdf, pipeline.scraper.pdf_path)
+    pipeline.scraper.last_pdf_url = url
+    return pipeline.run(resume=False)
+
+
+def test_collect_accepts_absolute_and_recursive_globs(tmp_path):
+    (tmp_path / "2023").mkdir()
+    for name in ("2023-01.pdf", "2023-02.PDF", "2023/2023-03.pdf", "notes.txt"):
+        (tmp_path / name).write_bytes(b"%PDF-1.4")
+
+    assert BatchIngest.collect([str(tmp_path / "*.pdf")]) == [tmp_path / "2023-01.pdf"]
+    assert BatchIngest.collect([str(tmp_path / "**" / "2023-*")]) == sorted([
+        tmp_path / "2023-01.pdf", tmp_path / "2023-02.PDF", tmp_path / "2023" / "2023-03.pdf"
+    ])
+
+
+def test_collect_directory_and_file_without_duplicates(tmp_path):
+    pdf = tmp_path / "2024-05.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    assert BatchIngest.collect([str(tmp_path), str(pdf)]) == [pdf]
+
+
+def test_allergen_index_published_with_the_batch(tmp_path, monkeypatch, expected_month):
+    organizer = DataOrganizer(tmp_path / "data" / "daily")
+    batch = BatchIngest(organizer, workers=1)
+    index = AllergenIndex(batch.allergen_index_file)
+
+    batch._write(expected_month('2025-10'), index)
+    # Indeks je deo iste generacije kao jelovnik
+    assert batch.allergen_index_file in organizer.last_batch_changed
+    assert organizer.current_generation() == 1
+    published = batch.allergen_index_file.read_text(encoding='utf-8')
+
+    def fail(*args, **kwargs):
+        raise OSError("disk pun")
+
+    monkeypatch.setattr(organizer, 'create_monthly_summaries', fail)
+    with pytest.raises(OSError):
+        batch._write(expected_month('2025-11'), index)
+
+    # Neuspeli upis ne menja ni fajl ni indeks u memoriji
+    assert batch.allergen_index_file.read_text(encoding='utf-8') == published
+    assert organizer.current_generation() == 1
+    assert not any(date.startswith('2025-11') for date in index.by_date)
+    assert index.codes_for_date('2025-10-03')['1'] == ['MASLAC', 'KEKS']
+
+
+@pytest.mark.parametrize("urls", [
+    ("https://example.com/jelovnik-oktobar.pdf", "https://example.com/jelovnik-novembar.pdf"),
+    (None, None),
+])
+def test_late_month_ingest_does_not_remove_previous_month(pipeline, urls):
+    first = _ingest(pipeline, OCTOBER_PDF, urls[0])
+    assert first['status'] == 'ok'
+    # Podrazumevano inkrementalno preuzimanje i dalje čita tekstualni sloj
+    assert first['parse_mode'] == 'pypdf2'
+    assert len(pipeline.organizer.load_structured_data(2025, 10)) == 23
+
+    # Od 25. u mesecu sajt nudi novembarski PDF - i kad završi na istoj putanji, oktobar nije uklonjen
+    second = _ingest(pipeline, NOVEMBER_PDF, urls[1])
+    assert second['status'] == 'ok'
+    assert second['removed_dates'] == []
+    assert len(pipeline.organizer.load_structured_data(2025, 10)) == 23
+    assert len(pipeline.organizer.load_structured_data(2025, 11)) == 19
+    assert not any(change['status'] == 'removed' for change in second['menu_diff'].changes.values())
+
+
+def test_same_pdf_dropping_a_day_removes_it(pipeline):
+    url = "https://example.com/jelovnik-oktobar.pdf"
+    _ingest(pipeline, OCTOBER_PDF, url)
+
+    # Prethodna verzija istog PDF-a imala je i 2025-10-04 na prvoj stranici
+    organizer = pipeline.organizer
+    state = organizer.load_page_state("2025-10")
+    assert state['source'] == url
+    state['pages'][0]['fingerprint'] = 'stara-verzija'
+    state['pages'][0]['dates'].append('2025-10-04')
+    organizer.save_page_state("2025-10", state['pages'], url)
+    organizer.save_structured_data({'2025-10-04': {'date': '2025-10-04', 'day_name': 'SUBOTA',
+                                                   'meals': {'dorucak': 'KIFLA'}}})
+
+    result = _ingest(pipeline, OCTOBER_PDF, url)
+    assert result['removed_dates'] == ['2025-10-04']
+    assert '2025-10-04' not in organizer.load_structured_data(2025, 10)
+
+
+def test_page_state_reads_the_old_list_format(tmp_path):
+    organizer = DataOrganizer(tmp_path / "data" / "daily")
+    pages_dir = organizer.structured_dir / "pages"
+    pages_dir.mkdir(parents=True)
+    pages = [{'fingerprint': 'abc', 'dates': ['2025-10-01']}]
+    (pages_dir / "2025-10.json").write_text(json.dumps(pages), encoding='utf-8')
+
+    assert organizer.load_page_state("2025-10") == {'source': None, 'pages': pages}
@@ -0,0 +1,47 @@
+"""
+Testovi poređenja verzija jelovnika i poruke o izmeni
+"""
+from datetime import datetime
+
+from src.menu_diff import MenuDiff
+
+
+def _day(date_str, lunch):
+    return {'day_name': 'petak', 'date': date_str,
+            'meals': {'doručak': ['ČAJ'], 'užina_i': [], 'ručak': [lunch], 'užina_ii': []}}
+
+
+def test_notification_escapes_dish_text():
+    old = {'2025-10-03': _day('2025-10-03', 'SUPA_DANA [NOVO]')}
+    new = {'2025-10-03': _day('2025-10-03', 'PILETINA*, PIRE_KROMPIR `4`')}
+    diff = MenuDiff(old, new)
+
+    assert diff.changed_dates() == ['2025-10-03']
+    assert diff.format_notification(['2025-10-03']) == (
+        "🔁 *Izmena jelovnika*\n"
+        "\n*Petak, 03.10.2025.*\n"
+        "🍲 Ručak: PILETINA\\*, PIRE\\_KROMPIR \\`4\\`\n"
+        "   _ranije:_ SUPA\\_DANA \\[NOVO]\n"
+    )
+
+
+def test_notification_for_removed_day_and_cleared_meal():
+    old = {'2025-10-02': _day('2025-10-02', 'RIŽOTO'), '2025-10-03': _day('2025-10-03', 'PASULJ')}
+    new = {'2025-10-03': _day('2025-10-03', '')}
+    new['2025-10-03']['meals']['ručak'] = []
+    diff = MenuDiff(old, new, removed_dates=['2025-10-02'])
+
+    message = diff.format_notification(['2025-10-02', '2025-10-03'])
+    assert "   • Dan je uklonjen iz jelovnika\n" in message
+    assert "🍲 Ručak: -\n   _ranije:_ PASULJ\n" in message
+
+
+def test_removed_date_outside_pdf_months_is_not_reported():
+    old = {'2025-10-30': _day('2025-10-30', 'RIŽOTO'), '2025-10-31': _day('2025-10-31', 'PASULJ')}
+    new = {'2025-11-03': _day('2025-11-03', 'SARMA')}
+    diff = MenuDiff(old, new, removed_dates=['2025-10-30', '2025-10-31'], months=['2025-11'])
+
+    # Novembarski PDF ne uklanja oktobarske dane - nema poruke "Dan je uklonjen"
+    assert diff.changed_dates() == []
+    assert diff.upcoming_changes(datetime(2025, 10, 30)) == []
+    assert diff.added_dates() == ['2025-11-03']
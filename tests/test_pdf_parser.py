@@ -0,0 +1,68 @@
+"""
+Testovi parsera - ponovno parsiranje sačuvanih PDF-ova i poređenje sa data/
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from src.benchmark import GoldenCorpus
+from src.data_organizer import DataOrganizer
+from src.ingest import IngestPipeline
+from src.pdf_parser import MenuParser
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+UPLOADS_DIR = Path(__file__).resolve().parent / "fixtures" / "site" / "wp-content" / "uploads"
+
+STORED_PDFS = {
+    '2025-09': UPLOADS_DIR / "2025" / "08" / "jelovnik-septembar-2025.pdf",
+    '2025-10': UPLOADS_DIR / "2025" / "09" / "jelovnik-oktobar.pdf",
+    '2025-11': UPLOADS_DIR / "2025" / "10" / "jelovnik-novembar.pdf",
+}
+
+
+@pytest.mark.parametrize("month", sorted(STORED_PDFS))
+def test_reparsed_pdf_matches_monthly_file(month, expected_month):
+    parser = MenuParser()
+    assert parser.parse_pdf(STORED_PDFS[month]) == expected_month(month)
+
+
+@pytest.mark.parametrize("month", sorted(STORED_PDFS))
+def test_table_path_matches_monthly_file(month, expected_month):
+    # Tokenizer ćelije (_parse_day_column) i kada tekstualni sloj nije dostupan
+    parser = MenuParser(text_layer=False)
+    assert parser.parse_pdf(STORED_PDFS[month]) == expected_month(month)
+    assert parser.last_parse_mode == 'tables'
+
+
+@pytest.mark.parametrize("month, mode", [('2025-09', 'pypdf2'), ('2025-10', 'pypdf2'), ('2025-11', 'pypdf2+tables')])
+def test_iter_days_reads_text_layer_per_page(month, mode, expected_month):
+    # Inkrementalno preuzimanje čita tekstualni sloj svake stranice, tabele samo gde validacija ne prođe
+    parser = MenuParser()
+    assert {day['date']: day for day in parser.iter_days(STORED_PDFS[month])} == expected_month(month)
+    assert parser.last_parse_mode == mode
+
+
+def test_tokenizer_reproduces_every_stored_day(expected_month):
+    corpus = GoldenCorpus(REPO_DIR / "data" / "golden", REPO_DIR / "data")
+    expected = {}
+    for month in STORED_PDFS:
+        expected.update(expected_month(month))
+
+    parser = MenuParser()
+    days = [parser._parse_day_column(cell) for cell in corpus.day_cells()]
+    assert {day['date']: day for day in days} == expected
+
+
+def test_layout_cache_is_persisted_only_where_the_caller_says(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(MenuParser, '_layout_cache', {})
+    MenuParser(text_layer=False).parse_pdf(STORED_PDFS['2025-11'])
+    # Parser sam ne piše ništa (procesi iz pool-a, benchmark)
+    assert list(tmp_path.iterdir()) == []
+
+    monkeypatch.setattr(MenuParser, '_layout_cache', {})
+    pipeline = IngestPipeline(organizer=DataOrganizer(tmp_path / "data" / "daily"))
+    pipeline.parser.text_layer = False
+    pipeline.parser.parse_pdf(STORED_PDFS['2025-11'])
+    assert json.loads((tmp_path / "data" / "layout_cache.json").read_text(encoding='utf-8'))
@@ -0,0 +1,48 @@
+"""
+Testovi prepoznavanja meseca jelovnika iz linkova na sajtu
+"""
+from datetime import datetime
+from pathlib import Path
+
+from src.scraper import MenuScraper
+
+
+def test_year_from_link_text_wins_over_upload_path():
+    scraper = MenuScraper()
+    assert scraper._month_from_link(
+        "jelovnik za januar 2025.", "https://example.com/wp-content/uploads/2024/12/jelovnik.pdf"
+    ) == (2025, 1)
+
+
+def test_year_from_file_name_then_upload_path():
+    scraper = MenuScraper()
+    assert scraper._month_from_link(
+        "jelovnik za januar", "/wp-content/uploads/2024/12/jelovnik-januar-2025.pdf"
+    ) == (2025, 1)
+    # Jelovnik postavljen u decembru za januar pripada sledećoj godini
+    assert scraper._month_from_link("jelovnik za januar", "/wp-content/uploads/2024/12/jelovnik.pdf") == (2025, 1)
+    # Ispravka postavljena mesec kasnije ostaje u istoj godini
+    assert scraper._month_from_link("jelovnik za oktobar", "/wp-content/uploads/2025/11/jelovnik.pdf") == (2025, 10)
+
+
+def test_month_from_link_text_wins_over_href():
+    scraper = MenuScraper()
+    assert scraper._month_from_link(
+        "jelovnik za mart 2025", "/wp-content/uploads/2025/02/jelovnik-februar-ispravka.pdf"
+    ) == (2025, 3)
+    assert scraper._month_from_link("jelovnik", "/wp-content/uploads/2025/02/obavestenje.pdf") is None
+
+
+def test_late_month_download_is_saved_under_the_menu_month(fixture_site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scraper = MenuScraper(f"{fixture_site}/jelovnik/")
+
+    # Od 25. u mesecu traži se jelovnik za sledeći mesec - i čuva se pod tim mesecem
+    assert scraper.get_current_month_menu(now=datetime(2025, 10, 27)) == Path("data/pdfs/2025-11.pdf")
+    assert scraper.last_pdf_url.endswith("/2025/10/jelovnik-novembar.pdf")
+
+    assert scraper.get_current_month_menu(now=datetime(2025, 10, 10)) == Path("data/pdfs/2025-10.pdf")
+    assert scraper.last_pdf_url.endswith("/2025/09/jelovnik-oktobar.pdf")
+    assert sorted(path.name for path in (tmp_path / "data" / "pdfs").iterdir()) == ['2025-10.pdf', '2025-11.pdf']
+
+    assert scraper.find_current_month_pdf_url(now=datetime(2025, 12, 1)) is None